@@ -1,4 +1,6 @@
 from django.contrib import admin
-from bookings.models import Booking
+from bookings.models import ArchivedBooking, Booking, BookingTombstone
 
 admin.site.register(Booking)
+admin.site.register(ArchivedBooking)
+admin.site.register(BookingTombstone)
@@ -0,0 +1,150 @@
+from datetime import date, timedelta
+from functools import partial
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Max
+from django.utils import timezone
+from bookings.events import broker
+from bookings.models import ArchivedBooking, Booking, BookingTombstone
+from outbox.models import OutboxEvent
+from reservations.softdelete import delete_rows
+
+ARCHIVED_FIELDS = [
+    "id",
+    "property_id",
+    "start_date",
+    "end_date",
+    "stay_length",
+    "final_price_cents",
+    "created_at",
+    "updated_at",
+]
+
+
+def get_archive_cutoff(today: Optional[date] = None) -> date:
+    """
+    Get the date before which finished bookings are archived.
+
+    Args:
+        today (Optional[date]): Reference date, by default the current date.
+
+    Returns:
+        date: Bookings whose end_date is older than this date are archived.
+    """
+    today = today or timezone.localdate()
+    return today - timedelta(days=settings.BOOKING_ARCHIVE_AFTER_DAYS)
+
+
+def archive_bookings(cutoff: date, batch_size: int = 1000) -> int:
+    """
+    Move the bookings whose end_date is older than the cutoff to the archive.
+    Each batch is copied and deleted in its own transaction, along with the
+    tombstones and outbox events of the bookings leaving the table.
+
+    Args:
+        cutoff (date): Bookings ending before this date are archived.
+        batch_size (int): Number of bookings moved per transaction.
+
+    Returns:
+        int: The number of archived bookings.
+    """
+    archived = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Booking.objects.filter(end_date__lt=cutoff)
+                .order_by("pk")
+                .values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not batch:
+                return archived
+            ArchivedBooking.objects.bulk_create(
+                [ArchivedBooking(**row) for row in batch]
+            )
+            ids = [row["id"] for row in batch]
+            # The delete signals are skipped, the days the bookings used are
+            # already out of every availability horizon. The clients syncing
+            # the list, the outbox and the event stream are told here instead.
+            delete_rows(Booking, ids, router.db_for_write(Booking))
+            BookingTombstone.objects.bulk_create(
+                [BookingTombstone(booking_id=pk) for pk in ids]
+            )
+            OutboxEvent.objects.bulk_create(
+                [
+                    OutboxEvent(
+                        model=Booking._meta.model_name,
+                        object_id=pk,
+                        operation=OutboxEvent.DELETED,
+                    )
+                    for pk in ids
+                ]
+            )
+            deleted = [
+                {"id": row["id"], "property": row["property_id"]} for row in batch
+            ]
+            transaction.on_commit(partial(publish_deleted, deleted))
+        archived += len(batch)
+
+
+def publish_deleted(bookings: List[Dict]) -> None:
+    """
+    Publish the archived bookings to the event stream as deleted ones.
+    """
+    for data in bookings:
+        broker.publish("deleted", data)
+
+
+def archive_watermark() -> Optional[date]:
+    """
+    Get the newest end date found in the archive.
+
+    Returns:
+        Optional[date]: The newest archived end_date, None if the archive is empty.
+    """
+    return ArchivedBooking.objects.aggregate(watermark=Max("end_date"))["watermark"]
+
+
+def earliest_end_date(filters: Dict) -> Optional[date]:
+    """
+    Get the earliest end date a booking can have to match the date filters.
+    A booking always ends on or after its start date.
+
+    Args:
+        filters (Dict): The cleaned data of a BookingFilter.
+
+    Returns:
+        Optional[date]: The lower bound of the end date, None if there is none.
+    """
+    bounds = []
+    for field in ("start_date", "end_date"):
+        if filters.get(field):
+            bounds.append(filters[field])
+        if filters.get(f"{field}__gt"):
+            bounds.append(filters[f"{field}__gt"] + timedelta(days=1))
+    return max(bounds) if bounds else None
+
+
+def reaches_archive(filters: Dict) -> bool:
+    """
+    Check if the date filters of a booking list reach back to the archive.
+    Lists without date filters only read the bookings table.
+
+    Args:
+        filters (Dict): The cleaned data of a BookingFilter.
+
+    Returns:
+        bool: True if archived bookings can match the filters.
+    """
+    date_filters = [
+        f"{field}{lookup}"
+        for field in ("start_date", "end_date")
+        for lookup in ("", "__lt", "__gt")
+    ]
+    if not any(filters.get(name) for name in date_filters):
+        return False
+    watermark = archive_watermark()
+    if watermark is None:
+        return False
+    lower_bound = earliest_end_date(filters)
+    return lower_bound is None or lower_bound <= watermark
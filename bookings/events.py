@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from typing import Dict, List, NamedTuple, Set, Tuple
+from django.conf import settings
+
+
+class BookingEvent(NamedTuple):
+    """
+    A change of a booking, as sent to the event stream consumers.
+    """
+
+    id: int
+    type: str
+    data: str
+    epoch: str
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe of booking events.
+
+    Events get increasing IDs and the last ones are kept in a bounded ring
+    buffer, so a consumer reconnecting with Last-Event-ID can replay what it
+    missed. Publishing is thread safe, subscribers are asyncio events woken up
+    in their own loop.
+
+    The IDs restart with the process and each worker counts its own, so they
+    are only meaningful with the epoch of the broker that published them.
+
+    Attributes:
+        epoch: Random token of this broker, part of the IDs sent to consumers.
+        last_id: ID of the last published event, 0 if none.
+    """
+
+    def __init__(self, maxlen: int):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.last_id = 0
+        self._buffer = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def publish(self, event_type: str, data: Dict) -> BookingEvent:
+        """
+        Publish an event and wake up the subscribers.
+
+        Args:
+            event_type (str): "created", "updated" or "deleted".
+            data (Dict): The payload of the event, serializable to JSON.
+
+        Returns:
+            BookingEvent: The published event.
+        """
+        with self._lock:
+            self.last_id += 1
+            event = BookingEvent(
+                self.last_id,
+                event_type,
+                json.dumps(data, separators=(",", ":")),
+                self.epoch,
+            )
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for loop, wakeup in subscribers:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The loop of a consumer that is going away was closed
+                pass
+        return event
+
+    def events_after(self, last_id: int) -> List[BookingEvent]:
+        """
+        Get the buffered events published after an event.
+        If that event is not buffered anymore, every buffered event is returned.
+
+        Args:
+            last_id (int): ID of the last event the consumer received.
+
+        Returns:
+            List[BookingEvent]: The events to send, oldest first.
+        """
+        with self._lock:
+            return [event for event in self._buffer if event.id > last_id]
+
+    def subscribe(self) -> asyncio.Event:
+        """
+        Subscribe the running asyncio loop to the events.
+
+        Returns:
+            asyncio.Event: An event set each time something is published.
+        """
+        wakeup = asyncio.Event()
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), wakeup))
+        return wakeup
+
+    def unsubscribe(self, wakeup: asyncio.Event) -> None:
+        """
+        Remove a subscription made with subscribe.
+
+        Args:
+            wakeup (asyncio.Event): The event returned by subscribe.
+        """
+        with self._lock:
+            self._subscribers = {
+                subscriber
+                for subscriber in self._subscribers
+                if subscriber[1] is not wakeup
+            }
+
+
+broker = EventBroker(getattr(settings, "BOOKING_EVENTS_BUFFER_SIZE", 1000))
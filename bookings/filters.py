@@ -1,5 +1,6 @@
 import django_filters
 from bookings.models import Booking
+from reservations.money import HundredthsFilter
 
 
 class BookingFilter(django_filters.FilterSet):
@@ -8,20 +9,33 @@ class BookingFilter(django_filters.FilterSet):
     """
 
     start_date = django_filters.DateFilter(
-        field_name="start_date",
-        lookup_expr=["exact", "lt", "gt"],
-        input_formats=["%m-%d-%Y"],
+        field_name="start_date", input_formats=["%m-%d-%Y"]
+    )
+    start_date__lt = django_filters.DateFilter(
+        field_name="start_date", lookup_expr="lt", input_formats=["%m-%d-%Y"]
+    )
+    start_date__gt = django_filters.DateFilter(
+        field_name="start_date", lookup_expr="gt", input_formats=["%m-%d-%Y"]
     )
     end_date = django_filters.DateFilter(
-        field_name="end_date",
-        lookup_expr=["exact", "lt", "gt"],
-        input_formats=["%m-%d-%Y"],
+        field_name="end_date", input_formats=["%m-%d-%Y"]
+    )
+    end_date__lt = django_filters.DateFilter(
+        field_name="end_date", lookup_expr="lt", input_formats=["%m-%d-%Y"]
+    )
+    end_date__gt = django_filters.DateFilter(
+        field_name="end_date", lookup_expr="gt", input_formats=["%m-%d-%Y"]
+    )
+    updated_since = django_filters.IsoDateTimeFilter(
+        field_name="updated_at", lookup_expr="gt"
     )
+    final_price = HundredthsFilter(field_name="final_price_cents")
+    final_price__lt = HundredthsFilter(field_name="final_price_cents", lookup_expr="lt")
+    final_price__gt = HundredthsFilter(field_name="final_price_cents", lookup_expr="gt")
 
     class Meta:
         model = Booking
         fields = {
             "property__name": ["icontains"],
             "stay_length": ["exact", "lt", "gt"],
-            "final_price": ["exact", "lt", "gt"],
         }
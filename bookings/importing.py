@@ -0,0 +1,176 @@
+import csv
+import json
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import django
+from django.apps import apps
+from django.db import connections, transaction
+from bookings.models import Booking
+from bookings.utils import (
+    calculate_final_price,
+    calculate_stay_length,
+    get_pricing_rules,
+)
+from outbox.models import OutboxEvent
+from outbox.signals import get_payload
+from properties.models import Property
+
+DATE_FORMATS = ("%m-%d-%Y", "%Y-%m-%d")
+
+ImportRow = Tuple[int, date, date]
+
+_properties: Dict[int, Optional[Tuple[Property, List[Dict]]]] = {}
+"""_properties: Property and pricing rules loaded once per property by each worker"""
+
+
+def parse_date(value: str) -> date:
+    """
+    Parse a date of the import file, in the API format (MM-DD-YYYY) or ISO format.
+
+    Args:
+        value (str): The date to parse.
+
+    Returns:
+        date: The parsed date.
+
+    Raises:
+        ValueError: If the date does not match any of the formats.
+    """
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def parse_record(record: Dict) -> ImportRow:
+    """
+    Parse a record of the import file.
+
+    Args:
+        record (Dict): The property, start_date and end_date fields of a booking.
+
+    Returns:
+        ImportRow: The property ID, start date and end date of the booking.
+
+    Raises:
+        KeyError: If a field is missing.
+        ValueError: If a field is invalid, or the stay ends before it starts.
+    """
+    start_date = parse_date(record["start_date"])
+    end_date = parse_date(record["end_date"])
+    if end_date < start_date:
+        raise ValueError(f"End date {end_date} is before start date {start_date}")
+    return int(record["property"]), start_date, end_date
+
+
+def read_rows(path: str, file_format: str) -> Iterator[ImportRow]:
+    """
+    Stream the bookings of a CSV or NDJSON file without loading it whole.
+    Each record needs the property, start_date and end_date fields.
+
+    Args:
+        path (str): The file to read.
+        file_format (str): "csv" or "ndjson".
+
+    Yields:
+        ImportRow: The property ID, start date and end date of each booking.
+    """
+    with open(path, newline="") as file:
+        if file_format == "csv":
+            records = csv.DictReader(file)
+        else:
+            records = (json.loads(line) for line in file if line.strip())
+        for record in records:
+            yield parse_record(record)
+
+
+def init_worker() -> None:
+    """
+    Prepare a process of the pool: set up Django if it was spawned, and drop
+    the database connections inherited from the parent if it was forked.
+    """
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+    _properties.clear()
+
+
+def load_property(property_id: int) -> Optional[Tuple[Property, List[Dict]]]:
+    """
+    Get a property and its pricing rules, loading them once per worker.
+
+    Args:
+        property_id (int): The ID of the property.
+
+    Returns:
+        Optional[Tuple[Property, List[Dict]]]: The property and its sorted
+        pricing rules, None if the property does not exist.
+    """
+    if property_id not in _properties:
+        property = Property.objects.filter(pk=property_id).first()
+        _properties[property_id] = (
+            (property, get_pricing_rules(property)) if property else None
+        )
+    return _properties[property_id]
+
+
+def import_partition(
+    property_id: int, rows: List[ImportRow], batch_size: int
+) -> Tuple[int, int]:
+    """
+    Price and insert the bookings of a single property.
+    The prices are calculated the same way BookingListView.post does.
+    bulk_create sends no signals, so the outbox events of the bookings are
+    written here, in the same transaction.
+
+    Args:
+        property_id (int): The property every row belongs to.
+        rows (List[ImportRow]): The bookings to insert.
+        batch_size (int): Number of bookings inserted per query.
+
+    Returns:
+        Tuple[int, int]: The number of inserted and skipped rows.
+    """
+    loaded = load_property(property_id)
+    if loaded is None:
+        return 0, len(rows)
+    property, pricing_rules = loaded
+
+    bookings = []
+    for _, start_date, end_date in rows:
+        stay_length = calculate_stay_length(start_date, end_date)
+        final_price = None
+        if pricing_rules:
+            final_price = calculate_final_price(
+                pricing_rules,
+                start_date,
+                end_date,
+                stay_length,
+                property.base_price_cents,
+            )
+        bookings.append(
+            Booking(
+                property_id=property_id,
+                start_date=start_date,
+                end_date=end_date,
+                stay_length=stay_length,
+                final_price_cents=final_price,
+            )
+        )
+    with transaction.atomic():
+        Booking.objects.bulk_create(bookings, batch_size=batch_size)
+        OutboxEvent.objects.bulk_create(
+            (
+                OutboxEvent(
+                    model=Booking._meta.model_name,
+                    object_id=booking.pk,
+                    operation=OutboxEvent.CREATED,
+                    payload=get_payload(booking),
+                )
+                for booking in bookings
+            ),
+            batch_size=batch_size,
+        )
+    return len(bookings), 0
@@ -0,0 +1,46 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from bookings.archive import archive_bookings, get_archive_cutoff
+
+
+class Command(BaseCommand):
+    """
+    Moves the bookings that ended before a cutoff to the archive table,
+    keeping the bookings table and its indexes small.
+    """
+
+    help = "Archive the bookings that ended before a cutoff date."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="Cutoff date (format: MM-DD-YYYY), at the latest today, by "
+            "default BOOKING_ARCHIVE_AFTER_DAYS days ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of bookings moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = get_archive_cutoff()
+        if options["before"]:
+            try:
+                cutoff = datetime.strptime(options["before"], "%m-%d-%Y").date()
+            except ValueError:
+                raise CommandError("The cutoff date must be in the MM-DD-YYYY format.")
+        # The bookings are archived without the delete signals, which would
+        # release their days in the availability bitmap: only the bookings
+        # that already ended can be archived
+        if cutoff > timezone.localdate():
+            raise CommandError("The cutoff date must not be after today.")
+
+        archived = archive_bookings(cutoff, options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {archived} bookings ending before {cutoff:%m-%d-%Y}."
+            )
+        )
@@ -0,0 +1,137 @@
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from bookings.importing import import_partition, init_worker, read_rows
+from properties.availability import rebuild_availability
+
+
+class Command(BaseCommand):
+    """
+    Imports bookings from a CSV or NDJSON file.
+
+    The file is streamed and its rows are partitioned by property, each
+    partition is priced and inserted with bulk_create by a process pool.
+    The pricing rules of each property are loaded once per worker, and at
+    most two partitions per worker are queued at a time.
+
+    Each partition is committed on its own: if a row is invalid, the rows
+    before it are still imported and the command stops with their number,
+    so only the rest of the file has to be imported again.
+    """
+
+    help = "Import bookings from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file with the bookings.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="Format of the file, guessed from its extension by default.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of processes, 0 imports in the current process.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows sent to a worker per partition and inserted per query.",
+        )
+        parser.add_argument(
+            "--buffer",
+            type=int,
+            default=100000,
+            help="Maximum number of rows buffered before dispatching partitions.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"File not found: {path}")
+        file_format = options["format"] or (
+            "csv" if path.suffix.lower() == ".csv" else "ndjson"
+        )
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+
+        started = time.monotonic()
+        pool = (
+            ProcessPoolExecutor(workers, initializer=init_worker) if workers else None
+        )
+        # Partitions queued for the pool, bounded so the file is not read
+        # faster than the workers insert it
+        pending = set()
+        max_pending = workers * 2
+        totals = {"inserted": 0, "skipped": 0}
+        property_ids = set()
+
+        def collect(futures):
+            for future in futures:
+                pending.discard(future)
+                record(future.result())
+
+        def record(result):
+            totals["inserted"] += result[0]
+            totals["skipped"] += result[1]
+
+        def dispatch(property_id, rows):
+            property_ids.add(property_id)
+            if pool is None:
+                record(import_partition(property_id, rows, batch_size))
+                return
+            if len(pending) >= max_pending:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            pending.add(pool.submit(import_partition, property_id, rows, batch_size))
+
+        partitions = defaultdict(list)
+        buffered = 0
+        read = 0
+        invalid = None
+        try:
+            try:
+                for row in read_rows(path, file_format):
+                    read += 1
+                    partition = partitions[row[0]]
+                    partition.append(row)
+                    buffered += 1
+                    if len(partition) >= batch_size:
+                        dispatch(row[0], partitions.pop(row[0]))
+                        buffered -= len(partition)
+                    elif buffered >= options["buffer"]:
+                        for property_id, rows in partitions.items():
+                            dispatch(property_id, rows)
+                        partitions.clear()
+                        buffered = 0
+            except (KeyError, ValueError) as error:
+                invalid = error
+            # The rows before an invalid one are imported too, so only the
+            # rest of the file has to be imported again once it is fixed
+            for property_id, rows in partitions.items():
+                dispatch(property_id, rows)
+            collect(list(pending))
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            # bulk_create does not send signals, so the bitmaps are rebuilt once here
+            for property_id in property_ids:
+                rebuild_availability(property_id)
+
+        if invalid is not None:
+            raise CommandError(
+                f"Invalid row {read + 1}: {invalid}. The {totals['inserted']} "
+                f"bookings of the {read} rows before it were imported, import "
+                "the rest of the file once fixed."
+            )
+        inserted, skipped = totals["inserted"], totals["skipped"]
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {inserted} bookings ({skipped} skipped) in {elapsed:.1f}s, "
+                f"{inserted / elapsed if elapsed else 0:.0f} rows/s."
+            )
+        )
@@ -0,0 +1,45 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from bookings.repricing import reprice_bookings
+
+
+class Command(BaseCommand):
+    """
+    Prices the upcoming bookings again with the current pricing rules and
+    base prices, recording the changed prices in the price history.
+    """
+
+    help = "Reprice the upcoming bookings with the current pricing rules."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--property",
+            type=int,
+            action="append",
+            help="ID of a property to reprice, can be repeated. By default "
+            "every property.",
+        )
+        parser.add_argument(
+            "--since",
+            help="Bookings starting before this date (format: MM-DD-YYYY) keep "
+            "their price, by default today.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of bookings read and written per batch.",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%m-%d-%Y").date()
+            except ValueError:
+                raise CommandError("The date must be in the MM-DD-YYYY format.")
+
+        repriced = reprice_bookings(
+            options["property"], since, batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Repriced {repriced} bookings."))
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0004_property_base_price_cents"),
+        ("bookings", "0004_booking_final_price_cents"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="booking",
+            name="end_date",
+            field=models.DateField(db_index=True),
+        ),
+        migrations.CreateModel(
+            name="ArchivedBooking",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField(db_index=True)),
+                ("stay_length", models.IntegerField(null=True)),
+                ("final_price_cents", models.IntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(null=True)),
+                ("updated_at", models.DateTimeField(null=True)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "property",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_bookings",
+                        to="properties.property",
+                    ),
+                ),
+            ],
+        ),
+    ]
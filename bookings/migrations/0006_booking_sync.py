@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_archivedbooking"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookingTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("booking_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="booking",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0006_booking_sync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booking",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["property", "start_date", "end_date"],
+                name="booking_active_stay_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at"],
+                name="booking_deleted_idx",
+            ),
+        ),
+    ]
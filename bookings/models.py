@@ -1,11 +1,15 @@
 from django.db import models
+from outbox.models import OutboxModel
+from reservations.money import hundredths_property
+from reservations.softdelete import ALIVE, DELETED, SoftDeleteModel
 
 
-class Booking(models.Model):
+class Booking(OutboxModel, SoftDeleteModel):
     """
     Model that represent a booking.
     A booking is done when a customer books a property for a given range of days.
     The booking model is also in charge of calculating the final price the customer will pay.
+    Deleting a booking only sets its deleted_at, see reservations.softdelete.
     """
 
     property = models.ForeignKey(
@@ -14,16 +18,89 @@ class Booking(models.Model):
     """property: The property this booking is for"""
     start_date = models.DateField(blank=False, null=False)
     """start_date: First day of the booking"""
-    end_date = models.DateField(blank=False, null=False)
+    end_date = models.DateField(blank=False, null=False, db_index=True)
     """end_date: Last date of the booking"""
     stay_length = models.IntegerField(blank=False, null=True)
     """stay_length: Days of stay """
-    final_price = models.FloatField(null=True, blank=True)
-    """final_price: Calculated final price"""
+    final_price_cents = models.IntegerField(null=True, blank=True)
+    """final_price_cents: Calculated final price, in cents"""
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=False)
     """created_at: Date of creation"""
-    updated_at = models.DateTimeField(auto_now=True, null=True, blank=False)
+    updated_at = models.DateTimeField(
+        auto_now=True, null=True, blank=False, db_index=True
+    )
     """updated_at: Date of update"""
 
+    final_price = hundredths_property(
+        "final_price_cents", "final_price: Calculated final price"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["property", "start_date", "end_date"],
+                condition=ALIVE,
+                name="booking_active_stay_idx",
+            ),
+            models.Index(
+                fields=["deleted_at"], condition=DELETED, name="booking_deleted_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.id} - {self.property.name} - {self.final_price}"
+
+
+class ArchivedBooking(models.Model):
+    """
+    Model that represents a booking moved out of the bookings table by the archival.
+    It keeps the ID and the values the booking had, so the list endpoint can
+    return it with the same serializer when a filter reaches back that far.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    """id: ID the booking had"""
+    property = models.ForeignKey(
+        "properties.Property",
+        blank=False,
+        null=False,
+        on_delete=models.CASCADE,
+        related_name="archived_bookings",
+    )
+    """property: The property this booking was for"""
+    start_date = models.DateField(blank=False, null=False)
+    """start_date: First day of the booking"""
+    end_date = models.DateField(blank=False, null=False, db_index=True)
+    """end_date: Last date of the booking"""
+    stay_length = models.IntegerField(blank=False, null=True)
+    """stay_length: Days of stay """
+    final_price_cents = models.IntegerField(null=True, blank=True)
+    """final_price_cents: Calculated final price, in cents"""
+    created_at = models.DateTimeField(null=True, blank=False)
+    """created_at: Date of creation of the booking"""
+    updated_at = models.DateTimeField(null=True, blank=False)
+    """updated_at: Date of the last update of the booking"""
+    archived_at = models.DateTimeField(auto_now_add=True)
+    """archived_at: Date the booking was archived"""
+
+    final_price = hundredths_property(
+        "final_price_cents", "final_price: Calculated final price"
+    )
+
+    def __str__(self):
+        return f"{self.id} - {self.property.name} - {self.final_price} (archived)"
+
+
+class BookingTombstone(models.Model):
+    """
+    Model that records the ID of a deleted booking, so the clients syncing
+    the bookings list with updated_since also learn about the deletions.
+    """
+
+    booking_id = models.BigIntegerField()
+    """booking_id: ID the deleted booking had"""
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    """deleted_at: Date of deletion"""
+
+    def __str__(self):
+        return f"{self.booking_id} - deleted at {self.deleted_at}"
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+from datetime import date
+from threading import Lock
+from typing import Any, Dict, Hashable
+from django.conf import settings
+from properties.availability import get_occupancy_bp
+from properties.models import Property
+from bookings.utils import (
+    calculate_final_price,
+    calculate_stay_length,
+    get_pricing_rules,
+)
+
+_MISSING = object()
+
+
+class QuoteCache:
+    """
+    Size bounded memoization of quotes, evicting the least recently used.
+
+    The keys include the rules version of the property, so a quote is never
+    served after the base price or the pricing rules of the property changed.
+
+    Attributes:
+        maxsize: Maximum number of quotes kept.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that had to calculate the price.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get a memoized value and mark it as recently used.
+
+        Args:
+            key (Hashable): The key of the quote.
+
+        Returns:
+            Any: The memoized value, or the _MISSING sentinel.
+        """
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Memoize a value, evicting the least recently used ones if full.
+
+        Args:
+            key (Hashable): The key of the quote.
+            value (Any): The value to memoize.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove every memoized value and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the cache.
+
+        Returns:
+            Dict[str, int]: The hits, misses, current size and maximum size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+quote_cache = QuoteCache(getattr(settings, "QUOTE_CACHE_SIZE", 10000))
+
+
+def get_quote(property: Property, start_date: date, end_date: date) -> Dict:
+    """
+    Get the price of a stay, memoized by property, dates, rules version and
+    occupancy around the stay.
+
+    Args:
+        property (Property): The property to quote.
+        start_date (date): First day of the stay.
+        end_date (date): Last day of the stay.
+
+    Returns:
+        Dict: The property ID, the dates, the stay length and the final price in cents.
+    """
+    stay_length = calculate_stay_length(start_date, end_date)
+    occupancy = get_occupancy_bp(property, start_date)
+    key = (property.pk, start_date, end_date, property.rules_version, occupancy)
+    final_price = quote_cache.get(key)
+    if final_price is _MISSING:
+        final_price = calculate_final_price(
+            get_pricing_rules(property),
+            start_date,
+            end_date,
+            stay_length,
+            property.base_price_cents,
+            occupancy,
+        )
+        quote_cache.set(key, final_price)
+
+    return {
+        "property": property.pk,
+        "start_date": start_date,
+        "end_date": end_date,
+        "stay_length": stay_length,
+        "final_price_cents": final_price,
+    }
@@ -0,0 +1,173 @@
+"""
+Revenue and occupancy reports computed by the database.
+
+Per property totals are a single aggregate over the filtered bookings. Per
+day, week or month totals expand each booking into its nights with a
+recursive CTE, each night carrying its exact share of the final price, and
+group the nights by their truncated date.
+"""
+
+from datetime import date
+from typing import Dict, List
+from django.db import NotSupportedError, connections
+from django.db.models import Count, QuerySet, Sum
+from reservations.money import divide_rounding, from_hundredths
+
+PERIODS = ("day", "week", "month")
+
+# Date arithmetic of each database vendor. Weeks start on Monday.
+PERIOD_SQL = {
+    "sqlite": {
+        "next_night": "date(night, '+1 day')",
+        "day": "night",
+        "week": "date(night, '-6 days', 'weekday 1')",
+        "month": "strftime('%%Y-%%m-01', night)",
+    },
+    "postgresql": {
+        "next_night": "night + 1",
+        "day": "night",
+        "week": "CAST(date_trunc('week', night) AS date)",
+        "month": "CAST(date_trunc('month', night) AS date)",
+    },
+}
+
+NIGHTS_SQL = """
+WITH RECURSIVE stays AS ({stays}),
+nights (property_id, night, end_date, nth, stay_length, price) AS (
+    SELECT property_id, start_date, end_date, 0, stay_length,
+        CAST(COALESCE(final_price_cents, 0) AS BIGINT)
+    FROM stays
+    WHERE stay_length > 0
+    UNION ALL
+    SELECT property_id, {next_night}, end_date, nth + 1, stay_length, price
+    FROM nights
+    WHERE night < end_date
+)
+SELECT property_id, {period} AS period, COUNT(*),
+    SUM(price * (nth + 1) / stay_length - price * nth / stay_length)
+FROM nights
+GROUP BY property_id, period
+ORDER BY property_id, period
+"""
+
+STAY_FIELDS = ("property_id", "start_date", "end_date", "stay_length")
+
+
+def format_row(property_id: int, nights: int, revenue: int, **extra) -> Dict:
+    """
+    Format a row of a report.
+
+    Args:
+        property_id (int): The property of the row.
+        nights (int): Nights sold.
+        revenue (int): Revenue in cents.
+        **extra: Other columns, for example the period.
+
+    Returns:
+        Dict: The row, with the revenue and the average daily rate as prices.
+    """
+    return {
+        "property": property_id,
+        **extra,
+        "nights": nights,
+        "revenue": from_hundredths(revenue),
+        "average_daily_rate": from_hundredths(
+            divide_rounding(revenue, nights) if nights else 0
+        ),
+    }
+
+
+def report_by_property(querysets: List[QuerySet]) -> List[Dict]:
+    """
+    Total the bookings, nights and revenue of each property.
+
+    Args:
+        querysets (List[QuerySet]): The filtered bookings, and archived
+            bookings if the filters reach the archive.
+
+    Returns:
+        List[Dict]: A row per property, ordered by property.
+    """
+    totals = {}
+    for queryset in querysets:
+        rows = (
+            queryset.order_by()
+            .values("property_id")
+            .annotate(
+                bookings=Count("id"),
+                nights=Sum("stay_length"),
+                revenue=Sum("final_price_cents"),
+            )
+        )
+        for row in rows:
+            total = totals.setdefault(row["property_id"], [0, 0, 0])
+            total[0] += row["bookings"]
+            total[1] += row["nights"] or 0
+            total[2] += row["revenue"] or 0
+    return [
+        format_row(property_id, nights, revenue, bookings=bookings)
+        for property_id, (bookings, nights, revenue) in sorted(totals.items())
+    ]
+
+
+def report_by_period(querysets: List[QuerySet], period: str) -> List[Dict]:
+    """
+    Total the nights sold and their revenue per property and period.
+    The final price of a booking is split between its nights so that the
+    shares add up exactly to the price.
+
+    Args:
+        querysets (List[QuerySet]): The filtered bookings, and archived
+            bookings if the filters reach the archive.
+        period (str): day, week or month.
+
+    Returns:
+        List[Dict]: A row per property and period with nights, ordered by
+        property and period. The period is the date of its first day.
+
+    Raises:
+        NotSupportedError: If the database has no date expansion SQL.
+    """
+    # The raw query runs on the database the router picked for the bookings
+    connection = connections[querysets[0].db]
+    vendor_sql = PERIOD_SQL.get(connection.vendor)
+    if vendor_sql is None:
+        raise NotSupportedError(f"Reports by {period} need SQLite or PostgreSQL.")
+
+    stays, params = [], []
+    for queryset in querysets:
+        sql, queryset_params = (
+            queryset.order_by()
+            .values(*STAY_FIELDS, "final_price_cents")
+            .query.sql_with_params()
+        )
+        stays.append(sql)
+        params.extend(queryset_params)
+    sql = NIGHTS_SQL.format(
+        stays=" UNION ALL ".join(stays),
+        next_night=vendor_sql["next_night"],
+        period=vendor_sql[period],
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        format_row(property_id, nights, revenue, period=format_period(value))
+        for property_id, value, nights, revenue in rows
+    ]
+
+
+def format_period(value) -> str:
+    """
+    Format the first day of a period like the other dates of the API.
+
+    Args:
+        value: The date, or its ISO 8601 string on SQLite.
+
+    Returns:
+        str: The date with the MM-DD-YYYY format.
+    """
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.strftime("%m-%d-%Y")
@@ -0,0 +1,142 @@
+"""
+Repricing of the upcoming bookings after their pricing rules or base price
+changed.
+
+The bookings of a property are priced again in batches with the current
+rules, and only those whose final price changed are written: one bulk
+update of the bookings, one bulk insert of their price history entries and
+one of their outbox events per batch.
+"""
+
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+from django.db import transaction
+from django.utils import timezone
+from bookings.models import Booking
+from bookings.utils import (
+    calculate_final_price,
+    calculate_stay_length,
+    get_pricing_rules,
+)
+from history.changes import build_change, record_changes
+from history.models import PriceChange
+from outbox.models import OutboxEvent
+from outbox.signals import get_payload
+from properties.availability import get_occupancy_bp
+from properties.models import Property
+
+
+def price_booking(property: Property, pricing_rules: List, booking: Booking) -> int:
+    """
+    Price an existing booking with the current rules and base price of its
+    property. Its own days are left out of the occupancy, as when it was made.
+
+    Args:
+        property (Property): The property of the booking.
+        pricing_rules (List): The rules of the property, see get_pricing_rules.
+        booking (Booking): The booking to price.
+
+    Returns:
+        int: The final price in cents.
+    """
+    return calculate_final_price(
+        pricing_rules,
+        booking.start_date,
+        booking.end_date,
+        booking.stay_length
+        or calculate_stay_length(booking.start_date, booking.end_date),
+        property.base_price_cents,
+        get_occupancy_bp(
+            property, booking.start_date, exclude=(booking.start_date, booking.end_date)
+        ),
+    )
+
+
+def save_prices(repriced: List[Tuple[Booking, int]]) -> int:
+    """
+    Write the new final prices of a batch of bookings, with their price
+    history entries and outbox events, in one transaction.
+
+    Args:
+        repriced (List[Tuple[Booking, int]]): The bookings and their new price.
+
+    Returns:
+        int: The number of repriced bookings.
+    """
+    if not repriced:
+        return 0
+    now = timezone.now()
+    changes = []
+    for booking, final_price in repriced:
+        changes.append(
+            build_change(
+                Booking,
+                booking.pk,
+                {"final_price_cents": booking.final_price_cents},
+                {"final_price_cents": final_price},
+                PriceChange.REPRICED,
+                now,
+            )
+        )
+        booking.final_price_cents = final_price
+        booking.updated_at = now
+
+    bookings = [booking for booking, _ in repriced]
+    with transaction.atomic():
+        Booking.objects.bulk_update(bookings, ["final_price_cents", "updated_at"])
+        record_changes(changes)
+        OutboxEvent.objects.bulk_create(
+            OutboxEvent(
+                model=Booking._meta.model_name,
+                object_id=booking.pk,
+                operation=OutboxEvent.UPDATED,
+                payload=get_payload(booking),
+            )
+            for booking in bookings
+        )
+    return len(repriced)
+
+
+def reprice_bookings(
+    property_ids: Optional[Iterable[int]] = None,
+    since: Optional[date] = None,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Price again the bookings starting from a date with the current rules.
+
+    Args:
+        property_ids (Optional[Iterable[int]]): The properties whose bookings
+            are repriced, by default every property.
+        since (Optional[date]): Bookings starting before this date keep their
+            price, by default the current date.
+        batch_size (int): Number of bookings read and written per batch.
+
+    Returns:
+        int: The number of bookings whose final price changed.
+    """
+    since = since or timezone.localdate()
+    properties = Property.objects.order_by("pk")
+    if property_ids is not None:
+        properties = properties.filter(pk__in=list(property_ids))
+
+    repriced = 0
+    for property in properties.iterator():
+        pricing_rules = get_pricing_rules(property)
+        last_pk = 0
+        while True:
+            batch = list(
+                Booking.objects.filter(
+                    property=property, start_date__gte=since, pk__gt=last_pk
+                ).order_by("pk")[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for booking in batch:
+                final_price = price_booking(property, pricing_rules, booking)
+                if final_price != booking.final_price_cents:
+                    changed.append((booking, final_price))
+            repriced += save_prices(changed)
+    return repriced
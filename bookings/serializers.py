@@ -1,5 +1,11 @@
+from typing import Optional
 from rest_framework import serializers
 from bookings.models import Booking
+from bookings.reports import PERIODS
+from currencies.rates import get_fx_table
+from properties.models import Property
+from reservations.money import HundredthsField
+from reservations.renderers import CompactDateField, CompactDateTimeField
 
 
 class BookingSerializer(serializers.ModelSerializer):
@@ -8,8 +14,13 @@ class BookingSerializer(serializers.ModelSerializer):
     The start date and end date of the booking (format: MM-DD-YYYY).
     """
 
-    start_date = serializers.DateField(format="%m-%d-%Y", required=False)
-    end_date = serializers.DateField(format="%m-%d-%Y", required=False)
+    start_date = CompactDateField(format="%m-%d-%Y", required=False)
+    end_date = CompactDateField(format="%m-%d-%Y", required=False)
+    final_price = HundredthsField(
+        source="final_price_cents", required=False, allow_null=True
+    )
+    created_at = CompactDateTimeField(read_only=True)
+    updated_at = CompactDateTimeField(read_only=True)
 
     class Meta:
         model = Booking
@@ -23,3 +34,79 @@ class BookingSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+
+
+class PriceHistorySerializer(serializers.Serializer):
+    """
+    Serializer for the final price of a booking at each point of its history.
+    The first entry is the price the booking was created with.
+    """
+
+    changed_at = serializers.DateTimeField()
+    reason = serializers.CharField()
+    final_price = HundredthsField(source="final_price_cents", allow_null=True)
+
+
+def validate_currency(currency: Optional[str]) -> None:
+    """
+    Checks that prices can be converted to a requested currency.
+
+    Args:
+        currency: The ISO 4217 code of the currency, None if not requested.
+
+    Raises:
+        serializers.ValidationError: If the currency has no exchange rate.
+    """
+    if currency is not None and not get_fx_table().knows(currency):
+        raise serializers.ValidationError(
+            {"currency": f"There is no exchange rate for {currency}."}
+        )
+
+
+class QuoteSerializer(serializers.Serializer):
+    """
+    Serializer for the price quote of a stay.
+    The start date and end date of the stay (format: MM-DD-YYYY).
+    The final price is in the currency of the property, or in the requested
+    currency.
+    """
+
+    property = serializers.PrimaryKeyRelatedField(queryset=Property.objects.all())
+    start_date = serializers.DateField(format="%m-%d-%Y")
+    end_date = serializers.DateField(format="%m-%d-%Y")
+    stay_length = serializers.IntegerField(read_only=True)
+    final_price = HundredthsField(source="final_price_cents", read_only=True)
+    currency = serializers.CharField(max_length=3, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Checks that the stay has valid dates and the property has a base price.
+
+        Args:
+            attrs: The validated query parameters.
+
+        Returns:
+            The validated query parameters.
+        """
+        if attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError(
+                {"end_date": "The end date must be on or after the start date."}
+            )
+        if attrs["property"].base_price is None:
+            raise serializers.ValidationError(
+                {"property": "The property does not have a base price."}
+            )
+        validate_currency(attrs.get("currency"))
+        return attrs
+
+    def validate_currency(self, value: str) -> str:
+        return value.upper()
+
+
+class ReportSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the revenue report.
+    Without a period the report is grouped by property only.
+    """
+
+    period = serializers.ChoiceField(choices=PERIODS, required=False)
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from bookings.events import broker
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+from properties.availability import mark_booked, rebuild_availability
+
+
+@receiver(pre_save, sender=Booking)
+def remember_previous_property(sender, instance: Booking, **kwargs) -> None:
+    """
+    Remember the property an existing booking belonged to before saving it,
+    so the availability of both properties can be refreshed if it changed.
+    """
+    instance._previous_property_id = None
+    if instance.pk and not kwargs.get("raw"):
+        instance._previous_property_id = (
+            Booking.objects.filter(pk=instance.pk)
+            .values_list("property_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Booking)
+def update_availability_on_save(
+    sender, instance: Booking, created: bool, **kwargs
+) -> None:
+    """
+    Keep the availability bitmap of the booked property up to date.
+    New bookings only set their bits, updates rebuild the bitmap.
+    """
+    if kwargs.get("raw"):
+        return
+    if created:
+        mark_booked(instance.property_id, instance.start_date, instance.end_date)
+        return
+
+    rebuild_availability(instance.property_id)
+    previous_property_id = getattr(instance, "_previous_property_id", None)
+    if previous_property_id and previous_property_id != instance.property_id:
+        rebuild_availability(previous_property_id)
+
+
+@receiver(post_delete, sender=Booking)
+def update_availability_on_delete(sender, instance: Booking, **kwargs) -> None:
+    """
+    Release the days of a deleted booking in the availability bitmap.
+    """
+    rebuild_availability(instance.property_id)
+
+
+@receiver(post_save, sender=Booking)
+def publish_saved_booking(sender, instance: Booking, created: bool, **kwargs) -> None:
+    """
+    Publish the created or updated booking to the event stream once committed.
+    """
+    if kwargs.get("raw"):
+        return
+    data = dict(BookingSerializer(instance).data)
+    event_type = "created" if created else "updated"
+    transaction.on_commit(lambda: broker.publish(event_type, data))
+
+
+@receiver(post_delete, sender=Booking)
+def publish_deleted_booking(sender, instance: Booking, **kwargs) -> None:
+    """
+    Publish the ID of the deleted booking to the event stream once committed.
+    """
+    data = {"id": instance.pk, "property": instance.property_id}
+    transaction.on_commit(lambda: broker.publish("deleted", data))
@@ -0,0 +1,165 @@
+"""
+Server-sent event stream of the booking changes.
+
+It is a plain ASGI application mounted by reservations.asgi in front of
+Django, so each consumer is a cheap coroutine instead of a worker thread.
+"""
+
+import asyncio
+from typing import Callable, Optional, Tuple
+from urllib.parse import parse_qs
+from bookings.events import BookingEvent, broker
+
+EVENTS_PATH = "/bookings/events/"
+KEEPALIVE_SECONDS = 15
+
+
+def format_event(event: BookingEvent) -> bytes:
+    """
+    Encode an event in the text/event-stream format.
+
+    Args:
+        event (BookingEvent): The event to send.
+
+    Returns:
+        bytes: The encoded event.
+    """
+    event_id = f"{event.epoch}-{event.id}"
+    return f"id: {event_id}\nevent: {event.type}\ndata: {event.data}\n\n".encode()
+
+
+def format_resync(epoch: str, last_id: int) -> bytes:
+    """
+    Encode the event telling a consumer that the events it missed are lost,
+    so it fetches the bookings changed since then with updated_since. Its ID
+    resumes the stream from the current event.
+
+    Args:
+        epoch (str): The epoch of the broker.
+        last_id (int): The ID of the last published event.
+
+    Returns:
+        bytes: The encoded event.
+    """
+    return f"id: {epoch}-{last_id}\nevent: resync\ndata: {{}}\n\n".encode()
+
+
+def get_last_event_id(scope: dict) -> Optional[Tuple[str, int]]:
+    """
+    Get the ID of the last event a reconnecting consumer received, from the
+    Last-Event-ID header or the last_event_id query parameter.
+
+    Args:
+        scope (dict): The ASGI connection scope.
+
+    Returns:
+        Optional[Tuple[str, int]]: The epoch and number of the event, with
+        an empty epoch if the ID has none, None for a new consumer.
+    """
+    headers = dict(scope.get("headers", []))
+    value = headers.get(b"last-event-id", b"").decode()
+    if not value:
+        query = parse_qs(scope.get("query_string", b"").decode())
+        value = query.get("last_event_id", [""])[0]
+    epoch, _, number = value.rpartition("-")
+    return (epoch, int(number)) if number.isdigit() else None
+
+
+async def wait_for_disconnect(receive: Callable) -> None:
+    """
+    Wait until the consumer closes the connection.
+    """
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def booking_events_app(scope: dict, receive: Callable, send: Callable) -> None:
+    """
+    Stream the booking created, updated and deleted events to a consumer.
+
+    New consumers get the events published from now on. Consumers sending
+    Last-Event-ID first get the buffered events they missed. If the ID comes
+    from another process, or a previous run of this one, the events it
+    missed are unknown: the consumer gets a resync event instead.
+
+    Args:
+        scope (dict): The ASGI connection scope.
+        receive (Callable): The ASGI receive channel.
+        send (Callable): The ASGI send channel.
+    """
+    if scope["method"] != "GET":
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 405,
+                "headers": [(b"allow", b"GET")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    last_event_id = get_last_event_id(scope)
+    resync = last_event_id is not None and (
+        last_event_id[0] != broker.epoch or last_event_id[1] > broker.last_id
+    )
+    if last_event_id is None or resync:
+        last_id = broker.last_id
+    else:
+        last_id = last_event_id[1]
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+    await send(
+        {"type": "http.response.body", "body": b"retry: 3000\n\n", "more_body": True}
+    )
+    if resync:
+        await send(
+            {
+                "type": "http.response.body",
+                "body": format_resync(broker.epoch, last_id),
+                "more_body": True,
+            }
+        )
+
+    wakeup = broker.subscribe()
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        while not disconnect.done():
+            wakeup.clear()
+            for event in broker.events_after(last_id):
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": format_event(event),
+                        "more_body": True,
+                    }
+                )
+                last_id = event.id
+
+            waiter = asyncio.ensure_future(wakeup.wait())
+            done, _ = await asyncio.wait(
+                {waiter, disconnect},
+                timeout=KEEPALIVE_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            waiter.cancel()
+            if not done:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": b": keepalive\n\n",
+                        "more_body": True,
+                    }
+                )
+    finally:
+        broker.unsubscribe(wakeup)
+        disconnect.cancel()
@@ -0,0 +1,57 @@
+import math
+import time
+from datetime import datetime
+from typing import List, Optional
+from django.db.models import Max
+from bookings.models import Booking, BookingTombstone
+
+
+def get_last_modified() -> Optional[datetime]:
+    """
+    Get the last time a booking was created, updated or deleted.
+    Both maxima are read from indexed columns. The date is global rather
+    than that of a filtered list: a booking updated out of the filters
+    changes the list too, without leaving a newer updated_at in it.
+
+    Returns:
+        Optional[datetime]: The date of the last change, None if there were none.
+    """
+    updated_at = Booking.objects.aggregate(last=Max("updated_at"))["last"]
+    deleted_at = BookingTombstone.objects.aggregate(last=Max("deleted_at"))["last"]
+    changes = [moment for moment in (updated_at, deleted_at) if moment is not None]
+    return max(changes) if changes else None
+
+
+def get_last_modified_header(last_modified: datetime) -> Optional[int]:
+    """
+    Get the Last-Modified timestamp of the bookings list.
+    HTTP dates have a precision of one second, so the date of the last
+    change is rounded up to the next second, and only sent once that second
+    is over: any later change is then strictly after the timestamp, and a
+    conditional request is never answered with a 304 that hides it.
+
+    Args:
+        last_modified (datetime): The date of the last change.
+
+    Returns:
+        Optional[int]: The timestamp to send, None while it is in the future.
+    """
+    timestamp = math.floor(last_modified.timestamp()) + 1
+    return timestamp if time.time() >= timestamp else None
+
+
+def get_deleted_ids(since: datetime) -> List[int]:
+    """
+    Get the IDs of the bookings deleted after a moment.
+
+    Args:
+        since (datetime): Only deletions after this moment are returned.
+
+    Returns:
+        List[int]: The IDs of the deleted bookings, in deletion order.
+    """
+    return list(
+        BookingTombstone.objects.filter(deleted_at__gt=since)
+        .order_by("deleted_at", "pk")
+        .values_list("booking_id", flat=True)
+    )
@@ -1,8 +1,34 @@
-from datetime import datetime as d
+import asyncio
+import io
+import json
+import tempfile
+import time
+from datetime import date, datetime as d, timedelta
+from pathlib import Path
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
 from django.urls import reverse
-from bookings.utils import create_property_with_rules
+from django.utils import timezone
+from django.utils.http import http_date
+from bookings.events import EventBroker, broker
+from bookings.streams import booking_events_app, format_event, format_resync
+from bookings.models import ArchivedBooking, Booking, BookingTombstone
+from outbox.models import OutboxEvent
+from bookings.quotes import QuoteCache, quote_cache
+from bookings.utils import calculate_final_price, create_property_with_rules
+from pricing_rules.models import PricingRule
+from properties.availability import decode_bitmap, get_occupancy_bp
+from properties.calendar import booked_runs
+from properties.models import Property
+from reservations.throttling import (
+    CacheConcurrencyLimiter,
+    booking_writes,
+    get_bucket_store,
+    refill,
+)
 
 
 class BookingCreateTestCase(APITestCase):
@@ -194,7 +220,7 @@ class BookingCreateTestCase(APITestCase):
     def test_create_booking_case_3_without_discount_1_day(self):
         """
         Test case for creating a booking without any discount applied.
-        In this case only 1 day of stay is tested. 
+        In this case only 1 day of stay is tested.
         """
         booking_data = {"property": self.property_three.pk}
         booking_data.update(self.START_01_01_2022_END_01_01_2022)
@@ -318,3 +344,1083 @@ class BookingCreateTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data["final_price"], 114)
         self.assertEqual(response.data["stay_length"], 10)
+
+    def test_filter_bookings_by_final_price(self):
+        """
+        Test that the final price filters accept decimals and compare exactly.
+        """
+        booking_data = {"property": self.property_five.pk}
+        booking_data.update(self.START_01_01_2022_END_01_03_2022)
+        self.client.post(self.list_url, booking_data, format="json")
+
+        response = self.client.get(self.list_url, {"final_price": 30.3})
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get(self.list_url, {"final_price__gt": 30.3})
+        self.assertEqual(len(response.data), 0)
+
+
+class PropertyAvailabilityTestCase(APITestCase):
+    """
+    Test case for the availability bitmap kept up to date by the bookings
+    and the property search that reads it.
+    """
+
+    def setUp(self):
+        self.list_url = reverse("booking-list")
+        self.search_url = reverse("property-search")
+        self.today = timezone.localdate()
+        self.cheap = Property.objects.create(name="Cheap House", base_price=10.0)
+        self.expensive = Property.objects.create(name="Big House", base_price=50.0)
+
+    def format_day(self, days: int) -> str:
+        return (self.today + timedelta(days=days)).strftime("%m-%d-%Y")
+
+    def book(self, property: Property, start: int, end: int):
+        return self.client.post(
+            self.list_url,
+            {
+                "property": property.pk,
+                "start_date": self.format_day(start),
+                "end_date": self.format_day(end),
+            },
+            format="json",
+        )
+
+    def search(self, start: int, end: int, **filters) -> list:
+        params = {
+            "start_date": self.format_day(start),
+            "end_date": self.format_day(end),
+        }
+        params.update(filters)
+        response = self.client.get(self.search_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data]
+
+    def test_booking_sets_availability_bits(self):
+        """
+        Test that creating a booking sets one bit per booked day.
+        """
+        self.book(self.cheap, 2, 4)
+        self.cheap.refresh_from_db()
+        self.assertEqual(self.cheap.availability_start, self.today)
+        self.assertEqual(decode_bitmap(self.cheap.availability), 0b11100)
+
+    def test_search_excludes_booked_properties(self):
+        """
+        Test that a property is only listed when the whole range is free.
+        """
+        self.book(self.cheap, 5, 9)
+        self.assertEqual(self.search(0, 4), [self.cheap.pk, self.expensive.pk])
+        self.assertEqual(self.search(3, 6), [self.expensive.pk])
+        self.assertEqual(self.search(10, 12), [self.cheap.pk, self.expensive.pk])
+
+    def test_search_filters_base_price(self):
+        """
+        Test that the property filters are applied along with the dates.
+        """
+        self.assertEqual(self.search(0, 2, base_price__lt=20), [self.cheap.pk])
+
+    def test_search_outside_horizon_checks_bookings(self):
+        """
+        Test that ranges outside the bitmap horizon fall back to the bookings.
+        """
+        self.book(self.cheap, 400, 401)
+        self.book(self.expensive, 1, 1)
+        self.assertEqual(self.search(399, 402), [self.expensive.pk])
+
+    def test_delete_booking_releases_days(self):
+        """
+        Test that deleting a booking makes its days available again.
+        """
+        response = self.book(self.cheap, 1, 3)
+        detail_url = reverse("booking-detail", kwargs={"pk": response.data["id"]})
+        self.client.delete(detail_url)
+        self.assertEqual(self.search(1, 3), [self.cheap.pk, self.expensive.pk])
+
+    def test_save_stale_property_keeps_bookings(self):
+        """
+        Test that saving a property loaded before a booking keeps its days.
+        """
+        stale = Property.objects.get(pk=self.cheap.pk)
+        self.book(self.cheap, 2, 4)
+        stale.name = "Renamed House"
+        stale.save()
+        self.cheap.refresh_from_db()
+        self.assertEqual(self.cheap.name, "Renamed House")
+        self.assertEqual(decode_bitmap(self.cheap.availability), 0b11100)
+        self.assertEqual(self.search(2, 4), [self.expensive.pk])
+
+    def test_search_requires_dates(self):
+        response = self.client.get(self.search_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QuoteTestCase(APITestCase):
+    """
+    Test case for the memoized quotes of a stay.
+    """
+
+    def setUp(self):
+        self.quote_url = reverse("booking-quote")
+        self.stats_url = reverse("booking-quote-stats")
+        self.property = create_property_with_rules(
+            property_data={"name": "House Case 1", "base_price": 10.0},
+            rules_data=[{"min_stay_length": 7, "price_modifier": -10.0}],
+        )
+        self.params = {
+            "property": self.property.pk,
+            "start_date": "01-01-2022",
+            "end_date": "01-10-2022",
+        }
+        quote_cache.clear()
+
+    def test_quote(self):
+        """
+        Test that the quote uses the same pricing as the bookings.
+        """
+        response = self.client.get(self.quote_url, self.params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["final_price"], 90)
+        self.assertEqual(response.data["stay_length"], 10)
+        self.assertEqual(response.data["start_date"], "01-01-2022")
+
+    def test_repeated_quote_is_a_hit(self):
+        """
+        Test that the same quote is only calculated once.
+        """
+        self.client.get(self.quote_url, self.params)
+        self.client.get(self.quote_url, self.params)
+        stats = self.client.get(self.stats_url).data
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_rule_change_invalidates_quote(self):
+        """
+        Test that a new pricing rule is used by the next quote.
+        """
+        self.client.get(self.quote_url, self.params)
+        PricingRule.objects.create(
+            property=self.property, min_stay_length=10, price_modifier=-20.0
+        )
+        response = self.client.get(self.quote_url, self.params)
+        self.assertEqual(response.data["final_price"], 80)
+
+    def test_base_price_change_invalidates_quote(self):
+        """
+        Test that a new base price is used by the next quote.
+        """
+        self.client.get(self.quote_url, self.params)
+        self.property.base_price = 20.0
+        self.property.save()
+        response = self.client.get(self.quote_url, self.params)
+        self.assertEqual(response.data["final_price"], 180)
+
+    def test_save_keeps_concurrent_rules_version(self):
+        """
+        Test that saving a property loaded before a rule change does not
+        write back its previous rules version.
+        """
+        stale = Property.objects.get(pk=self.property.pk)
+        PricingRule.objects.create(
+            property=self.property, min_stay_length=10, price_modifier=-20.0
+        )
+        version = Property.objects.get(pk=self.property.pk).rules_version
+        stale.name = "Renamed"
+        stale.save()
+        self.assertEqual(
+            Property.objects.get(pk=self.property.pk).rules_version, version
+        )
+
+    def test_moved_rule_invalidates_quote(self):
+        """
+        Test that moving a pricing rule to another property invalidates the
+        quotes of the property it left.
+        """
+        self.client.get(self.quote_url, self.params)
+        other = Property.objects.create(name="Other", base_price=10.0)
+        rule = PricingRule.objects.get(property=self.property)
+        rule.property = other
+        rule.save()
+        response = self.client.get(self.quote_url, self.params)
+        self.assertEqual(response.data["final_price"], 100)
+
+    def test_quote_cache_eviction(self):
+        """
+        Test that the least recently used quote is evicted when full.
+        """
+        cache = QuoteCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNot(cache.get("b"), 2)
+
+    def test_invalid_quote(self):
+        params = dict(self.params, end_date="12-31-2021")
+        response = self.client.get(self.quote_url, params)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ImportBookingsTestCase(APITestCase):
+    """
+    Test case for the import_bookings management command.
+    """
+
+    def setUp(self):
+        self.property = create_property_with_rules(
+            property_data={"name": "House Case 1", "base_price": 10.0},
+            rules_data=[{"min_stay_length": 7, "price_modifier": -10.0}],
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name: str, content: str) -> str:
+        path = Path(self.directory.name) / name
+        path.write_text(content)
+        return str(path)
+
+    def test_import_csv(self):
+        """
+        Test that the imported bookings are priced like the created ones.
+        """
+        path = self.write(
+            "bookings.csv",
+            "property,start_date,end_date\n"
+            f"{self.property.pk},01-01-2022,01-10-2022\n"
+            f"{self.property.pk},2022-01-01,2022-01-03\n"
+            "999,01-01-2022,01-03-2022\n",
+        )
+        call_command("import_bookings", path, workers=0, stdout=io.StringIO())
+        bookings = Booking.objects.order_by("start_date", "stay_length")
+        self.assertEqual(
+            [(b.stay_length, b.final_price) for b in bookings], [(3, 30), (10, 90)]
+        )
+
+    def test_import_writes_outbox_events(self):
+        path = self.write(
+            "bookings.csv",
+            "property,start_date,end_date\n"
+            f"{self.property.pk},01-01-2022,01-10-2022\n"
+            f"{self.property.pk},2022-01-01,2022-01-03\n",
+        )
+        OutboxEvent.objects.all().delete()
+        call_command("import_bookings", path, workers=0, stdout=io.StringIO())
+        events = OutboxEvent.objects.order_by("object_id")
+        booking_ids = Booking.objects.order_by("pk").values_list("pk", flat=True)
+        self.assertEqual(
+            [(event.object_id, event.operation) for event in events],
+            [(pk, OutboxEvent.CREATED) for pk in booking_ids],
+        )
+        self.assertEqual(events[0].payload["property_id"], self.property.pk)
+
+    def test_import_ndjson(self):
+        path = self.write(
+            "bookings.ndjson",
+            json.dumps(
+                {
+                    "property": self.property.pk,
+                    "start_date": "01-01-2022",
+                    "end_date": "01-10-2022",
+                }
+            )
+            + "\n",
+        )
+        call_command("import_bookings", path, workers=0, stdout=io.StringIO())
+        self.assertEqual(Booking.objects.get().final_price, 90)
+
+    def test_import_invalid_row(self):
+        path = self.write("bookings.csv", "property,start_date\n1,01-01-2022\n")
+        with self.assertRaises(CommandError):
+            call_command("import_bookings", path, workers=0, stdout=io.StringIO())
+
+    def test_import_stops_at_reversed_dates(self):
+        """
+        Test that a stay ending before it starts is rejected, and that the
+        rows before it are imported.
+        """
+        path = self.write(
+            "bookings.csv",
+            "property,start_date,end_date\n"
+            f"{self.property.pk},01-01-2022,01-03-2022\n"
+            f"{self.property.pk},01-10-2022,01-01-2022\n"
+            f"{self.property.pk},02-01-2022,02-03-2022\n",
+        )
+        with self.assertRaisesMessage(CommandError, "Invalid row 2"):
+            call_command("import_bookings", path, workers=0, stdout=io.StringIO())
+        self.assertEqual(
+            list(Booking.objects.values_list("stay_length", flat=True)), [3]
+        )
+        self.assertTrue(Property.objects.get(pk=self.property.pk).availability)
+
+
+class ArchiveBookingsTestCase(APITestCase):
+    """
+    Test case for the archival of old bookings and the list that reads them.
+    """
+
+    def setUp(self):
+        self.list_url = reverse("booking-list")
+        self.property = Property.objects.create(name="House", base_price=10.0)
+        self.old = Booking.objects.create(
+            property=self.property,
+            start_date=date(2019, 1, 1),
+            end_date=date(2019, 1, 3),
+            stay_length=3,
+            final_price=30,
+        )
+        self.recent = Booking.objects.create(
+            property=self.property,
+            start_date=date(2022, 1, 1),
+            end_date=date(2022, 1, 3),
+            stay_length=3,
+            final_price=30,
+        )
+        call_command("archive_bookings", before="01-01-2020", stdout=io.StringIO())
+
+    def list_ids(self, **filters) -> list:
+        response = self.client.get(self.list_url, filters)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [booking["id"] for booking in response.data]
+
+    def test_archive_moves_old_bookings(self):
+        """
+        Test that only the bookings ending before the cutoff are moved.
+        """
+        self.assertFalse(Booking.objects.filter(pk=self.old.pk).exists())
+        archived = ArchivedBooking.objects.get()
+        self.assertEqual(archived.pk, self.old.pk)
+        self.assertEqual(archived.final_price, 30)
+
+    def test_archive_records_deletions(self):
+        """
+        Test that the archived bookings are reported as deleted to the
+        clients syncing the list and to the outbox.
+        """
+        self.assertEqual(
+            list(BookingTombstone.objects.values_list("booking_id", flat=True)),
+            [self.old.pk],
+        )
+        self.assertTrue(
+            OutboxEvent.objects.filter(
+                model="booking",
+                object_id=self.old.pk,
+                operation=OutboxEvent.DELETED,
+            ).exists()
+        )
+
+    def test_archive_publishes_deletions(self):
+        booking = Booking.objects.create(
+            property=self.property,
+            start_date=date(2019, 2, 1),
+            end_date=date(2019, 2, 3),
+            stay_length=3,
+            final_price=30,
+        )
+        last_id = broker.last_id
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_bookings", before="01-01-2020", stdout=io.StringIO())
+        events = broker.events_after(last_id)
+        self.assertEqual([event.type for event in events], ["deleted"])
+        self.assertEqual(json.loads(events[0].data)["id"], booking.pk)
+
+    def test_archive_rejects_future_cutoff(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with self.assertRaisesMessage(CommandError, "must not be after today"):
+            call_command(
+                "archive_bookings",
+                before=tomorrow.strftime("%m-%d-%Y"),
+                stdout=io.StringIO(),
+            )
+        self.assertTrue(Booking.objects.filter(pk=self.recent.pk).exists())
+
+    def test_list_without_dates_skips_archive(self):
+        self.assertEqual(self.list_ids(), [self.recent.pk])
+
+    def test_list_reaching_back_includes_archive(self):
+        """
+        Test that the archive is read when the date range reaches back to it.
+        """
+        self.assertEqual(
+            self.list_ids(end_date__lt="01-01-2023"), [self.old.pk, self.recent.pk]
+        )
+        self.assertEqual(self.list_ids(start_date="01-01-2019"), [self.old.pk])
+
+    def test_list_after_archive_skips_archive(self):
+        self.assertEqual(self.list_ids(start_date__gt="06-01-2021"), [self.recent.pk])
+
+
+class BookingSyncTestCase(APITestCase):
+    """
+    Test case for the conditional GET and delta sync of the bookings list.
+    """
+
+    def setUp(self):
+        self.list_url = reverse("booking-list")
+        self.property = Property.objects.create(name="House", base_price=10.0)
+        self.booking = self.create_booking()
+
+    def create_booking(self) -> Booking:
+        return Booking.objects.create(
+            property=self.property,
+            start_date=date(2022, 1, 1),
+            end_date=date(2022, 1, 3),
+            stay_length=3,
+            final_price=30,
+        )
+
+    def test_not_modified(self):
+        """
+        Test that an idle poll gets a 304 without a body.
+        """
+        Booking.objects.filter(pk=self.booking.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=1)
+        )
+        response = self.client.get(self.list_url)
+        last_modified = response["Last-Modified"]
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_change_in_same_second_is_modified(self):
+        """
+        Test that a change in the second given as If-Modified-Since is never
+        answered with a 304.
+        """
+        updated_at = timezone.now().replace(microsecond=500000)
+        Booking.objects.filter(pk=self.booking.pk).update(updated_at=updated_at)
+        since = http_date(int(updated_at.timestamp()))
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_no_last_modified_during_change_second(self):
+        Booking.objects.filter(pk=self.booking.pk).update(
+            updated_at=timezone.now() + timedelta(minutes=1)
+        )
+        response = self.client.get(self.list_url)
+        self.assertNotIn("Last-Modified", response)
+
+    def test_modified_after_delete(self):
+        """
+        Test that a deletion counts as a change for If-Modified-Since.
+        """
+        since = http_date(time.time() - 10)
+        Booking.objects.filter(pk=self.booking.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=1)
+        )
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.delete(reverse("booking-detail", kwargs={"pk": self.booking.pk}))
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_updated_since(self):
+        """
+        Test that a delta only has the changed bookings and the deleted IDs.
+        """
+        since = timezone.now()
+        new_booking = self.create_booking()
+        deleted = self.create_booking()
+        self.client.delete(reverse("booking-detail", kwargs={"pk": deleted.pk}))
+
+        response = self.client.get(self.list_url, {"updated_since": since.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [booking["id"] for booking in response.data["results"]], [new_booking.pk]
+        )
+        self.assertEqual(response.data["deleted"], [deleted.pk])
+
+
+class BookingEventsTestCase(APITestCase):
+    """
+    Test case for the server-sent event stream of the booking changes.
+    """
+
+    def setUp(self):
+        self.property = Property.objects.create(name="House", base_price=10.0)
+
+    def test_broker_replays_after_last_event_id(self):
+        """
+        Test that only the buffered events after the given ID are replayed.
+        """
+        events_broker = EventBroker(maxlen=2)
+        for number in range(3):
+            events_broker.publish("created", {"id": number})
+        self.assertEqual([e.id for e in events_broker.events_after(0)], [2, 3])
+        self.assertEqual([e.id for e in events_broker.events_after(2)], [3])
+
+    def test_booking_changes_are_published(self):
+        """
+        Test that creating and deleting a booking publish events once committed.
+        """
+        last_id = broker.last_id
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("booking-list"),
+                {
+                    "property": self.property.pk,
+                    "start_date": "01-01-2022",
+                    "end_date": "01-03-2022",
+                },
+                format="json",
+            )
+        booking_id = response.data["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse("booking-detail", kwargs={"pk": booking_id}))
+
+        events = broker.events_after(last_id)
+        self.assertEqual([event.type for event in events], ["created", "deleted"])
+        self.assertEqual(json.loads(events[0].data)["id"], booking_id)
+
+    def test_stream_sends_missed_events(self):
+        """
+        Test that a consumer reconnecting with Last-Event-ID gets what it missed.
+        """
+        first = broker.publish("created", {"id": 1})
+        second = broker.publish("deleted", {"id": 1})
+
+        async def consume():
+            sent = []
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                sent.append(message)
+                if format_event(second) == message.get("body"):
+                    disconnected.set()
+
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": "/bookings/events/",
+                "headers": [
+                    (b"last-event-id", f"{broker.epoch}-{first.id - 1}".encode())
+                ],
+            }
+            await asyncio.wait_for(booking_events_app(scope, receive, send), 5)
+            return sent
+
+        sent = asyncio.run(consume())
+        self.assertEqual(sent[0]["status"], 200)
+        bodies = [message.get("body") for message in sent[1:]]
+        self.assertIn(format_event(first), bodies)
+        self.assertIn(format_event(second), bodies)
+
+    def test_stream_resyncs_unknown_event_id(self):
+        """
+        Test that a consumer reconnecting with an ID of another process or
+        run is told to resync, then gets the new events.
+        """
+        broker.publish("created", {"id": 1})
+
+        async def consume():
+            sent = []
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                sent.append(message)
+                if b"event: resync" in message.get("body", b""):
+                    disconnected.set()
+
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": "/bookings/events/",
+                "headers": [(b"last-event-id", b"restarted-1000000")],
+            }
+            await asyncio.wait_for(booking_events_app(scope, receive, send), 5)
+            return sent
+
+        sent = asyncio.run(consume())
+        bodies = [message.get("body") for message in sent[1:]]
+        self.assertIn(format_resync(broker.epoch, broker.last_id), bodies)
+        self.assertFalse(any(b"event: created" in body for body in bodies))
+
+
+class BookingThrottlingTestCase(APITestCase):
+    """
+    Test case for the token bucket throttling and the booking write limiter.
+    """
+
+    def setUp(self):
+        get_bucket_store().clear()
+        self.property = Property.objects.create(name="Property", base_price=10)
+        self.booking_data = {
+            "property": self.property.id,
+            "start_date": "01-01-2022",
+            "end_date": "01-03-2022",
+        }
+
+    def tearDown(self):
+        get_bucket_store().clear()
+
+    def test_refill(self):
+        """
+        Test that an empty bucket is refilled over time up to the burst size.
+        """
+        bucket, wait = refill(None, rate=1, burst=2, now=0)
+        self.assertEqual((bucket, wait), ((1, 0), 0))
+        bucket, wait = refill((0, 0), rate=2, burst=2, now=0.25)
+        self.assertEqual(wait, 0.25)
+        bucket, wait = refill((0, 0), rate=1, burst=2, now=100)
+        self.assertEqual((bucket, wait), ((1, 100), 0))
+
+    @override_settings(TOKEN_BUCKETS={"booking_create": {"rate": 0.01, "burst": 2}})
+    def test_throttle_booking_create(self):
+        """
+        Test that a client creating bookings faster than its rate gets a 429.
+        """
+        url = reverse("booking-list")
+        for _ in range(2):
+            response = self.client.post(url, self.booking_data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(url, self.booking_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    @override_settings(TOKEN_BUCKETS={"quote": {"rate": 0.01, "burst": 1}})
+    def test_throttle_quotes(self):
+        url = reverse("booking-quote")
+        params = {**self.booking_data}
+        self.assertEqual(self.client.get(url, params).status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.get(url, params).status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+
+    def test_shed_booking_writes(self):
+        """
+        Test that a booking is rejected with a 503 while the slots are taken.
+        """
+        slots = []
+        while True:
+            slot = booking_writes.try_acquire()
+            if slot is None:
+                break
+            slots.append(slot)
+        try:
+            response = self.client.post(
+                reverse("booking-list"), self.booking_data, format="json"
+            )
+        finally:
+            for slot in slots:
+                booking_writes.release(slot)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("Retry-After", response)
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(len(slots), booking_writes.limit)
+
+    def test_release_booking_write_slot(self):
+        """
+        Test that a released slot can be taken again, by any worker.
+        """
+        limiter = CacheConcurrencyLimiter("test-writes", 1)
+        slot = limiter.try_acquire()
+        self.assertIsNone(limiter.try_acquire())
+        self.assertIsNone(CacheConcurrencyLimiter("test-writes", 1).try_acquire())
+        limiter.release(slot)
+        slot = limiter.try_acquire()
+        self.assertIsNotNone(slot)
+        limiter.release(slot)
+
+
+class BookingReportTestCase(APITestCase):
+    """
+    Test case for the revenue report computed by the database.
+    """
+
+    def setUp(self):
+        self.url = reverse("booking-report")
+        self.property_a = Property.objects.create(name="A", base_price=10)
+        self.property_b = Property.objects.create(name="B", base_price=10)
+        for property, start_date, end_date, final_price in [
+            (self.property_a, date(2022, 1, 30), date(2022, 2, 2), 100),
+            (self.property_a, date(2022, 2, 10), date(2022, 2, 12), 100),
+            (self.property_b, date(2022, 1, 1), date(2022, 1, 1), 10),
+        ]:
+            Booking.objects.create(
+                property=property,
+                start_date=start_date,
+                end_date=end_date,
+                stay_length=(end_date - start_date).days + 1,
+                final_price=final_price,
+            )
+
+    def test_report_by_property(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {
+                    "property": self.property_a.id,
+                    "bookings": 2,
+                    "nights": 7,
+                    "revenue": 200,
+                    "average_daily_rate": 28.57,
+                },
+                {
+                    "property": self.property_b.id,
+                    "bookings": 1,
+                    "nights": 1,
+                    "revenue": 10,
+                    "average_daily_rate": 10,
+                },
+            ],
+        )
+
+    def test_report_by_month(self):
+        """
+        Test that the nights of a booking are split between the months.
+        """
+        response = self.client.get(self.url, {"period": "month"})
+        rows = [
+            (row["property"], row["period"], row["nights"], row["revenue"])
+            for row in response.data["results"]
+        ]
+        self.assertEqual(
+            rows,
+            [
+                (self.property_a.id, "01-01-2022", 2, 50),
+                (self.property_a.id, "02-01-2022", 5, 150),
+                (self.property_b.id, "01-01-2022", 1, 10),
+            ],
+        )
+
+    def test_report_by_day_and_week(self):
+        """
+        Test that the shares of the nights add up to the final price.
+        """
+        response = self.client.get(
+            self.url, {"period": "day", "property__name__icontains": "A"}
+        )
+        revenues = {row["period"]: row["revenue"] for row in response.data["results"]}
+        self.assertEqual(len(revenues), 7)
+        self.assertEqual(round(sum(revenues.values()), 2), 200)
+        self.assertEqual(revenues["02-12-2022"], 33.34)
+
+        response = self.client.get(self.url, {"period": "week", "stay_length__gt": 3})
+        rows = [(row["period"], row["nights"]) for row in response.data["results"]]
+        self.assertEqual(rows, [("01-24-2022", 1), ("01-31-2022", 3)])
+
+    def test_report_invalid_period(self):
+        response = self.client.get(self.url, {"period": "year"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OccupancyPricingTestCase(APITestCase):
+    """
+    Test case for the pricing rules depending on the occupancy of a property.
+    """
+
+    def setUp(self):
+        quote_cache.clear()
+        self.property = Property.objects.create(name="Property", base_price=10)
+        self.start_date = timezone.localdate() + timedelta(days=1)
+        self.params = {
+            "property": self.property.id,
+            "start_date": self.start_date.strftime("%m-%d-%Y"),
+            "end_date": (self.start_date + timedelta(days=1)).strftime("%m-%d-%Y"),
+        }
+
+    def book(self, first_day, days):
+        Booking.objects.create(
+            property=self.property,
+            start_date=self.start_date + timedelta(days=first_day),
+            end_date=self.start_date + timedelta(days=first_day + days - 1),
+        )
+        self.property.refresh_from_db()
+
+    def test_get_occupancy(self):
+        """
+        Test that the occupancy is read from the availability bitmap.
+        """
+        self.assertIsNone(get_occupancy_bp(self.property, self.start_date))
+        self.book(5, 15)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_occupancy_bp(self.property, self.start_date, 30), 5000)
+        self.assertEqual(get_occupancy_bp(self.property, self.start_date, 5), 0)
+
+    def test_most_relevant_occupancy_rule(self):
+        rules = [
+            {"min_occupancy_bp": 3000, "price_modifier_bp": 1000},
+            {"min_occupancy_bp": 5000, "price_modifier_bp": 2000},
+            {"max_occupancy_bp": 1000, "price_modifier_bp": -1500},
+        ]
+        day = date(2022, 1, 1)
+        self.assertEqual(calculate_final_price(rules, day, day, 1, 1000, 5000), 1200)
+        self.assertEqual(calculate_final_price(rules, day, day, 1, 1000, 4000), 1100)
+        self.assertEqual(calculate_final_price(rules, day, day, 1, 1000, 0), 850)
+        self.assertEqual(calculate_final_price(rules, day, day, 1, 1000), 1000)
+
+    def test_quote_follows_occupancy(self):
+        """
+        Test that a booking changing the occupancy changes the memoized quote.
+        """
+        PricingRule.objects.create(
+            property=self.property, min_occupancy=50, price_modifier=20
+        )
+        self.property.refresh_from_db()
+        response = self.client.get(reverse("booking-quote"), self.params)
+        self.assertEqual(response.data["final_price"], 20)
+
+        self.book(5, 15)
+        response = self.client.get(reverse("booking-quote"), self.params)
+        self.assertEqual(response.data["final_price"], 24)
+
+    def test_validate_occupancy_rule(self):
+        url = reverse("pricing-rule-list")
+        rule = {"property": self.property.id, "min_occupancy": 80, "price_modifier": 15}
+        for invalid in (
+            {"fixed_price": 20},
+            {"price_modifier": None},
+            {"max_occupancy": 50},
+            {"min_occupancy": 120},
+        ):
+            response = self.client.post(url, {**rule, **invalid}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(url, rule, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["min_occupancy"], 80)
+
+
+class SoftDeleteTestCase(APITestCase):
+    """
+    Test case for the soft deletion of bookings and pricing rules.
+    """
+
+    def setUp(self):
+        self.property = Property.objects.create(name="House", base_price=10)
+        self.booking = Booking.objects.create(
+            property=self.property,
+            start_date=timezone.localdate() + timedelta(days=1),
+            end_date=timezone.localdate() + timedelta(days=3),
+        )
+
+    def test_delete_booking_keeps_row(self):
+        """
+        Test that a deleted booking is hidden but kept, with its days released.
+        """
+        url = reverse("booking-detail", kwargs={"pk": self.booking.pk})
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Booking.objects.filter(pk=self.booking.pk).exists())
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNotNone(Booking.all_objects.get(pk=self.booking.pk).deleted_at)
+        self.property.refresh_from_db()
+        self.assertEqual(decode_bitmap(self.property.availability), 0)
+
+    def test_delete_queryset(self):
+        Booking.objects.filter(property=self.property).delete()
+        self.assertEqual(Booking.objects.count(), 0)
+        self.assertEqual(Booking.all_objects.count(), 1)
+        self.assertEqual(OutboxEvent.objects.filter(operation="d").count(), 1)
+
+    def test_delete_pricing_rule_changes_quote(self):
+        rule = PricingRule.objects.create(
+            property=self.property, min_stay_length=2, price_modifier=-10
+        )
+        params = {
+            "property": self.property.pk,
+            "start_date": "01-01-2022",
+            "end_date": "01-02-2022",
+        }
+        quote_cache.clear()
+        self.assertEqual(
+            self.client.get(reverse("booking-quote"), params).data["final_price"], 18
+        )
+        self.client.delete(reverse("pricing-rule-detail", kwargs={"pk": rule.pk}))
+        self.assertEqual(
+            self.client.get(reverse("booking-quote"), params).data["final_price"], 20
+        )
+        self.assertEqual(PricingRule.all_objects.count(), 1)
+
+    def test_purge_deleted(self):
+        """
+        Test that only the rows deleted before the retention period are purged.
+        """
+        old = Booking.objects.create(
+            property=self.property,
+            start_date=date(2022, 1, 1),
+            end_date=date(2022, 1, 2),
+        )
+        old.delete()
+        self.booking.delete()
+        Booking.all_objects.filter(pk=old.pk).update(
+            deleted_at=timezone.now() - timedelta(days=100)
+        )
+
+        out = io.StringIO()
+        call_command("purge_deleted", older_than_days=90, batch_size=1, stdout=out)
+        self.assertIn("Purged 1 bookings.", out.getvalue())
+        self.assertEqual(
+            list(Booking.all_objects.values_list("pk", flat=True)), [self.booking.pk]
+        )
+
+
+class RepricingTestCase(APITestCase):
+    """
+    Test case for the repricing of the upcoming bookings and their price history.
+    """
+
+    def setUp(self):
+        self.property = create_property_with_rules(
+            property_data={"name": "House", "base_price": 10},
+            rules_data=[{"min_stay_length": 3, "price_modifier": -10}],
+        )
+        self.booking_url = reverse("booking-list")
+        start_date = timezone.localdate() + timedelta(days=10)
+        response = self.client.post(
+            self.booking_url,
+            {
+                "property": self.property.pk,
+                "start_date": start_date.strftime("%m-%d-%Y"),
+                "end_date": (start_date + timedelta(days=2)).strftime("%m-%d-%Y"),
+            },
+            format="json",
+        )
+        self.booking = Booking.objects.get(pk=response.data["id"])
+        self.past = Booking.objects.create(
+            property=self.property,
+            start_date=date(2022, 1, 1),
+            end_date=date(2022, 1, 3),
+            final_price_cents=2700,
+        )
+        self.history_url = reverse(
+            "booking-price-history", kwargs={"pk": self.booking.pk}
+        )
+
+    def reprice(self):
+        out = io.StringIO()
+        call_command("reprice_bookings", property=[self.property.pk], stdout=out)
+        return out.getvalue()
+
+    def test_reprice_bookings(self):
+        """
+        Test that only the upcoming bookings whose price changed are written.
+        """
+        self.assertIn("Repriced 0 bookings.", self.reprice())
+        rule = PricingRule.objects.get(property=self.property)
+        rule.price_modifier = -20
+        rule.save()
+
+        self.assertIn("Repriced 1 bookings.", self.reprice())
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.final_price, 24)
+        self.past.refresh_from_db()
+        self.assertEqual(self.past.final_price, 27)
+        self.assertTrue(
+            OutboxEvent.objects.filter(
+                model="booking", object_id=self.booking.pk, operation="u"
+            ).exists()
+        )
+
+    def test_price_history(self):
+        Property.objects.filter(pk=self.property.pk).update(base_price_cents=2000)
+        self.reprice()
+        Property.objects.filter(pk=self.property.pk).update(base_price_cents=1500)
+        self.reprice()
+
+        response = self.client.get(self.history_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [entry["final_price"] for entry in response.data], [27, 54, 40.5]
+        )
+        self.assertEqual(
+            [entry["reason"] for entry in response.data],
+            ["create", "reprice", "reprice"],
+        )
+
+
+class PropertyCalendarTestCase(APITestCase):
+    """
+    Test case for the iCalendar feed of the booked days of a property.
+    """
+
+    def setUp(self):
+        self.property = Property.objects.create(name="House, beach", base_price=10)
+        self.url = reverse("property-calendar", kwargs={"pk": self.property.pk})
+        self.today = timezone.localdate()
+
+    def book(self, first_day, last_day):
+        return Booking.objects.create(
+            property=self.property,
+            start_date=self.today + timedelta(days=first_day),
+            end_date=self.today + timedelta(days=last_day),
+        )
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        content = b"".join(response.streaming_content) if response.streaming else b""
+        return response, content.decode()
+
+    def test_booked_runs(self):
+        origin = date(2022, 1, 1)
+        self.assertEqual(list(booked_runs(0, origin)), [])
+        self.assertEqual(
+            list(booked_runs(0b1110011, origin)),
+            [
+                (date(2022, 1, 1), date(2022, 1, 2)),
+                (date(2022, 1, 5), date(2022, 1, 7)),
+            ],
+        )
+
+    def test_calendar(self):
+        """
+        Test that each run of booked days is an all-day event, adjacent
+        bookings being merged.
+        """
+        self.book(1, 2)
+        self.book(3, 4)
+        self.book(10, 10)
+        response, content = self.get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/calendar"))
+        self.assertIn("X-WR-CALNAME:House\\, beach\r\n", content)
+        self.assertEqual(content.count("BEGIN:VEVENT"), 2)
+        first_day = self.today + timedelta(days=1)
+        self.assertIn(f"DTSTART;VALUE=DATE:{first_day:%Y%m%d}", content)
+        self.assertIn(
+            f"DTEND;VALUE=DATE:{first_day + timedelta(days=4):%Y%m%d}", content
+        )
+
+    def test_conditional_get(self):
+        """
+        Test that polling gets a 304 until a booking of the property changes.
+        """
+        booking = self.book(1, 2)
+        response, _ = self.get()
+        etag = response["ETag"]
+        response, _ = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        booking.delete()
+        response, content = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertNotIn("BEGIN:VEVENT", content)
+
+    def test_unnamed_property(self):
+        self.property.name = None
+        self.property.save()
+        self.book(1, 2)
+        response, content = self.get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("X-WR-CALNAME:\r\n", content)
+        self.assertEqual(content.count("BEGIN:VEVENT"), 1)
+
+    def test_unknown_property(self):
+        url = reverse("property-calendar", kwargs={"pk": self.property.pk + 1})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
@@ -4,4 +4,11 @@ from bookings import views
 urlpatterns = [
     path("", views.BookingListView.as_view(), name="booking-list"),
     path("<int:pk>/", views.BookingDetailView.as_view(), name="booking-detail"),
+    path(
+        "<int:pk>/price-history/",
+        views.BookingPriceHistoryView.as_view(),
+        name="booking-price-history",
+    ),
+    path("quote/", views.QuoteView.as_view(), name="booking-quote"),
+    path("quote/stats/", views.QuoteStatsView.as_view(), name="booking-quote-stats"),
 ]
@@ -1,7 +1,13 @@
 from datetime import date
-from typing import List, Dict
+from functools import partial
+from typing import List, Dict, Optional
+from django.conf import settings
 from pricing_rules.models import PricingRule
+from pricing_rules.normalization import RULE_FIELDS, is_occupancy_rule
+from pricing_rules.templates import get_group_rules, merge_rules
 from properties.models import Property
+from reservations.cache import get_or_compute
+from reservations.money import apply_basis_points
 
 
 def calculate_stay_length(start_date: date, end_date: date) -> int:
@@ -41,21 +47,45 @@ def sort_pricing_rules(pricing_rules: List[Dict]) -> List[Dict]:
     )
 
 
-def get_pricing_rules(property_id: Property) -> List[Dict]:
+def get_pricing_rules(property: Property) -> List[Dict]:
     """
-    Get pricing rules associated with a property and sort them based on the minimum stay length.
+    Get the pricing rules of a property, merged with the rule templates of its
+    group, and sort them based on the minimum stay length.
+    A rule of the property takes precedence over a template for the same
+    specific_day or min_stay_length.
+
+    The rules are kept in the shared cache for each rules version of the
+    property, so a change of its rules or templates is seen right away.
 
     Args:
-        property_id (Property): The ID of the property for which pricing rules are retrieved.
+        property (Property): The property for which pricing rules are retrieved.
 
     Returns:
         List[Dict]: A list of pricing rules associated with the property, sorted based on the minimum stay length.
-        Each rule is represented as a dictionary containing the fields 'min_stay_length', 'price_modifier', 'specific_day', and 'fixed_price'.
+        Each rule is represented as a dictionary containing the fields 'min_stay_length', 'price_modifier_bp', 'specific_day', 'fixed_price_cents',
+        'min_occupancy_bp' and 'max_occupancy_bp'.
     """
-    pricing_rules = PricingRule.objects.filter(property_id=property_id).values(
-        "min_stay_length", "price_modifier", "specific_day", "fixed_price"
+    # The creation date tells apart a property reusing the ID of a deleted
+    # one, properties created before it was recorded have none
+    created_at = property.created_at.timestamp() if property.created_at else ""
+    key = "pricing-rules:{}:{}:{}".format(
+        property.pk, created_at, property.rules_version
+    )
+    return get_or_compute(
+        key, partial(load_pricing_rules, property), settings.PRICING_RULES_CACHE_TTL
+    )
+
+
+def load_pricing_rules(property: Property) -> List[Dict]:
+    """
+    Load the pricing rules of a property from the database, see get_pricing_rules.
+    """
+    pricing_rules = PricingRule.objects.filter(property_id=property).values(
+        *RULE_FIELDS
+    )
+    return sort_pricing_rules(
+        merge_rules(pricing_rules, get_group_rules(property.group_id))
     )
-    return sort_pricing_rules(pricing_rules)
 
 
 def calculate_final_price(
@@ -63,34 +93,45 @@ def calculate_final_price(
     start_date: date,
     end_date: date,
     stay_length: int,
-    base_price: float,
-) -> float:
+    base_price_cents: int,
+    occupancy_bp: Optional[int] = None,
+) -> int:
     """
     Calculates the final price of a booking applying pricing rules.
+    Prices are integer cents and modifiers integer basis points, so the
+    whole calculation is done with exact integer math.
+    Occupancy rules are applied last, to the whole price, and only when the
+    occupancy is known.
 
     Args:
         pricing_rules (List[Dict]): A list of dictionaries containing applicable pricing rules.
         start_date (date): The start date of the booking.
         end_date (date): The end date of the booking.
         stay_length (int): The length of stay in days.
-        base_price (float): The base price per day of the property.
+        base_price_cents (int): The base price per day of the property, in cents.
+        occupancy_bp (Optional[int]): Booked share of the occupancy window, in
+            hundredths of a percent, None if unknown.
 
     Returns:
-        float: The final price of the booking.
+        int: The final price of the booking, in cents.
 
     Notes:
         The count_specific_day is used to use the formula to add the final price
         It has a valid condition when there is no discount applied, it is not used within the loop,
-        since all the rules are validated there with the values "min_stay_length", "price_modifier", "specific_day", "fixed_price"
+        since all the rules are validated there with the values "min_stay_length", "price_modifier_bp", "specific_day", "fixed_price_cents"
     """
     final_price = 0
     count_specific_day = False
+    occupancy_rules = []
 
     for rule in pricing_rules:
+        if is_occupancy_rule(rule):
+            occupancy_rules.append(rule)
+            continue
         specific_day = rule.get("specific_day")
-        fixed_price = rule.get("fixed_price")
+        fixed_price = rule.get("fixed_price_cents")
         min_stay_length = rule.get("min_stay_length")
-        price_modifier = rule.get("price_modifier")
+        price_modifier = rule.get("price_modifier_bp")
 
         if specific_day is not None and fixed_price is not None:
             if start_date <= specific_day <= end_date:
@@ -100,17 +141,57 @@ def calculate_final_price(
 
         if min_stay_length is not None and price_modifier is not None:
             if stay_length >= min_stay_length:
-                new_base_price = base_price * stay_length
-                price = new_base_price + (new_base_price * price_modifier / 100)
+                price = apply_basis_points(
+                    base_price_cents * stay_length, price_modifier
+                )
                 if count_specific_day:
                     final_price += price
                 else:
                     final_price = price
 
-    if final_price == 0 and stay_length > 0 and base_price > 0:
-        final_price = base_price * stay_length
+    if final_price == 0 and stay_length > 0 and base_price_cents > 0:
+        final_price = base_price_cents * stay_length
+
+    if occupancy_bp is not None:
+        final_price = apply_occupancy_rules(occupancy_rules, final_price, occupancy_bp)
 
-    return round(final_price, 2)
+    return final_price
+
+
+def apply_occupancy_rules(
+    occupancy_rules: List[Dict], price_cents: int, occupancy_bp: int
+) -> int:
+    """
+    Apply the most relevant occupancy rule matching the occupancy to a price.
+    The most relevant rule is the one with the biggest minimum occupancy, then
+    the biggest price modifier.
+
+    Args:
+        occupancy_rules (List[Dict]): The occupancy rules of the property.
+        price_cents (int): The price of the stay, in cents.
+        occupancy_bp (int): Booked share of the occupancy window, in hundredths
+            of a percent.
+
+    Returns:
+        int: The price with the modifier of the rule applied, in cents.
+    """
+    matching = [
+        rule
+        for rule in occupancy_rules
+        if rule.get("price_modifier_bp") is not None
+        and (rule.get("min_occupancy_bp") or 0) <= occupancy_bp
+        and (
+            rule.get("max_occupancy_bp") is None
+            or occupancy_bp <= rule["max_occupancy_bp"]
+        )
+    ]
+    if not matching:
+        return price_cents
+    rule = max(
+        matching,
+        key=lambda rule: (rule.get("min_occupancy_bp") or 0, rule["price_modifier_bp"]),
+    )
+    return apply_basis_points(price_cents, rule["price_modifier_bp"])
 
 
 def create_property_with_rules(property_data: dict, rules_data: List[dict]) -> Property:
@@ -1,10 +1,43 @@
-from rest_framework.generics import ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.generics import (
+    GenericAPIView,
+    ListAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
 from rest_framework.response import Response
 from rest_framework.request import Request
+from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError
 from rest_framework import status
+from django.conf import settings
+from django.db import NotSupportedError, transaction
 from django.shortcuts import get_object_or_404
-from bookings.models import Booking
-from bookings.serializers import BookingSerializer
+from currencies.rates import UnknownCurrency, convert_prices, get_fx_table
+from history.changes import get_timeline
+from properties.availability import get_occupancy_bp
+from properties.models import Property
+from reservations.renderers import LIST_RENDERER_CLASSES
+from reservations.throttling import (
+    BookingCreateThrottle,
+    QuoteThrottle,
+    booking_writes,
+)
+from django.utils.http import http_date, parse_http_date_safe
+from bookings.models import ArchivedBooking, Booking, BookingTombstone
+from bookings.serializers import (
+    BookingSerializer,
+    PriceHistorySerializer,
+    QuoteSerializer,
+    ReportSerializer,
+    validate_currency,
+)
+from bookings.quotes import get_quote, quote_cache
+from bookings.archive import reaches_archive
+from bookings.reports import report_by_period, report_by_property
+from bookings.sync import (
+    get_deleted_ids,
+    get_last_modified,
+    get_last_modified_header,
+)
 from bookings.filters import BookingFilter
 from bookings.utils import (
     calculate_final_price,
@@ -21,7 +54,10 @@ class BookingListView(ListAPIView):
     data provided in the request.
 
     Supported methods:
-        - GET: Lists all existing bookings.
+        - GET: Lists all existing bookings. Archived bookings are included
+          when the date filters reach back to the archive. Supports
+          If-Modified-Since, and updated_since (ISO 8601) to only get the
+          bookings changed and the IDs deleted after that moment.
         - POST: Creates a new booking using the provided data.
 
     When creating a new booking, it automatically calculates the length of
@@ -33,11 +69,88 @@ class BookingListView(ListAPIView):
         serializer_class: Serializer used for validating and deserializing
             booking data.
         filterset_class: Filters available for filtering bookings.
+        renderer_classes: JSON, the browsable API and MessagePack when the
+            msgpack package is installed.
+        read_replica: Safe requests read from the replica database.
     """
 
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     filterset_class = BookingFilter
+    renderer_classes = LIST_RENDERER_CLASSES
+    read_replica = True
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Lists the bookings matching the filters.
+
+        The archive is only queried when the date filters can match bookings
+        old enough to have been archived, those are listed first.
+
+        Returns:
+            A response with the serialized bookings, with a Last-Modified
+            header once the second of the last change is over. With
+            updated_since the bookings are under "results" and the IDs
+            deleted since then under "deleted". If nothing changed since
+            If-Modified-Since, returns the HTTP status code 304
+            (NOT MODIFIED) without serializing anything.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        currency = request.query_params.get("currency")
+        if currency is not None:
+            currency = currency.upper()
+        try:
+            validate_currency(currency)
+        except ValidationError as error:
+            return Response(error.detail, status=status.HTTP_400_BAD_REQUEST)
+        last_modified = get_last_modified()
+        if_modified_since = parse_http_date_safe(
+            request.headers.get("If-Modified-Since", "")
+        )
+        # Exchange rates change without touching the bookings
+        if (
+            currency is None
+            and last_modified is not None
+            and if_modified_since is not None
+            and last_modified.timestamp() < if_modified_since
+        ):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+        data = self.get_serializer(queryset, many=True).data
+        archived = BookingFilter(
+            request.query_params, queryset=ArchivedBooking.objects.order_by("pk")
+        )
+        archived.is_valid()
+        filters = archived.form.cleaned_data
+        if reaches_archive(filters):
+            data = self.get_serializer(archived.qs, many=True).data + data
+        if currency is not None:
+            try:
+                convert_prices(data, currency, get_property_currencies(data))
+            except UnknownCurrency as error:
+                return Response(
+                    {"currency": str(error)}, status=status.HTTP_400_BAD_REQUEST
+                )
+        if filters.get("updated_since"):
+            data = {
+                "results": data,
+                "deleted": get_deleted_ids(filters["updated_since"]),
+            }
+
+        response = Response(data)
+        if last_modified is not None:
+            timestamp = get_last_modified_header(last_modified)
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def get_throttles(self):
+        """
+        Throttles the booking creation per client, listing is not throttled.
+        """
+        if self.request.method == "POST":
+            return [BookingCreateThrottle()]
+        return super().get_throttles()
 
     def post(self, request: Request, *args, **kwargs) -> Response:
         """
@@ -52,6 +165,24 @@ class BookingListView(ListAPIView):
             and the HTTP status code 201 (CREATED).
             If the booking data is not valid, returns a response with the
             validation errors and the HTTP status code 400 (BAD REQUEST).
+            If too many bookings are being created at once, returns the
+            HTTP status code 503 (SERVICE UNAVAILABLE) with a Retry-After.
+        """
+        slot = booking_writes.try_acquire()
+        if slot is None:
+            return Response(
+                {"detail": "Too many bookings in progress, retry later."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(settings.BOOKING_WRITE_RETRY_AFTER)},
+            )
+        try:
+            return self.create_booking(request)
+        finally:
+            booking_writes.release(slot)
+
+    def create_booking(self, request: Request) -> Response:
+        """
+        Validates and saves the booking, with its stay length and final price.
         """
         serializer = BookingSerializer(data=request.data)
         if serializer.is_valid():
@@ -69,9 +200,10 @@ class BookingListView(ListAPIView):
                     start_date,
                     end_date,
                     stay_length,
-                    property.base_price,
+                    property.base_price_cents,
+                    get_occupancy_bp(property, start_date),
                 )
-                serializer.validated_data["final_price"] = final_price
+                serializer.validated_data["final_price_cents"] = final_price
 
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -89,14 +221,22 @@ class BookingDetailView(RetrieveUpdateDestroyAPIView):
         queryset: Queryset returning all existing bookings.
         serializer_class: Serializer used for validating and deserializing
             booking data.
+        read_replica: Safe requests read from the replica database.
     """
 
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
+    read_replica = True
 
     def delete(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Soft deletes the booking and records its ID in a tombstone for the
+        clients syncing the bookings list.
+        """
         instance = self.get_object()
-        self.perform_destroy(instance)
+        with transaction.atomic():
+            BookingTombstone.objects.create(booking_id=instance.pk)
+            self.perform_destroy(instance)
         return Response(
             {"detail": "Record successfully deleted."}, status=status.HTTP_200_OK
         )
@@ -110,6 +250,145 @@ class BookingDetailView(RetrieveUpdateDestroyAPIView):
         return Response(serializer.data) """
 
 
+class BookingPriceHistoryView(GenericAPIView):
+    """
+    View for the timeline of the final price of a booking, rebuilt from the
+    changes recorded when it was repriced.
+
+    Attributes:
+        queryset: Queryset returning all existing bookings.
+        serializer_class: Serializer used for each entry of the timeline.
+        read_replica: Safe requests read from the replica database.
+    """
+
+    queryset = Booking.objects.all()
+    serializer_class = PriceHistorySerializer
+    read_replica = True
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Returns the final prices of the booking, oldest first, with the date
+        and the reason of each change.
+        """
+        booking = self.get_object()
+        timeline = get_timeline(
+            Booking, booking.pk, {"final_price_cents": booking.final_price_cents}
+        )
+        timeline[0].update(changed_at=booking.created_at, reason="create")
+        return Response(self.get_serializer(timeline, many=True).data)
+
+
+class QuoteView(GenericAPIView):
+    """
+    View for quoting the price of a stay without booking it.
+
+    Quotes are memoized by property, dates and the rules version of the
+    property, so repeated searches for the same stay do not load the
+    pricing rules again.
+
+    Attributes:
+        serializer_class: Serializer used for validating the query parameters
+            and serializing the quote.
+        throttle_classes: Token bucket per client, see TOKEN_BUCKETS.
+        read_replica: Safe requests read from the replica database.
+    """
+
+    serializer_class = QuoteSerializer
+    throttle_classes = [QuoteThrottle]
+    read_replica = True
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Returns the quote for the property, start_date and end_date query
+        parameters (format: MM-DD-YYYY), and optionally in a currency.
+
+        Returns:
+            The quote with the stay length and the final price, or the
+            validation errors and the HTTP status code 400 (BAD REQUEST).
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        property = serializer.validated_data["property"]
+        quote = get_quote(
+            property,
+            serializer.validated_data["start_date"],
+            serializer.validated_data["end_date"],
+        )
+        quote["property"] = property
+        quote["currency"] = serializer.validated_data.get("currency", property.currency)
+        try:
+            quote["final_price_cents"] = get_fx_table().convert(
+                quote["final_price_cents"], property.currency, quote["currency"]
+            )
+        except UnknownCurrency as error:
+            return Response(
+                {"currency": str(error)}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(self.get_serializer(quote).data)
+
+
+class BookingReportView(GenericAPIView):
+    """
+    View reporting the nights sold, revenue and average daily rate of the
+    bookings, computed by the database.
+
+    Accepts the filters of the bookings list. Archived bookings are included
+    when the date filters reach back to the archive.
+
+    Attributes:
+        queryset: Queryset returning all existing bookings.
+        serializer_class: Serializer used for validating the period.
+        filterset_class: Filters available for filtering the bookings.
+        read_replica: Safe requests read from the replica database.
+    """
+
+    queryset = Booking.objects.all()
+    serializer_class = ReportSerializer
+    filterset_class = BookingFilter
+    read_replica = True
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Returns the report grouped by property, and by the day, week or month
+        of each night with the period query parameter.
+
+        Returns:
+            The rows of the report under "results", or the validation errors
+            and the HTTP status code 400 (BAD REQUEST).
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        querysets = [self.filter_queryset(self.get_queryset())]
+        archived = BookingFilter(
+            request.query_params, queryset=ArchivedBooking.objects.all()
+        )
+        archived.is_valid()
+        if reaches_archive(archived.form.cleaned_data):
+            querysets.append(archived.qs)
+
+        period = serializer.validated_data.get("period")
+        if period is None:
+            return Response({"results": report_by_property(querysets)})
+        try:
+            return Response({"results": report_by_period(querysets, period)})
+        except NotSupportedError as error:
+            return Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class QuoteStatsView(APIView):
+    """
+    View exposing the hit and miss counters of the quote memoization.
+    """
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Returns the hits, misses, size and maximum size of the quote cache.
+        """
+        return Response(quote_cache.stats())
+
+
 def get_object(self):
     """
     Returns the booking instance identified by its unique identifier.
@@ -125,3 +404,19 @@ def get_object(self):
     obj = get_object_or_404(queryset, **filter_kwargs)
     self.check_object_permissions(self.request, obj)
     return obj
+
+
+def get_property_currencies(rows: list) -> dict:
+    """
+    Get the currency of the properties of serialized bookings in one query.
+
+    Args:
+        rows (list): The serialized bookings.
+
+    Returns:
+        dict: The currency of each property ID.
+    """
+    property_ids = {row["property"] for row in rows}
+    return dict(
+        Property.objects.filter(pk__in=property_ids).values_list("pk", "currency")
+    )
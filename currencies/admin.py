@@ -0,0 +1,4 @@
+from django.contrib import admin
+from currencies.models import ExchangeRate
+
+admin.site.register(ExchangeRate)
@@ -0,0 +1,73 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from currencies.models import ExchangeRate
+from currencies.rates import RATE_SCALE, clear_fx_table
+
+
+def read_rates(path: Path) -> Dict[str, int]:
+    """
+    Read the rates of a JSON object or a CSV file with currency,rate rows.
+
+    Args:
+        path (Path): The file, its format is chosen by the extension.
+
+    Returns:
+        Dict[str, int]: Units of each currency per unit of BASE_CURRENCY, in
+        millionths.
+    """
+    with open(path, newline="") as file:
+        if path.suffix == ".json":
+            items = json.load(file).items()
+        else:
+            items = [row[:2] for row in csv.reader(file) if row]
+    rates = {}
+    for currency, rate in items:
+        try:
+            rate_micros = int(Decimal(str(rate)) * RATE_SCALE)
+        except InvalidOperation:
+            continue  # header or malformed row
+        if rate_micros <= 0:
+            raise CommandError(f"The rate of {currency} must be positive.")
+        rates[currency.strip().upper()] = rate_micros
+    return rates
+
+
+class Command(BaseCommand):
+    """
+    Replaces the exchange rate table with the rates of a file, as a new version.
+    """
+
+    help = "Load the exchange rates against BASE_CURRENCY from a CSV or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="CSV (currency,rate) or JSON file.")
+
+    def handle(self, *args, **options):
+        rates = read_rates(options["path"])
+        if not rates:
+            raise CommandError("The file does not have any rate.")
+
+        with transaction.atomic():
+            version = (
+                ExchangeRate.objects.aggregate(Max("version"))["version__max"] or 0
+            ) + 1
+            ExchangeRate.objects.all().delete()
+            ExchangeRate.objects.bulk_create(
+                ExchangeRate(
+                    currency=currency, rate_micros=rate_micros, version=version
+                )
+                for currency, rate_micros in rates.items()
+            )
+            transaction.on_commit(clear_fx_table)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {len(rates)} exchange rates as version {version}."
+            )
+        )
@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class ExchangeRate(models.Model):
+    """
+    Model that represents the exchange rate of a currency against BASE_CURRENCY.
+    The whole table is replaced by the load_exchange_rates command, every
+    load getting a new version.
+    """
+
+    currency = models.CharField(max_length=3, unique=True)
+    """currency: ISO 4217 code of the currency, for example EUR"""
+    rate_micros = models.BigIntegerField()
+    """rate_micros: Units of the currency per unit of BASE_CURRENCY, in millionths"""
+    version = models.PositiveIntegerField(default=1)
+    """version: Number of the load that stored this rate"""
+    updated_at = models.DateTimeField(auto_now=True)
+    """updated_at: Date of update"""
+
+    def __str__(self):
+        return f"{self.currency} {self.rate_micros / 1_000_000}"
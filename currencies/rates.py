@@ -0,0 +1,169 @@
+"""
+In-memory table of exchange rates used to convert prices.
+
+Each worker keeps a snapshot of the ExchangeRate table for FX_TABLE_TTL
+seconds, or until a rate is saved in the same process. Conversions are done
+with integer cents and integer rates, and a batch of amounts in the same
+currency pair is converted with a single factor.
+"""
+
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from django.conf import settings
+from currencies.models import ExchangeRate
+from reservations.money import divide_rounding, from_hundredths, to_hundredths
+
+RATE_SCALE = 1_000_000
+
+
+class UnknownCurrency(ValueError):
+    """
+    Raised when converting from or to a currency without an exchange rate.
+    """
+
+
+class FxTable(NamedTuple):
+    """
+    Snapshot of the exchange rates.
+
+    Attributes:
+        version: The load_exchange_rates version of the rates, 0 if empty.
+        rates: Units of each currency per unit of BASE_CURRENCY, in millionths.
+    """
+
+    version: int
+    rates: Dict[str, int]
+
+    def rate(self, currency: str) -> int:
+        """
+        Get the rate of a currency, BASE_CURRENCY always being known.
+
+        Args:
+            currency (str): ISO 4217 code of the currency.
+
+        Returns:
+            int: Units of the currency per unit of BASE_CURRENCY, in millionths.
+
+        Raises:
+            UnknownCurrency: If the currency has no rate.
+        """
+        if currency == settings.BASE_CURRENCY:
+            return RATE_SCALE
+        try:
+            return self.rates[currency]
+        except KeyError:
+            raise UnknownCurrency(f"No exchange rate for {currency}.") from None
+
+    def knows(self, currency: str) -> bool:
+        return currency == settings.BASE_CURRENCY or currency in self.rates
+
+    def convert_many(
+        self, amounts: Sequence[Optional[int]], source: str, target: str
+    ) -> List[Optional[int]]:
+        """
+        Convert amounts of cents from one currency to another, rounding half
+        away from zero. None amounts are kept.
+
+        Args:
+            amounts (Sequence[Optional[int]]): The amounts in cents of source.
+            source (str): The currency of the amounts.
+            target (str): The currency to convert to.
+
+        Returns:
+            List[Optional[int]]: The amounts in cents of target.
+
+        Raises:
+            UnknownCurrency: If the currencies differ and one has no rate.
+        """
+        if source == target:
+            return list(amounts)
+        numerator, denominator = self.rate(target), self.rate(source)
+        if numerator == denominator:
+            return list(amounts)
+        return [
+            None if amount is None else divide_rounding(amount * numerator, denominator)
+            for amount in amounts
+        ]
+
+    def convert(self, amount: Optional[int], source: str, target: str) -> Optional[int]:
+        return self.convert_many([amount], source, target)[0]
+
+
+_table: Optional[FxTable] = None
+_loaded_at = 0.0
+_lock = Lock()
+
+
+def load_fx_table() -> FxTable:
+    """
+    Read the exchange rates from the database.
+
+    Returns:
+        FxTable: The current rates and their highest version.
+    """
+    rates, version = {}, 0
+    for currency, rate_micros, rate_version in ExchangeRate.objects.values_list(
+        "currency", "rate_micros", "version"
+    ):
+        rates[currency] = rate_micros
+        version = max(version, rate_version)
+    return FxTable(version, rates)
+
+
+def get_fx_table() -> FxTable:
+    """
+    Get the exchange rates, reading them again once FX_TABLE_TTL expired.
+
+    Returns:
+        FxTable: The cached snapshot of the rates.
+    """
+    global _table, _loaded_at
+    with _lock:
+        if _table is None or time.monotonic() - _loaded_at > settings.FX_TABLE_TTL:
+            _table = load_fx_table()
+            _loaded_at = time.monotonic()
+        return _table
+
+
+def clear_fx_table() -> None:
+    """
+    Drop the cached rates, so the next conversion reads them again.
+    """
+    global _table
+    with _lock:
+        _table = None
+
+
+def convert_prices(
+    rows: List[Dict],
+    target: str,
+    currencies: Dict[int, str],
+    field: str = "final_price",
+) -> None:
+    """
+    Convert a price of serialized rows to a currency, in place.
+    The rows are grouped by the currency of their property so each group is
+    converted as a batch.
+
+    Args:
+        rows (List[Dict]): The serialized rows, with a "property" ID.
+        target (str): The currency to convert to.
+        currencies (Dict[int, str]): The currency of each property ID.
+        field (str): The price to convert.
+
+    Raises:
+        UnknownCurrency: If a currency has no exchange rate.
+    """
+    table = get_fx_table()
+    groups = defaultdict(list)
+    for row in rows:
+        groups[currencies[row["property"]]].append(row)
+    for source, group in groups.items():
+        converted = table.convert_many(
+            [to_hundredths(row[field]) for row in group], source, target
+        )
+        for row, cents in zip(group, converted):
+            row[field] = from_hundredths(cents)
+            row["currency"] = target
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from currencies.models import ExchangeRate
+from currencies.rates import clear_fx_table
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def invalidate_fx_table(sender, **kwargs) -> None:
+    """
+    Drop the cached rates of the process when a rate changes.
+    """
+    clear_fx_table()
@@ -0,0 +1,167 @@
+import io
+import tempfile
+from datetime import date
+from pathlib import Path
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bookings.models import Booking
+from bookings.quotes import quote_cache
+from currencies.models import ExchangeRate
+from currencies.rates import UnknownCurrency, clear_fx_table, get_fx_table
+from properties.models import Property
+
+
+class ExchangeRateTestCase(APITestCase):
+    """
+    Test case for the exchange rate table and the prices in other currencies.
+    """
+
+    def setUp(self):
+        clear_fx_table()
+        quote_cache.clear()
+        ExchangeRate.objects.create(currency="EUR", rate_micros=900_000)
+        ExchangeRate.objects.create(currency="JPY", rate_micros=150_000_000)
+        self.property = Property.objects.create(name="House", base_price=10)
+        self.euro_property = Property.objects.create(
+            name="Maison", base_price=10, currency="EUR"
+        )
+
+    def tearDown(self):
+        clear_fx_table()
+
+    def test_convert_many(self):
+        """
+        Test that batches are converted with integer math, rounding half up.
+        """
+        table = get_fx_table()
+        self.assertEqual(
+            table.convert_many([1000, None, 5], "USD", "EUR"), [900, None, 5]
+        )
+        self.assertEqual(table.convert(900, "EUR", "USD"), 1000)
+        self.assertEqual(table.convert(1000, "EUR", "JPY"), 166667)
+        with self.assertRaises(UnknownCurrency):
+            table.convert(1000, "USD", "GBP")
+
+    def test_table_is_cached(self):
+        """
+        Test that the rates are read once and dropped when a rate changes.
+        """
+        get_fx_table()
+        with self.assertNumQueries(0):
+            get_fx_table()
+        ExchangeRate.objects.filter(currency="EUR").get().delete()
+        self.assertFalse(get_fx_table().knows("EUR"))
+
+    def test_load_exchange_rates(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "rates.csv"
+            path.write_text("currency,rate\nEUR,0.5\ngbp,0.8\n")
+            call_command("load_exchange_rates", path, stdout=io.StringIO())
+
+        table = get_fx_table()
+        self.assertEqual(table.version, 2)
+        self.assertEqual(table.rates, {"EUR": 500_000, "GBP": 800_000})
+
+    def test_quote_in_currency(self):
+        params = {
+            "property": self.property.pk,
+            "start_date": "01-01-2022",
+            "end_date": "01-10-2022",
+        }
+        response = self.client.get(reverse("booking-quote"), params)
+        self.assertEqual(response.data["currency"], "USD")
+        self.assertEqual(response.data["final_price"], 100)
+
+        response = self.client.get(
+            reverse("booking-quote"), {**params, "currency": "EUR"}
+        )
+        self.assertEqual(response.data["currency"], "EUR")
+        self.assertEqual(response.data["final_price"], 90)
+
+        response = self.client.get(
+            reverse("booking-quote"), {**params, "currency": "XYZ"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_bookings_in_currency(self):
+        """
+        Test that bookings of properties in different currencies are converted.
+        """
+        for property in (self.property, self.euro_property):
+            Booking.objects.create(
+                property=property,
+                start_date=date(2022, 1, 1),
+                end_date=date(2022, 1, 2),
+                final_price=90,
+            )
+        response = self.client.get(reverse("booking-list"), {"currency": "EUR"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["final_price"] for row in response.data], [81, 90])
+        self.assertEqual({row["currency"] for row in response.data}, {"EUR"})
+
+        response = self.client.get(reverse("booking-list"), {"currency": "XYZ"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_quote_in_property_currency_without_rates(self):
+        """
+        Test that a quote in the currency of the property needs no rate.
+        """
+        ExchangeRate.objects.all().delete()
+        clear_fx_table()
+        params = {
+            "property": self.euro_property.pk,
+            "start_date": "01-01-2022",
+            "end_date": "01-10-2022",
+        }
+        response = self.client.get(reverse("booking-quote"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["currency"], "EUR")
+        self.assertEqual(response.data["final_price"], 100)
+
+        response = self.client.get(
+            reverse("booking-quote"), {**params, "currency": "usd"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_currency_in_lower_case(self):
+        params = {
+            "property": self.property.pk,
+            "start_date": "01-01-2022",
+            "end_date": "01-10-2022",
+            "currency": "eur",
+        }
+        response = self.client.get(reverse("booking-quote"), params)
+        self.assertEqual(response.data["currency"], "EUR")
+        response = self.client.get(reverse("booking-list"), {"currency": "eur"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_bookings_of_property_without_rate(self):
+        """
+        Test that converting from a currency without a rate is a bad request.
+        """
+        property = Property.objects.create(name="Flat", base_price=10, currency="GBP")
+        Booking.objects.create(
+            property=property,
+            start_date=date(2022, 1, 1),
+            end_date=date(2022, 1, 2),
+            final_price=90,
+        )
+        response = self.client.get(reverse("booking-list"), {"currency": "USD"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("GBP", response.data["currency"])
+
+    def test_property_currency_is_validated(self):
+        """
+        Test that a property can only be priced in a currency with a rate.
+        """
+        data = {"name": "Flat", "base_price": 10, "currency": "eur"}
+        response = self.client.post(reverse("property-list"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["currency"], "EUR")
+
+        response = self.client.post(
+            reverse("property-list"), {**data, "currency": "XYZ"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Type
+from django.db import models
+from django.utils import timezone
+from history.models import PriceChange
+
+
+def diff_values(before: Dict, after: Dict) -> Dict:
+    """
+    Get the fields whose value changed.
+
+    Args:
+        before (Dict): The values before the change, by field name.
+        after (Dict): The values after the change, by field name.
+
+    Returns:
+        Dict: The changed fields, each with its [before, after] values.
+    """
+    return {
+        field: [before.get(field), value]
+        for field, value in after.items()
+        if before.get(field) != value
+    }
+
+
+def build_change(
+    model: Type[models.Model],
+    object_id: int,
+    before: Dict,
+    after: Dict,
+    reason: str,
+    changed_at: Optional[datetime] = None,
+) -> Optional[PriceChange]:
+    """
+    Build the unsaved history entry of a change, so that entries can be
+    written in bulk.
+
+    Args:
+        model (Type[models.Model]): The model of the changed row.
+        object_id (int): The ID of the changed row.
+        before (Dict): The price fields before the change.
+        after (Dict): The price fields after the change.
+        reason (str): One of the PriceChange reasons.
+        changed_at (Optional[datetime]): Date of the change, by default now.
+
+    Returns:
+        Optional[PriceChange]: The entry, None if no field changed.
+    """
+    diff = diff_values(before, after)
+    if not diff and reason != PriceChange.DELETED:
+        return None
+    return PriceChange(
+        model=model._meta.model_name,
+        object_id=object_id,
+        reason=reason,
+        diff=diff,
+        changed_at=changed_at or timezone.now(),
+    )
+
+
+def record_changes(changes: Iterable[Optional[PriceChange]]) -> List[PriceChange]:
+    """
+    Write history entries with a single bulk insert, skipping the None ones.
+
+    Args:
+        changes (Iterable[Optional[PriceChange]]): Entries from build_change.
+
+    Returns:
+        List[PriceChange]: The written entries.
+    """
+    return PriceChange.objects.bulk_create(
+        [change for change in changes if change is not None]
+    )
+
+
+def get_timeline(
+    model: Type[models.Model], object_id: int, current: Dict
+) -> List[Dict]:
+    """
+    Rebuild the values a row had over time, replaying its changes backwards
+    from its current values.
+
+    Args:
+        model (Type[models.Model]): The model of the row.
+        object_id (int): The ID of the row.
+        current (Dict): The current values of the tracked fields.
+
+    Returns:
+        List[Dict]: The oldest values first, then the values after each
+        change with its changed_at and reason. The first entry has no
+        changed_at nor reason.
+    """
+    changes = list(
+        PriceChange.objects.filter(
+            model=model._meta.model_name, object_id=object_id
+        ).order_by("-changed_at", "-pk")
+    )
+    values = dict(current)
+    timeline = []
+    for change in changes:
+        timeline.append(
+            {"changed_at": change.changed_at, "reason": change.reason, **values}
+        )
+        values.update(
+            {
+                field: before
+                for field, (before, _) in change.diff.items()
+                if field in values
+            }
+        )
+    timeline.append({"changed_at": None, "reason": None, **values})
+    timeline.reverse()
+    return timeline
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:30
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=32)),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("reprice", "repriced"),
+                            ("edit", "edited"),
+                            ("delete", "deleted"),
+                        ],
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "diff",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("changed_at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["model", "object_id", "changed_at"],
+                        name="pricechange_object_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class PriceChange(models.Model):
+    """
+    Model that represents a change of the price fields of a booking or a
+    pricing rule. The history is append only, and each change only stores
+    the fields that changed, with their value before and after the change.
+    """
+
+    REPRICED = "reprice"
+    EDITED = "edit"
+    DELETED = "delete"
+    REASONS = [(REPRICED, "repriced"), (EDITED, "edited"), (DELETED, "deleted")]
+
+    model = models.CharField(max_length=32)
+    """model: Name of the changed model, booking or pricingrule"""
+    object_id = models.BigIntegerField()
+    """object_id: ID of the changed row"""
+    reason = models.CharField(max_length=8, choices=REASONS)
+    """reason: Whether the row was repriced by the rules, edited or deleted"""
+    diff = models.JSONField(encoder=DjangoJSONEncoder)
+    """diff: The changed fields, each with its value before and after the change"""
+    changed_at = models.DateTimeField()
+    """changed_at: Date of the change"""
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["model", "object_id", "changed_at"],
+                name="pricechange_object_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} {self.reason} at {self.changed_at}"
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from bookings.models import Booking
+from history.changes import build_change, diff_values, get_timeline, record_changes
+from history.models import PriceChange
+from pricing_rules.models import PricingRule
+from properties.models import Property
+
+
+class PriceHistoryTestCase(APITestCase):
+    """
+    Test case for the compact price history.
+    """
+
+    def setUp(self):
+        self.property = Property.objects.create(name="House", base_price=10)
+
+    def test_diff_values(self):
+        self.assertEqual(diff_values({"a": 1, "b": 2}, {"a": 1, "b": 3}), {"b": [2, 3]})
+        self.assertEqual(diff_values({"a": 1}, {"a": 1}), {})
+        self.assertIsNone(build_change(Booking, 1, {"a": 1}, {"a": 1}, "reprice"))
+
+    def test_timeline(self):
+        """
+        Test that the values are rebuilt backwards from the current ones.
+        """
+        now = timezone.now()
+        record_changes(
+            build_change(
+                Booking,
+                7,
+                {"final_price_cents": before},
+                {"final_price_cents": after},
+                PriceChange.REPRICED,
+                now + timedelta(minutes=minutes),
+            )
+            for minutes, before, after in [(1, 1000, 900), (2, 900, 1200)]
+        )
+        timeline = get_timeline(Booking, 7, {"final_price_cents": 1200})
+        self.assertEqual(
+            [entry["final_price_cents"] for entry in timeline], [1000, 900, 1200]
+        )
+        self.assertEqual(
+            [entry["reason"] for entry in timeline], [None, "reprice", "reprice"]
+        )
+
+    def test_rule_edits(self):
+        rule = PricingRule.objects.create(
+            property=self.property, min_stay_length=7, price_modifier=-10
+        )
+        url = reverse("pricing-rule-detail", kwargs={"pk": rule.pk})
+        data = {
+            "property": self.property.pk,
+            "min_stay_length": 7,
+            "price_modifier": -15,
+        }
+        self.assertEqual(self.client.put(url, data, format="json").status_code, 200)
+        self.client.put(url, data, format="json")
+        self.client.delete(url)
+
+        changes = PriceChange.objects.filter(
+            model="pricingrule", object_id=rule.pk
+        ).order_by("pk")
+        self.assertEqual(
+            [change.reason for change in changes],
+            [PriceChange.EDITED, PriceChange.DELETED],
+        )
+        self.assertEqual(changes[0].diff, {"price_modifier_bp": [-1000, -1500]})
@@ -0,0 +1,4 @@
+from django.contrib import admin
+from outbox.models import OutboxEvent
+
+admin.site.register(OutboxEvent)
@@ -0,0 +1,26 @@
+from django.db import transaction
+from outbox.models import OutboxEvent
+from outbox.sinks import Sink
+
+
+def drain_batch(sink: Sink, batch_size: int) -> int:
+    """
+    Deliver the oldest outbox events to a sink and delete them.
+    If the sink fails, the transaction is rolled back and the events stay.
+
+    Args:
+        sink (Sink): The destination of the events.
+        batch_size (int): Maximum number of events delivered.
+
+    Returns:
+        int: The number of delivered events, 0 if the outbox is empty.
+    """
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update().order_by("pk")[:batch_size]
+        )
+        if not events:
+            return 0
+        sink.send([event.to_dict() for event in events])
+        OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
+    return len(events)
@@ -0,0 +1,54 @@
+import time
+from django.core.management.base import BaseCommand
+from outbox.delivery import drain_batch
+from outbox.sinks import FileSink, HttpSink, get_sink
+
+
+class Command(BaseCommand):
+    """
+    Delivers the outbox events downstream in large batches.
+    The sink is OUTBOX_SINK unless a file or URL is given.
+    """
+
+    help = "Deliver the outbox events to the configured sink."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="Append the events to this NDJSON file.")
+        parser.add_argument("--url", help="Post the events to this URL.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of events delivered per batch.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep waiting for new events instead of exiting when empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the outbox is empty, with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            sink = FileSink(options["file"])
+        elif options["url"]:
+            sink = HttpSink(options["url"])
+        else:
+            sink = get_sink()
+
+        delivered = 0
+        while True:
+            count = drain_batch(sink, options["batch_size"])
+            delivered += count
+            if count:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Delivered {delivered} events."))
@@ -0,0 +1,71 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
+
+
+class OutboxEvent(models.Model):
+    """
+    Model that represents a change of a booking, property or pricing rule
+    waiting to be delivered downstream.
+    It is written in the same transaction as the change and deleted once
+    the drain_outbox command delivered it.
+    """
+
+    CREATED = "c"
+    UPDATED = "u"
+    DELETED = "d"
+    OPERATIONS = [(CREATED, "created"), (UPDATED, "updated"), (DELETED, "deleted")]
+
+    model = models.CharField(max_length=32)
+    """model: Name of the changed model, for example booking"""
+    object_id = models.BigIntegerField()
+    """object_id: ID of the changed row"""
+    operation = models.CharField(max_length=1, choices=OPERATIONS)
+    """operation: Whether the row was created, updated or deleted"""
+    payload = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    """payload: Values of the row after the change, empty for deletions"""
+    created_at = models.DateTimeField(auto_now_add=True)
+    """created_at: Date of the change"""
+
+    def to_dict(self) -> dict:
+        """
+        Get the event as delivered to the sinks.
+
+        Returns:
+            dict: The ID, model, object ID, operation, payload and date of the event.
+        """
+        return {
+            "id": self.id,
+            "model": self.model,
+            "object_id": self.object_id,
+            "operation": self.get_operation_display(),
+            "payload": self.payload,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    def __str__(self):
+        return (
+            f"{self.id} - {self.model} {self.object_id} {self.get_operation_display()}"
+        )
+
+
+class OutboxModel(models.Model):
+    """
+    Abstract model whose saves and deletions run in a transaction, so the
+    outbox event written by their signal receivers is committed together
+    with the change, in a request, a management command or the shell alike.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(
+        self, force_insert=False, force_update=False, using=None, update_fields=None
+    ):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(force_insert, force_update, using, update_fields)
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            return super().delete(using=using, keep_parents=keep_parents)
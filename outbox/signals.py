@@ -0,0 +1,56 @@
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from bookings.models import Booking
+from outbox.models import OutboxEvent
+from pricing_rules.models import PricingRule
+from properties.models import Property
+
+TRACKED_MODELS = (Booking, Property, PricingRule)
+
+
+def get_payload(instance: models.Model) -> dict:
+    """
+    Get the values of the concrete fields of a row, skipping binary fields.
+
+    Args:
+        instance (models.Model): The changed row.
+
+    Returns:
+        dict: The values keyed by column name, for example property_id.
+    """
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+        if not isinstance(field, models.BinaryField)
+    }
+
+
+def record_save(sender, instance: models.Model, created: bool, **kwargs) -> None:
+    """
+    Write an outbox event for a created or updated row.
+    """
+    if kwargs.get("raw"):
+        return
+    OutboxEvent.objects.create(
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        operation=OutboxEvent.CREATED if created else OutboxEvent.UPDATED,
+        payload=get_payload(instance),
+    )
+
+
+def record_delete(sender, instance: models.Model, **kwargs) -> None:
+    """
+    Write an outbox event for a deleted row.
+    """
+    OutboxEvent.objects.create(
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        operation=OutboxEvent.DELETED,
+    )
+
+
+for tracked_model in TRACKED_MODELS:
+    receiver(post_save, sender=tracked_model)(record_save)
+    receiver(post_delete, sender=tracked_model)(record_delete)
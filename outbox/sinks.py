@@ -0,0 +1,91 @@
+import json
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import List
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+
+class Sink(ABC):
+    """
+    Destination of the outbox events.
+    Subclasses deliver a whole batch per call and raise if it failed, then
+    the batch stays in the outbox and is delivered again.
+    """
+
+    @abstractmethod
+    def send(self, events: List[dict]) -> None:
+        """
+        Deliver a batch of events.
+
+        Args:
+            events (List[dict]): The events, as returned by OutboxEvent.to_dict.
+        """
+
+
+class FileSink(Sink):
+    """
+    Appends the events to a file, one JSON document per line.
+
+    Attributes:
+        path: The file to append to.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, events: List[dict]) -> None:
+        with open(self.path, "a") as file:
+            for event in events:
+                file.write(json.dumps(event, cls=DjangoJSONEncoder) + "\n")
+
+
+class HttpSink(Sink):
+    """
+    Posts each batch of events as a JSON array to a URL.
+
+    Attributes:
+        url: The URL receiving the events.
+        timeout: Seconds to wait for the response.
+    """
+
+    def __init__(self, url: str, timeout: float = 10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events: List[dict]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(events, cls=DjangoJSONEncoder).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def get_sink() -> Sink:
+    """
+    Build the sink configured in the OUTBOX_SINK setting.
+
+    Returns:
+        Sink: An instance of OUTBOX_SINK["CLASS"] built with the options of
+        OUTBOX_SINK["OPTIONS"] that are set.
+
+    Raises:
+        ImproperlyConfigured: If the options do not match the class.
+    """
+    sink_settings = settings.OUTBOX_SINK
+    options = {
+        name: value
+        for name, value in sink_settings.get("OPTIONS", {}).items()
+        if value is not None
+    }
+    try:
+        return import_string(sink_settings["CLASS"])(**options)
+    except TypeError as error:
+        raise ImproperlyConfigured(
+            f"Invalid OUTBOX_SINK options for {sink_settings['CLASS']}: {error}"
+        )
@@ -0,0 +1,180 @@
+import io
+import json
+import tempfile
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bookings.models import Booking
+from outbox.delivery import drain_batch
+from outbox.models import OutboxEvent
+from outbox.sinks import HttpSink, Sink, get_sink
+from pricing_rules.models import PricingRule
+from properties.models import Property
+
+
+class FailingSink(Sink):
+    def send(self, events):
+        raise ConnectionError("sink is down")
+
+
+class OutboxTestCase(APITestCase):
+    """
+    Test case for the outbox events and their delivery.
+    """
+
+    def setUp(self):
+        self.property = Property.objects.create(name="Property", base_price=100)
+        OutboxEvent.objects.all().delete()
+
+    def test_record_changes(self):
+        """
+        Ensure creating, updating and deleting rows writes outbox events.
+        """
+        response = self.client.post(
+            reverse("booking-list"),
+            {
+                "property": self.property.id,
+                "start_date": "01-01-2022",
+                "end_date": "01-03-2022",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        rule = PricingRule.objects.create(property=self.property, min_stay_length=2)
+        rule.delete()
+
+        events = list(
+            OutboxEvent.objects.order_by("pk").values_list(
+                "model", "object_id", "operation"
+            )
+        )
+        self.assertEqual(
+            events,
+            [
+                ("booking", response.data["id"], OutboxEvent.CREATED),
+                ("pricingrule", events[1][1], OutboxEvent.CREATED),
+                ("pricingrule", events[1][1], OutboxEvent.DELETED),
+            ],
+        )
+        payload = OutboxEvent.objects.order_by("pk").first().payload
+        self.assertEqual(payload["property_id"], self.property.id)
+        self.assertEqual(payload["start_date"], "2022-01-01")
+
+    def test_skip_binary_fields(self):
+        """
+        Ensure the availability bitmap is not part of the property payload.
+        """
+        self.property.name = "Renamed"
+        self.property.save()
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.operation, OutboxEvent.UPDATED)
+        self.assertEqual(event.payload["name"], "Renamed")
+        self.assertNotIn("availability", event.payload)
+
+    def test_drain_to_file(self):
+        """
+        Ensure the command appends the events to a file and empties the outbox.
+        """
+        Booking.objects.create(
+            property=self.property,
+            start_date=date(2022, 1, 1),
+            end_date=date(2022, 1, 2),
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "events.ndjson"
+            call_command(
+                "drain_outbox", file=str(path), batch_size=1, stdout=io.StringIO()
+            )
+            lines = path.read_text().splitlines()
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["operation"], "created")
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_keep_events_when_sink_fails(self):
+        """
+        Ensure the events stay in the outbox if the sink raises.
+        """
+        self.property.save()
+
+        with self.assertRaises(ConnectionError):
+            drain_batch(FailingSink(), 100)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    def test_drain_to_http(self):
+        """
+        Ensure the HTTP sink posts each batch as a JSON array.
+        """
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                received.append(json.loads(self.rfile.read(length)))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            self.property.save()
+            self.property.save()
+            url = f"http://127.0.0.1:{server.server_port}/"
+            self.assertEqual(drain_batch(HttpSink(url), 100), 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual([event["model"] for event in received[0]], ["property"] * 2)
+
+    def test_get_sink(self):
+        """
+        Ensure the configured sink is built with its options, and that
+        options not matching the class are reported.
+        """
+        url = "http://127.0.0.1/events/"
+        sink_settings = {"CLASS": "outbox.sinks.HttpSink", "OPTIONS": {"url": url}}
+        with override_settings(OUTBOX_SINK=sink_settings):
+            self.assertEqual(get_sink().url, url)
+        sink_settings["OPTIONS"] = {"url": None}
+        with override_settings(OUTBOX_SINK=sink_settings):
+            with self.assertRaises(ImproperlyConfigured):
+                get_sink()
+
+
+class OutboxAtomicityTestCase(TransactionTestCase):
+    """
+    Test case for the outbox events written outside of a request.
+    """
+
+    def test_event_rolled_back_with_change(self):
+        """
+        Ensure a save failing after its outbox event was written leaves
+        neither the row nor the event.
+        """
+
+        def fail(sender, **kwargs):
+            raise RuntimeError("receiver failed")
+
+        post_save.connect(fail, sender=Property)
+        try:
+            with self.assertRaises(RuntimeError):
+                Property.objects.create(name="Property", base_price=100)
+        finally:
+            post_save.disconnect(fail, sender=Property)
+        self.assertFalse(Property.objects.exists())
+        self.assertFalse(OutboxEvent.objects.exists())
@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import PricingRule
+from .models import PricingRule, PricingRuleTemplate
 
 admin.site.register(PricingRule)
+admin.site.register(PricingRuleTemplate)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PricingRulesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pricing_rules"
+
+    def ready(self):
+        import pricing_rules.signals  # noqa: F401
@@ -1,5 +1,6 @@
 import django_filters
 from .models import PricingRule
+from reservations.money import HundredthsFilter
 
 
 class PricingRuleFilter(django_filters.FilterSet):
@@ -7,12 +8,21 @@ class PricingRuleFilter(django_filters.FilterSet):
     Filter class for the PricingRule model.
     """
 
+    price_modifier = HundredthsFilter(field_name="price_modifier_bp")
+    price_modifier__lt = HundredthsFilter(
+        field_name="price_modifier_bp", lookup_expr="lt"
+    )
+    price_modifier__gt = HundredthsFilter(
+        field_name="price_modifier_bp", lookup_expr="gt"
+    )
+    fixed_price = HundredthsFilter(field_name="fixed_price_cents")
+    fixed_price__lt = HundredthsFilter(field_name="fixed_price_cents", lookup_expr="lt")
+    fixed_price__gt = HundredthsFilter(field_name="fixed_price_cents", lookup_expr="gt")
+
     class Meta:
         model = PricingRule
         fields = {
             "property__name": ["icontains"],
-            "price_modifier": ["exact", "lt", "gt"],
             "min_stay_length": ["exact", "lt", "gt"],
-            "fixed_price": ["exact", "lt", "gt"],
             "specific_day": ["exact", "lt", "gt"],
         }
@@ -0,0 +1,57 @@
+from itertools import groupby
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from pricing_rules.models import PricingRule
+from pricing_rules.normalization import RULE_FIELDS, find_redundant_rules
+
+
+class Command(BaseCommand):
+    """
+    Reports the dead and dominated pricing rules of every property, and
+    deletes them with --apply so the pricing reads minimal rule sets.
+    """
+
+    help = "Find, and optionally delete, redundant pricing rules."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--property",
+            type=int,
+            action="append",
+            help="Only check this property ID, can be repeated.",
+        )
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Delete the redundant rules instead of only reporting them.",
+        )
+
+    def handle(self, *args, **options):
+        rules = PricingRule.objects.order_by("property_id")
+        if options["property"]:
+            rules = rules.filter(property_id__in=options["property"])
+        rules = rules.values("id", "property_id", *RULE_FIELDS)
+
+        redundant_ids = []
+        for property_id, property_rules in groupby(
+            rules.iterator(), key=lambda rule: rule["property_id"]
+        ):
+            for redundant in find_redundant_rules(property_rules):
+                kept = f", kept {redundant.kept_id}" if redundant.kept_id else ""
+                self.stdout.write(
+                    f"Property {property_id}: rule {redundant.rule_id} is "
+                    f"{redundant.reason}{kept}"
+                )
+                redundant_ids.append(redundant.rule_id)
+
+        if not options["apply"]:
+            self.stdout.write(
+                f"Found {len(redundant_ids)} redundant rules, use --apply to delete them."
+            )
+            return
+
+        with transaction.atomic():
+            PricingRule.objects.filter(pk__in=redundant_ids).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {len(redundant_ids)} redundant rules.")
+        )
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:00
+
+from decimal import ROUND_HALF_UP, Decimal
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def to_hundredths(value):
+    if value is None:
+        return None
+    return int((Decimal(repr(value)) * 100).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def from_hundredths(value):
+    if value is None:
+        return None
+    return value / 100
+
+
+def copy_fields(queryset, fields, convert):
+    """
+    Set each target field of the rows to the converted value of its source
+    field, a batch of rows at a time in order of primary key, so the table
+    is never loaded whole.
+    """
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", *fields.values())[:BATCH_SIZE]
+        )
+        if not rows:
+            return
+        for row in rows:
+            for target, source in fields.items():
+                setattr(row, target, convert(getattr(row, source)))
+        queryset.bulk_update(rows, list(fields))
+        last_pk = rows[-1].pk
+
+
+def forwards(apps, schema_editor):
+    Model = apps.get_model("pricing_rules", "PricingRule")
+    copy_fields(
+        Model.objects.using(schema_editor.connection.alias),
+        {"price_modifier_bp": "price_modifier", "fixed_price_cents": "fixed_price"},
+        to_hundredths,
+    )
+
+
+def backwards(apps, schema_editor):
+    Model = apps.get_model("pricing_rules", "PricingRule")
+    copy_fields(
+        Model.objects.using(schema_editor.connection.alias),
+        {"price_modifier": "price_modifier_bp", "fixed_price": "fixed_price_cents"},
+        from_hundredths,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pricing_rules", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pricingrule",
+            name="price_modifier_bp",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="pricingrule",
+            name="fixed_price_cents",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(forwards, backwards),
+        migrations.RemoveField(
+            model_name="pricingrule",
+            name="price_modifier",
+        ),
+        migrations.RemoveField(
+            model_name="pricingrule",
+            name="fixed_price",
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pricing_rules", "0002_pricingrule_cents"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pricingrule",
+            name="max_occupancy_bp",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="pricingrule",
+            name="min_occupancy_bp",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0006_propertygroup"),
+        ("pricing_rules", "0003_pricingrule_occupancy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PricingRuleTemplate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("price_modifier_bp", models.IntegerField(blank=True, null=True)),
+                ("min_stay_length", models.IntegerField(blank=True, null=True)),
+                ("fixed_price_cents", models.IntegerField(blank=True, null=True)),
+                ("specific_day", models.DateField(blank=True, null=True)),
+                ("min_occupancy_bp", models.IntegerField(blank=True, null=True)),
+                ("max_occupancy_bp", models.IntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, null=True)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rule_templates",
+                        to="properties.propertygroup",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pricing_rules", "0004_pricingruletemplate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pricingrule",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="pricingrule",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["property", "min_stay_length"],
+                name="pricingrule_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pricingrule",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at"],
+                name="pricingrule_deleted_idx",
+            ),
+        ),
+    ]
@@ -1,30 +1,98 @@
 from django.db import models
+from outbox.models import OutboxModel
+from reservations.money import hundredths_property
+from reservations.softdelete import ALIVE, DELETED, SoftDeleteModel
 
 
-class PricingRule(models.Model):
+class BaseRule(models.Model):
     """
-    Model that represents a pricing rule that will be applied to a property when booking.
+    Fields shared by the pricing rules of a property and the rule templates
+    of a group of properties.
     A rule can have a fixed price, or a percent modifier.
     Only one rule can apply per day.
     We can have multiple rules for the same day, but only the most relevant rule applies.
+    An occupancy rule has a min_occupancy and/or a max_occupancy and a price modifier,
+    applied to the whole price when the property is that booked around the stay.
     """
 
-    property = models.ForeignKey(
-        "properties.Property", blank=False, null=False, on_delete=models.CASCADE
-    )
-    """property: This rule is applied to a particular property"""
-    price_modifier = models.FloatField(null=True, blank=True)
-    """price_modifier: Represents a percentage that can be positive (increment) or negative (discount)"""
+    price_modifier_bp = models.IntegerField(null=True, blank=True)
+    """price_modifier_bp: Percentage in hundredths of a percent that can be positive (increment) or negative (discount)"""
     min_stay_length = models.IntegerField(null=True, blank=True)
     """min_stay_length: This rule applies only if the stay_length of the booking is >= min_stay_length """
-    fixed_price = models.FloatField(null=True, blank=True)
-    """fixed_price: A rule can have a fixed price for the given day"""
+    fixed_price_cents = models.IntegerField(null=True, blank=True)
+    """fixed_price_cents: A rule can have a fixed price in cents for the given day"""
     specific_day = models.DateField(null=True, blank=True)
     """specific_day: A rule can apply to a specific date. Ex: Christmas"""
+    min_occupancy_bp = models.IntegerField(null=True, blank=True)
+    """min_occupancy_bp: This rule applies only if the occupancy is >= min_occupancy_bp, in hundredths of a percent"""
+    max_occupancy_bp = models.IntegerField(null=True, blank=True)
+    """max_occupancy_bp: This rule applies only if the occupancy is <= max_occupancy_bp, in hundredths of a percent"""
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=False)
     """created_at: Date of creation"""
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=False)
     """updated_at: Date of update"""
 
+    price_modifier = hundredths_property(
+        "price_modifier_bp",
+        "price_modifier: Represents a percentage that can be positive (increment) or negative (discount)",
+    )
+    fixed_price = hundredths_property(
+        "fixed_price_cents",
+        "fixed_price: A rule can have a fixed price for the given day",
+    )
+    min_occupancy = hundredths_property(
+        "min_occupancy_bp",
+        "min_occupancy: Minimum percentage of booked days in the occupancy window",
+    )
+    max_occupancy = hundredths_property(
+        "max_occupancy_bp",
+        "max_occupancy: Maximum percentage of booked days in the occupancy window",
+    )
+
+    class Meta:
+        abstract = True
+
+
+class PricingRule(OutboxModel, SoftDeleteModel, BaseRule):
+    """
+    Model that represents a pricing rule that will be applied to a property when booking.
+    Deleting a rule only sets its deleted_at, see reservations.softdelete.
+    """
+
+    property = models.ForeignKey(
+        "properties.Property", blank=False, null=False, on_delete=models.CASCADE
+    )
+    """property: This rule is applied to a particular property"""
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["property", "min_stay_length"],
+                condition=ALIVE,
+                name="pricingrule_active_idx",
+            ),
+            models.Index(
+                fields=["deleted_at"], condition=DELETED, name="pricingrule_deleted_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.property.name}"
+
+
+class PricingRuleTemplate(BaseRule):
+    """
+    Model that represents a pricing rule shared by every property of a group.
+    A rule of the property itself for the same specific_day or min_stay_length
+    takes precedence over the template.
+    """
+
+    group = models.ForeignKey(
+        "properties.PropertyGroup",
+        on_delete=models.CASCADE,
+        related_name="rule_templates",
+    )
+    """group: This rule is applied to every property of the group"""
+
+    def __str__(self):
+        return f"{self.group.name}"
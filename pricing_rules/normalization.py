@@ -0,0 +1,150 @@
+"""
+Detection of the pricing rules that can never be the most relevant one.
+
+calculate_final_price iterates every rule of a property, so duplicated days
+and tiers are both slower and priced twice. A rule is redundant when:
+    - It is dead: it has neither a specific_day with a fixed_price nor a
+      min_stay_length with a price_modifier nor is an occupancy rule with a
+      price_modifier, so it never applies.
+    - It is dominated: another rule has the same specific_day (or the same
+      min_stay_length) and a bigger fixed_price (or price_modifier), so by
+      the most relevant rule policy it never wins.
+"""
+
+from datetime import date
+from itertools import groupby
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+DEAD = "dead"
+DUPLICATE_DAY = "duplicate specific_day"
+DUPLICATE_TIER = "duplicate min_stay_length"
+
+RuleKey = Tuple[str, Union[date, int]]
+
+RULE_FIELDS = (
+    "min_stay_length",
+    "price_modifier_bp",
+    "specific_day",
+    "fixed_price_cents",
+    "min_occupancy_bp",
+    "max_occupancy_bp",
+)
+
+
+class RedundantRule(NamedTuple):
+    """
+    A pricing rule that can be removed without changing which rule applies.
+
+    Attributes:
+        rule_id: ID of the redundant rule.
+        reason: DEAD, DUPLICATE_DAY or DUPLICATE_TIER.
+        kept_id: ID of the rule dominating it, None for dead rules.
+    """
+
+    rule_id: int
+    reason: str
+    kept_id: Optional[int] = None
+
+
+def is_occupancy_rule(rule: Dict) -> bool:
+    """
+    Check if a rule depends on the occupancy of the property.
+
+    Args:
+        rule (Dict): A pricing rule represented as a dictionary.
+
+    Returns:
+        bool: True if the rule has a minimum or a maximum occupancy.
+    """
+    return (
+        rule.get("min_occupancy_bp") is not None
+        or rule.get("max_occupancy_bp") is not None
+    )
+
+
+def is_day_rule(rule: Dict) -> bool:
+    return (
+        not is_occupancy_rule(rule)
+        and rule.get("specific_day") is not None
+        and rule.get("fixed_price_cents") is not None
+    )
+
+
+def is_tier_rule(rule: Dict) -> bool:
+    return (
+        not is_occupancy_rule(rule)
+        and rule.get("min_stay_length") is not None
+        and rule.get("price_modifier_bp") is not None
+    )
+
+
+def get_rule_key(rule: Dict) -> Optional[RuleKey]:
+    """
+    Get the key two rules of a property must share to compete for a day.
+    Rules with both a day part and a tier part apply twice, so they are
+    never considered duplicates.
+
+    Args:
+        rule (Dict): A rule with the fields of get_pricing_rules.
+
+    Returns:
+        Optional[RuleKey]: ("day", specific_day), ("tier", min_stay_length) or
+        None if the rule has both parts or none.
+    """
+    day_rule, tier_rule = is_day_rule(rule), is_tier_rule(rule)
+    if day_rule and not tier_rule:
+        return ("day", rule["specific_day"])
+    if tier_rule and not day_rule:
+        return ("tier", rule["min_stay_length"])
+    return None
+
+
+def get_rule_value(rule: Dict) -> int:
+    """
+    Get the amount compared to pick the most relevant of duplicated rules.
+
+    Args:
+        rule (Dict): A day rule or a tier rule.
+
+    Returns:
+        int: The fixed price in cents of day rules, the price modifier in
+        basis points of tier rules.
+    """
+    if is_day_rule(rule):
+        return rule["fixed_price_cents"]
+    return rule["price_modifier_bp"]
+
+
+def find_redundant_rules(rules: Iterable[Dict]) -> List[RedundantRule]:
+    """
+    Find the dead and dominated rules of a single property with a sorted sweep.
+    The rules are sorted by key and then by decreasing value, so the first
+    rule of each run of equal keys is kept and the rest are dominated.
+    Ties are kept by the lowest ID.
+
+    Args:
+        rules (Iterable[Dict]): The rules of a property, with an "id" and the
+            fields of get_pricing_rules.
+
+    Returns:
+        List[RedundantRule]: The redundant rules, sorted by ID.
+    """
+    redundant = []
+    keyed = []
+    for rule in rules:
+        key = get_rule_key(rule)
+        if key is not None:
+            keyed.append((key, -get_rule_value(rule), rule["id"]))
+        elif is_occupancy_rule(rule):
+            if rule.get("price_modifier_bp") is None:
+                redundant.append(RedundantRule(rule["id"], DEAD))
+        elif not is_day_rule(rule) and not is_tier_rule(rule):
+            redundant.append(RedundantRule(rule["id"], DEAD))
+
+    keyed.sort(key=lambda item: (item[0][0], item[0][1], item[1], item[2]))
+    for key, run in groupby(keyed, key=lambda item: item[0]):
+        kept_id = next(run)[2]
+        reason = DUPLICATE_DAY if key[0] == "day" else DUPLICATE_TIER
+        redundant.extend(RedundantRule(item[2], reason, kept_id) for item in run)
+
+    return sorted(redundant)
@@ -1,10 +1,111 @@
 from typing import Optional
 from rest_framework import serializers
-from pricing_rules.models import PricingRule
+from pricing_rules.models import PricingRule, PricingRuleTemplate
+from pricing_rules.normalization import RULE_FIELDS, get_rule_key, is_occupancy_rule
 from properties.models import Property
+from reservations.money import BASIS_POINTS, HundredthsField
+from reservations.renderers import CompactDateField, CompactDateTimeField
 
 
-class PricingRuleSerializer(serializers.ModelSerializer):
+def validate_occupancy_rule(rule: dict) -> None:
+    """
+    Checks that an occupancy rule has a price modifier and a valid range.
+
+    Args:
+        rule: The fields of the rule, by model field name.
+
+    Raises:
+        serializers.ValidationError: If the rule is not valid.
+    """
+    for field in ("specific_day", "fixed_price_cents", "min_stay_length"):
+        if rule[field] is not None:
+            raise serializers.ValidationError(
+                "Occupancy rules only have an occupancy range and a price modifier."
+            )
+    if rule["price_modifier_bp"] is None:
+        raise serializers.ValidationError(
+            {"price_modifier": "Occupancy rules need a price modifier."}
+        )
+    minimum, maximum = rule["min_occupancy_bp"], rule["max_occupancy_bp"]
+    for bound in (minimum, maximum):
+        if bound is not None and not 0 <= bound <= BASIS_POINTS:
+            raise serializers.ValidationError(
+                {"min_occupancy": "The occupancy range must be between 0 and 100."}
+            )
+    if minimum is not None and maximum is not None and minimum > maximum:
+        raise serializers.ValidationError(
+            {"max_occupancy": "The maximum occupancy must not be below the minimum."}
+        )
+
+
+class BaseRuleSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the fields shared by pricing rules and rule templates.
+
+    Attributes:
+        specific_day: DateField for the specific day when the rule applies.
+        price_modifier: Percentage modifier, stored in basis points.
+        fixed_price: Fixed price for the specific day, stored in cents.
+        min_occupancy: Minimum occupancy percentage, stored in basis points.
+        max_occupancy: Maximum occupancy percentage, stored in basis points.
+        owner_field: The field of the property or group owning the rule.
+    """
+
+    specific_day = CompactDateField(format="%m-%d-%Y", required=False)
+    price_modifier = HundredthsField(
+        source="price_modifier_bp", required=False, allow_null=True
+    )
+    fixed_price = HundredthsField(
+        source="fixed_price_cents", required=False, allow_null=True
+    )
+    min_occupancy = HundredthsField(
+        source="min_occupancy_bp", required=False, allow_null=True
+    )
+    max_occupancy = HundredthsField(
+        source="max_occupancy_bp", required=False, allow_null=True
+    )
+    created_at = CompactDateTimeField(read_only=True)
+    updated_at = CompactDateTimeField(read_only=True)
+
+    owner_field = None
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Rejects a rule with the same specific_day or min_stay_length as
+        another rule of the same owner, as only one of them could ever apply,
+        and occupancy rules that are not only an occupancy range and a
+        price modifier.
+
+        Args:
+            attrs: The validated fields of the rule.
+
+        Returns:
+            The validated fields.
+        """
+        rule = {
+            field: attrs.get(field, getattr(self.instance, field, None))
+            for field in [self.owner_field, *RULE_FIELDS]
+        }
+        if is_occupancy_rule(rule):
+            validate_occupancy_rule(rule)
+        key = get_rule_key(rule)
+        if key is None or rule[self.owner_field] is None:
+            return attrs
+
+        others = self.Meta.model.objects.filter(
+            **{self.owner_field: rule[self.owner_field]}
+        )
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if any(get_rule_key(other) == key for other in others.values(*RULE_FIELDS)):
+            field = "specific_day" if key[0] == "day" else "min_stay_length"
+            raise serializers.ValidationError(
+                {field: f"The {self.owner_field} already has a rule for this {field}."}
+            )
+        return attrs
+
+
+class PricingRuleSerializer(BaseRuleSerializer):
     """
     Serializer for the PricingRule model.
 
@@ -12,13 +113,13 @@ class PricingRuleSerializer(serializers.ModelSerializer):
     Includes the property name as a read-only field using a SerializerMethodField.
 
     Attributes:
-        specific_day: DateField for the specific day when the pricing rule applies.
         property_name: SerializerMethodField for the name of the associated property.
     """
 
-    specific_day = serializers.DateField(format="%m-%d-%Y", required=False)
     property_name = serializers.SerializerMethodField()
 
+    owner_field = "property"
+
     class Meta:
         model = PricingRule
         fields = [
@@ -29,6 +130,8 @@ class PricingRuleSerializer(serializers.ModelSerializer):
             "min_stay_length",
             "fixed_price",
             "specific_day",
+            "min_occupancy",
+            "max_occupancy",
             "created_at",
             "updated_at",
         ]
@@ -44,3 +147,102 @@ class PricingRuleSerializer(serializers.ModelSerializer):
             The name of the associated property if available, otherwise None.
         """
         return obj.property.name if obj.property else None
+
+
+class PricingRuleTemplateSerializer(BaseRuleSerializer):
+    """
+    Serializer for the PricingRuleTemplate model, the rules shared by every
+    property of a group.
+    """
+
+    owner_field = "group"
+
+    class Meta:
+        model = PricingRuleTemplate
+        fields = [
+            "id",
+            "group",
+            "price_modifier",
+            "min_stay_length",
+            "fixed_price",
+            "specific_day",
+            "min_occupancy",
+            "max_occupancy",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class SimulatedRuleSerializer(serializers.Serializer):
+    """
+    Serializer for a candidate pricing rule, which is never saved.
+    """
+
+    min_stay_length = serializers.IntegerField(
+        required=False, allow_null=True, min_value=1
+    )
+    price_modifier = HundredthsField(
+        source="price_modifier_bp", required=False, allow_null=True
+    )
+    fixed_price = HundredthsField(
+        source="fixed_price_cents", required=False, allow_null=True
+    )
+    specific_day = serializers.DateField(
+        format="%m-%d-%Y", required=False, allow_null=True
+    )
+    min_occupancy = HundredthsField(
+        source="min_occupancy_bp", required=False, allow_null=True
+    )
+    max_occupancy = HundredthsField(
+        source="max_occupancy_bp", required=False, allow_null=True
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Rejects occupancy rules that are not only an occupancy range and a
+        price modifier, as BaseRuleSerializer does.
+
+        Args:
+            attrs: The validated fields of the rule.
+
+        Returns:
+            The validated fields.
+        """
+        rule = {field: attrs.get(field) for field in RULE_FIELDS}
+        if is_occupancy_rule(rule):
+            validate_occupancy_rule(rule)
+        return attrs
+
+
+class SimulationSerializer(serializers.Serializer):
+    """
+    Serializer for a what-if simulation of a rule set over the bookings of a
+    property. The optional start_date and end_date (format: MM-DD-YYYY) only
+    replay the bookings starting between them.
+    """
+
+    property = serializers.PrimaryKeyRelatedField(queryset=Property.objects.all())
+    rules = SimulatedRuleSerializer(many=True)
+    start_date = serializers.DateField(format="%m-%d-%Y", required=False)
+    end_date = serializers.DateField(format="%m-%d-%Y", required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Checks that the dates are in order and the property has a base price.
+
+        Args:
+            attrs: The validated fields.
+
+        Returns:
+            The validated fields.
+        """
+        start_date, end_date = attrs.get("start_date"), attrs.get("end_date")
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError(
+                {"end_date": "The end date must be on or after the start date."}
+            )
+        if attrs["property"].base_price is None:
+            raise serializers.ValidationError(
+                {"property": "The property does not have a base price."}
+            )
+        return attrs
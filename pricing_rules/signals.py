@@ -0,0 +1,93 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from pricing_rules.models import PricingRule, PricingRuleTemplate
+from properties.models import Property, PropertyGroup
+
+
+@receiver(pre_save, sender=PricingRule)
+def remember_previous_property(sender, instance: PricingRule, **kwargs) -> None:
+    """
+    Remember the property an existing pricing rule belonged to before saving
+    it, so the rules version of both properties is increased if it changed.
+    """
+    instance._previous_property_id = None
+    if instance.pk and not kwargs.get("raw"):
+        instance._previous_property_id = (
+            PricingRule.objects.filter(pk=instance.pk)
+            .values_list("property_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=PricingRule)
+@receiver(post_delete, sender=PricingRule)
+def bump_rules_version(sender, instance: PricingRule, **kwargs) -> None:
+    """
+    Increase the rules version of the property of a created, updated or
+    deleted pricing rule, and of the property it was moved from, so their
+    memoized quotes are not used anymore.
+    """
+    if kwargs.get("raw"):
+        return
+    property_ids = {instance.property_id}
+    property_ids.add(getattr(instance, "_previous_property_id", None))
+    Property.objects.filter(pk__in=property_ids - {None}).update(
+        rules_version=F("rules_version") + 1
+    )
+
+
+def bump_groups_rules_version(group_ids) -> None:
+    """
+    Increase the rules version of groups and of their properties, so the
+    memoized templates and quotes of the groups are not used anymore.
+    """
+    group_ids = set(group_ids) - {None}
+    PropertyGroup.objects.filter(pk__in=group_ids).update(
+        rules_version=F("rules_version") + 1
+    )
+    Property.objects.filter(group_id__in=group_ids).update(
+        rules_version=F("rules_version") + 1
+    )
+
+
+@receiver(pre_save, sender=PricingRuleTemplate)
+def remember_previous_group(sender, instance: PricingRuleTemplate, **kwargs) -> None:
+    """
+    Remember the group an existing rule template belonged to before saving
+    it, so the rules version of both groups is increased if it changed.
+    """
+    instance._previous_group_id = None
+    if instance.pk and not kwargs.get("raw"):
+        instance._previous_group_id = (
+            PricingRuleTemplate.objects.filter(pk=instance.pk)
+            .values_list("group_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=PricingRuleTemplate)
+@receiver(post_delete, sender=PricingRuleTemplate)
+def bump_group_rules_version(sender, instance: PricingRuleTemplate, **kwargs) -> None:
+    """
+    Increase the rules version of the group of a created, updated or deleted
+    rule template, and of the group it was moved from, so their memoized
+    templates and quotes are not used anymore.
+    """
+    if kwargs.get("raw"):
+        return
+    bump_groups_rules_version(
+        {instance.group_id, getattr(instance, "_previous_group_id", None)}
+    )
+
+
+@receiver(pre_delete, sender=PropertyGroup)
+def bump_deleted_group_rules_version(sender, instance: PropertyGroup, **kwargs) -> None:
+    """
+    Increase the rules version of the properties of a deleted group before
+    their group is set to NULL, so their quotes memoized with its templates
+    are not used anymore.
+    """
+    Property.objects.filter(group_id=instance.pk).update(
+        rules_version=F("rules_version") + 1
+    )
@@ -0,0 +1,163 @@
+"""
+Replay of a candidate rule set over the existing bookings of a property.
+
+Both the current and the proposed rules are replayed with the pricing engine
+of bookings.utils, so the deltas only show the effect of the rule changes and
+not of how each booking was priced at the time. The candidate rules are
+merged with the rule templates of the group of the property, and each booking
+is priced with the occupancy it was made at, as bookings.repricing does. The
+replay runs in the
+request: only the dates of the bookings are loaded, and each booking is
+priced twice in memory.
+"""
+
+from datetime import date
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+from bookings.models import ArchivedBooking, Booking
+from bookings.utils import (
+    calculate_final_price,
+    calculate_stay_length,
+    get_pricing_rules,
+    sort_pricing_rules,
+)
+from pricing_rules.templates import get_group_rules, merge_rules
+from properties.availability import get_occupancy_bp
+from properties.models import Property
+from reservations.money import from_hundredths
+
+Stay = Tuple[date, date, Optional[int]]
+MonthTotals = Dict[str, List[int]]
+
+BOOKINGS, CHANGED, CURRENT, PROPOSED = range(4)
+
+
+def replay_stays(
+    current_rules: List[Dict],
+    proposed_rules: List[Dict],
+    base_price_cents: int,
+    stays: List[Stay],
+) -> MonthTotals:
+    """
+    Price stays with the current and the proposed rules, totalled per month.
+
+    Args:
+        current_rules (List[Dict]): The sorted rules of the property.
+        proposed_rules (List[Dict]): The sorted candidate rules.
+        base_price_cents (int): The base price per day of the property, in cents.
+        stays (List[Stay]): The start and end dates and occupancy of the bookings.
+
+    Returns:
+        MonthTotals: Per month of the start date, the number of bookings, the
+        number of changed prices and the current and proposed revenue in cents.
+    """
+    totals = {}
+    for start_date, end_date, occupancy_bp in stays:
+        stay_length = calculate_stay_length(start_date, end_date)
+        current = calculate_final_price(
+            current_rules,
+            start_date,
+            end_date,
+            stay_length,
+            base_price_cents,
+            occupancy_bp,
+        )
+        proposed = calculate_final_price(
+            proposed_rules,
+            start_date,
+            end_date,
+            stay_length,
+            base_price_cents,
+            occupancy_bp,
+        )
+        month = totals.setdefault(start_date.strftime("%Y-%m"), [0, 0, 0, 0])
+        month[BOOKINGS] += 1
+        month[CHANGED] += current != proposed
+        month[CURRENT] += current
+        month[PROPOSED] += proposed
+    return totals
+
+
+def get_stays(
+    property: Property, start_date: Optional[date], end_date: Optional[date]
+) -> List[Stay]:
+    """
+    Get the dates of the live and archived bookings of a property, with the
+    occupancy of the property leaving out their own days, as when they were
+    made.
+
+    Args:
+        property (Property): The property to replay, with its availability loaded.
+        start_date (Optional[date]): Only bookings starting on or after this day.
+        end_date (Optional[date]): Only bookings starting on or before this day.
+
+    Returns:
+        List[Stay]: The start and end dates and occupancy of each booking.
+    """
+    filters = {"property": property}
+    if start_date:
+        filters["start_date__gte"] = start_date
+    if end_date:
+        filters["start_date__lte"] = end_date
+    dates = chain(
+        Booking.objects.filter(**filters).values_list("start_date", "end_date"),
+        ArchivedBooking.objects.filter(**filters).values_list("start_date", "end_date"),
+    )
+    return [
+        (
+            start_date,
+            end_date,
+            get_occupancy_bp(property, start_date, exclude=(start_date, end_date)),
+        )
+        for start_date, end_date in dates
+    ]
+
+
+def simulate_rules(
+    property: Property,
+    rules: List[Dict],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> MonthTotals:
+    """
+    Compare the revenue of the bookings of a property with a candidate rule set.
+    The rule templates of its group apply to both, a candidate rule taking
+    precedence over a template as a rule of the property does.
+
+    Args:
+        property (Property): The property the rules are proposed for.
+        rules (List[Dict]): The candidate rules, with the fields of get_pricing_rules.
+        start_date (Optional[date]): Only bookings starting on or after this day.
+        end_date (Optional[date]): Only bookings starting on or before this day.
+
+    Returns:
+        MonthTotals: Per month, the number of bookings, the number of changed
+        prices and the current and proposed revenue in cents.
+    """
+    return replay_stays(
+        get_pricing_rules(property),
+        sort_pricing_rules(merge_rules(rules, get_group_rules(property.group_id))),
+        property.base_price_cents,
+        get_stays(property, start_date, end_date),
+    )
+
+
+def summarize(values: list, **extra) -> dict:
+    """
+    Format the totals of a simulation.
+
+    Args:
+        values (list): The bookings, changed, current and proposed totals.
+        **extra: Other keys of the summary, for example the month.
+
+    Returns:
+        dict: The counts, and the revenues and delta as prices.
+    """
+    return {
+        **extra,
+        "bookings": values[BOOKINGS],
+        "changed_bookings": values[CHANGED],
+        "current_revenue": from_hundredths(values[CURRENT]),
+        "proposed_revenue": from_hundredths(values[PROPOSED]),
+        "revenue_delta": from_hundredths(values[PROPOSED] - values[CURRENT]),
+    }
@@ -0,0 +1,78 @@
+"""
+Resolution of the pricing rule templates shared by groups of properties.
+
+The templates of a group are loaded once per worker and rules version of the
+group, so every property of the group reuses the same rules instead of
+storing and scanning its own copy.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.conf import settings
+from pricing_rules.models import PricingRuleTemplate
+from pricing_rules.normalization import RULE_FIELDS, get_rule_key
+from properties.models import PropertyGroup
+
+
+@lru_cache(maxsize=settings.GROUP_RULES_CACHE_SIZE)
+def load_group_rules(group_id: int, rules_version: int) -> Tuple[Dict, ...]:
+    """
+    Load the rule templates of a group, memoized by group and rules version.
+
+    Args:
+        group_id (int): The ID of the group.
+        rules_version (int): The rules version of the group, part of the key.
+
+    Returns:
+        Tuple[Dict, ...]: The templates, with the fields of get_pricing_rules.
+    """
+    return tuple(
+        PricingRuleTemplate.objects.filter(group_id=group_id).values(*RULE_FIELDS)
+    )
+
+
+def get_group_rules(group_id: Optional[int]) -> Tuple[Dict, ...]:
+    """
+    Get the rule templates of a group, reading only its rules version when
+    they are already memoized.
+
+    Args:
+        group_id (Optional[int]): The ID of the group, None for no group.
+
+    Returns:
+        Tuple[Dict, ...]: The templates of the group, empty without a group.
+    """
+    if group_id is None:
+        return ()
+    rules_version = (
+        PropertyGroup.objects.filter(pk=group_id)
+        .values_list("rules_version", flat=True)
+        .first()
+    )
+    if rules_version is None:
+        return ()
+    return load_group_rules(group_id, rules_version)
+
+
+def merge_rules(
+    property_rules: Iterable[Dict], template_rules: Iterable[Dict]
+) -> List[Dict]:
+    """
+    Merge the rules of a property with the templates of its group.
+    Templates for a specific_day or min_stay_length the property already has
+    a rule for are left out.
+
+    Args:
+        property_rules (Iterable[Dict]): The rules of the property.
+        template_rules (Iterable[Dict]): The templates of its group.
+
+    Returns:
+        List[Dict]: The rules of the property followed by the other templates.
+    """
+    rules = list(property_rules)
+    keys = {get_rule_key(rule) for rule in rules}
+    return rules + [
+        template
+        for template in template_rules
+        if get_rule_key(template) is None or get_rule_key(template) not in keys
+    ]
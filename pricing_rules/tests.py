@@ -1,9 +1,23 @@
+import io
+from datetime import date, timedelta
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.management import call_command
 from django.urls import reverse
-from properties.models import Property
-from pricing_rules.models import PricingRule
+from django.utils import timezone
+from bookings.models import Booking
+from bookings.quotes import quote_cache
+from properties.models import Property, PropertyGroup
+from pricing_rules.models import PricingRule, PricingRuleTemplate
 from pricing_rules.serializers import PricingRuleSerializer
+from pricing_rules.normalization import (
+    DEAD,
+    DUPLICATE_DAY,
+    DUPLICATE_TIER,
+    RedundantRule,
+    find_redundant_rules,
+)
+from pricing_rules.templates import load_group_rules
 
 
 class PricingRuleCreateTestCase(APITestCase):
@@ -80,3 +94,261 @@ class PricingRuleCreateTestCase(APITestCase):
         response = self.client.delete(self.detail_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertFalse(PricingRule.objects.filter(pk=self.rule1.pk).exists())
+
+    def test_reject_duplicate_tier(self):
+        """
+        Test that a second rule for the same min_stay_length is rejected.
+        """
+        data = {"property": self.property.pk, "min_stay_length": 7, "price_modifier": 5}
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("min_stay_length", response.data)
+
+    def test_reject_duplicate_day(self):
+        """
+        Test that a second fixed price for the same day is rejected, also when
+        updating another rule into it.
+        """
+        response = self.client.post(self.list_url, self.rule_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(self.list_url, self.rule_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.patch(
+            reverse("pricing-rule-detail", kwargs={"pk": self.rule2.pk}),
+            {"min_stay_length": 7},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PricingRuleNormalizationTestCase(APITestCase):
+    """
+    Test case for the detection and removal of redundant pricing rules.
+    """
+
+    def test_find_redundant_rules(self):
+        christmas = date(2022, 12, 24)
+        rules = [
+            {"id": 1, "min_stay_length": 7, "price_modifier_bp": -1000},
+            {"id": 2, "min_stay_length": 7, "price_modifier_bp": -500},
+            {"id": 3, "specific_day": christmas, "fixed_price_cents": 2000},
+            {"id": 4, "specific_day": christmas, "fixed_price_cents": 3000},
+            {"id": 5, "min_stay_length": 14},
+            {"id": 6, "min_stay_length": 14, "price_modifier_bp": -2000},
+            {"id": 7, "specific_day": christmas, "fixed_price_cents": 3000},
+        ]
+        self.assertEqual(
+            find_redundant_rules(rules),
+            [
+                RedundantRule(1, DUPLICATE_TIER, 2),
+                RedundantRule(3, DUPLICATE_DAY, 4),
+                RedundantRule(5, DEAD),
+                RedundantRule(7, DUPLICATE_DAY, 4),
+            ],
+        )
+
+    def test_normalize_pricing_rules(self):
+        property = Property.objects.create(name="Property", base_price=10)
+        kept = PricingRule.objects.create(
+            property=property, min_stay_length=7, price_modifier=-5
+        )
+        PricingRule.objects.create(
+            property=property, min_stay_length=7, price_modifier=-10
+        )
+        PricingRule.objects.create(property=property, specific_day=date(2022, 1, 1))
+
+        out = io.StringIO()
+        call_command("normalize_pricing_rules", stdout=out)
+        self.assertIn("Found 2 redundant rules", out.getvalue())
+        self.assertEqual(PricingRule.objects.count(), 3)
+
+        call_command("normalize_pricing_rules", apply=True, stdout=io.StringIO())
+        self.assertEqual(
+            list(PricingRule.objects.values_list("pk", flat=True)), [kept.pk]
+        )
+
+
+class PricingRuleSimulationTestCase(APITestCase):
+    """
+    Test case for the what-if simulation of candidate pricing rules.
+    """
+
+    def setUp(self):
+        self.property = Property.objects.create(name="Property", base_price=10)
+        PricingRule.objects.create(
+            property=self.property, min_stay_length=7, price_modifier=-10
+        )
+        for start_date, end_date in [
+            (date(2022, 1, 1), date(2022, 1, 10)),
+            (date(2022, 2, 1), date(2022, 2, 3)),
+        ]:
+            Booking.objects.create(
+                property=self.property, start_date=start_date, end_date=end_date
+            )
+        self.url = reverse("pricing-rule-simulate")
+        self.data = {
+            "property": self.property.pk,
+            "rules": [{"min_stay_length": 7, "price_modifier": -20}],
+        }
+
+    def assert_simulation(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["bookings"], 2)
+        self.assertEqual(response.data["changed_bookings"], 1)
+        self.assertEqual(response.data["current_revenue"], 120)
+        self.assertEqual(response.data["proposed_revenue"], 110)
+        self.assertEqual(response.data["revenue_delta"], -10)
+        self.assertEqual(
+            [month["month"] for month in response.data["months"]],
+            ["2022-01", "2022-02"],
+        )
+        self.assertEqual(response.data["months"][1]["revenue_delta"], 0)
+
+    def test_simulate_rules(self):
+        """
+        Test that the bookings are priced with the candidate rules without
+        changing the stored rules.
+        """
+        response = self.client.post(self.url, self.data, format="json")
+        self.assert_simulation(response)
+        self.assertEqual(PricingRule.objects.get().price_modifier, -10)
+
+    def test_simulate_with_group_templates(self):
+        """
+        Test that the templates of the group of the property still apply to
+        the candidate rules.
+        """
+        group = PropertyGroup.objects.create(name="Beach houses")
+        PricingRuleTemplate.objects.create(
+            group=group, min_stay_length=2, price_modifier=-50
+        )
+        self.property.group = group
+        self.property.save()
+        response = self.client.post(self.url, self.data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["changed_bookings"], 1)
+        self.assertEqual(response.data["current_revenue"], 105)
+        self.assertEqual(response.data["proposed_revenue"], 95)
+
+    def test_simulate_occupancy_rules(self):
+        """
+        Test that the bookings are replayed with the occupancy of the property
+        without their own days.
+        """
+        today = timezone.localdate()
+        for first_day in (1, 11):
+            Booking.objects.create(
+                property=self.property,
+                start_date=today + timedelta(days=first_day),
+                end_date=today + timedelta(days=first_day + 2),
+            )
+        data = {
+            "property": self.property.pk,
+            "rules": [{"min_occupancy": 10, "price_modifier": 50}],
+            "start_date": today.strftime("%m-%d-%Y"),
+        }
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["bookings"], 2)
+        self.assertEqual(response.data["changed_bookings"], 1)
+        self.assertEqual(response.data["current_revenue"], 60)
+        self.assertEqual(response.data["proposed_revenue"], 75)
+
+        data["rules"] = [{"min_occupancy": 10, "min_stay_length": 7}]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_simulate_date_range(self):
+        data = {**self.data, "start_date": "02-01-2022", "end_date": "12-31-2022"}
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.data["bookings"], 1)
+        self.assertEqual(response.data["revenue_delta"], 0)
+
+        data["end_date"] = "01-01-2022"
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PricingRuleTemplateTestCase(APITestCase):
+    """
+    Test case for the pricing rule templates shared by a group of properties.
+    """
+
+    def setUp(self):
+        load_group_rules.cache_clear()
+        quote_cache.clear()
+        self.group = PropertyGroup.objects.create(name="Beach houses")
+        self.property = Property.objects.create(
+            name="Property", base_price=10, group=self.group
+        )
+        self.template = PricingRuleTemplate.objects.create(
+            group=self.group, min_stay_length=7, price_modifier=-10
+        )
+        self.quote_url = reverse("booking-quote")
+        self.params = {
+            "property": self.property.pk,
+            "start_date": "01-01-2022",
+            "end_date": "01-10-2022",
+        }
+
+    def get_quote(self):
+        return self.client.get(self.quote_url, self.params).data["final_price"]
+
+    def test_template_applies_to_members(self):
+        self.assertEqual(self.get_quote(), 90)
+        other = Property.objects.create(name="Other", base_price=10)
+        self.params["property"] = other.pk
+        self.assertEqual(self.get_quote(), 100)
+
+    def test_property_rule_overrides_template(self):
+        PricingRule.objects.create(
+            property=self.property, min_stay_length=7, price_modifier=-20
+        )
+        self.assertEqual(self.get_quote(), 80)
+
+    def test_template_change_invalidates_quotes(self):
+        """
+        Test that editing a template reprices the quotes of every member.
+        """
+        self.assertEqual(self.get_quote(), 90)
+        response = self.client.patch(
+            reverse("pricing-rule-template-detail", kwargs={"pk": self.template.pk}),
+            {"price_modifier": -30},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_quote(), 70)
+
+        self.property.group = None
+        self.property.save()
+        self.assertEqual(self.get_quote(), 100)
+
+    def test_template_moved_to_another_group(self):
+        """
+        Test that moving a template stops applying it to the previous group.
+        """
+        self.assertEqual(self.get_quote(), 90)
+        self.template.group = PropertyGroup.objects.create(name="Mountain")
+        self.template.save()
+        self.assertEqual(self.get_quote(), 100)
+
+    def test_group_deletion_invalidates_quotes(self):
+        self.assertEqual(self.get_quote(), 90)
+        rules_version = self.property.rules_version
+        self.group.delete()
+        self.property.refresh_from_db()
+        self.assertIsNone(self.property.group_id)
+        self.assertGreater(self.property.rules_version, rules_version)
+        self.assertEqual(self.get_quote(), 100)
+
+    def test_create_duplicate_template(self):
+        url = reverse("pricing-rule-template-list")
+        data = {"group": self.group.pk, "min_stay_length": 7, "price_modifier": -5}
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        data["min_stay_length"] = 14
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.group.rule_templates.count(), 2)
@@ -4,4 +4,19 @@ from pricing_rules import views
 urlpatterns = [
     path('', views.PricingRuleListView.as_view(), name='pricing-rule-list'),
     path('<int:pk>/', views.PricingRuleDetailView.as_view(), name='pricing-rule-detail'),
+    path(
+        'templates/',
+        views.PricingRuleTemplateListView.as_view(),
+        name='pricing-rule-template-list',
+    ),
+    path(
+        'templates/<int:pk>/',
+        views.PricingRuleTemplateDetailView.as_view(),
+        name='pricing-rule-template-detail',
+    ),
+    path(
+        'simulate/',
+        views.PricingRuleSimulationView.as_view(),
+        name='pricing-rule-simulate',
+    ),
 ]
@@ -1,10 +1,23 @@
-from rest_framework.generics import ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.generics import (
+    GenericAPIView,
+    ListAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
 from rest_framework.response import Response
 from rest_framework.request import Request
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from pricing_rules.models import PricingRule
-from pricing_rules.serializers import PricingRuleSerializer
+from history.changes import build_change, record_changes
+from history.models import PriceChange
+from reservations.renderers import LIST_RENDERER_CLASSES
+from pricing_rules.models import PricingRule, PricingRuleTemplate
+from pricing_rules.normalization import RULE_FIELDS
+from pricing_rules.serializers import (
+    PricingRuleSerializer,
+    PricingRuleTemplateSerializer,
+    SimulationSerializer,
+)
+from pricing_rules.simulation import simulate_rules, summarize
 from pricing_rules.filters import PricingRuleFilter
 
 
@@ -19,11 +32,16 @@ class PricingRuleListView(ListAPIView):
         queryset: Queryset returning all existing pricing rules.
         serializer_class: Serializer used for serializing pricing rule data.
         filterset_class: Filters available for filtering pricing rules.
+        renderer_classes: JSON, the browsable API and MessagePack when the
+            msgpack package is installed.
+        read_replica: Safe requests read from the replica database.
     """
 
     queryset = PricingRule.objects.all()
     serializer_class = PricingRuleSerializer
     filterset_class = PricingRuleFilter
+    renderer_classes = LIST_RENDERER_CLASSES
+    read_replica = True
 
     def post(self, request: Request, *args, **kwargs) -> Response:
         """
@@ -65,11 +83,13 @@ class PricingRuleDetailView(RetrieveUpdateDestroyAPIView):
             pricing rule data.
         lookup_url_kwarg: Name of the URL keyword argument used to retrieve
             the unique identifier of the pricing rule.
+        read_replica: Safe requests read from the replica database.
     """
 
     queryset = PricingRule.objects.all()
     serializer_class = PricingRuleSerializer
     lookup_url_kwarg = "pk"
+    read_replica = True
 
     def get_object(self):
         """
@@ -88,6 +108,7 @@ class PricingRuleDetailView(RetrieveUpdateDestroyAPIView):
     def delete(self, request: Request, *args, **kwargs) -> Response:
         """
         Deletes the pricing rule instance identified by its unique identifier.
+        The rule is soft deleted, it is kept for the history until it is purged.
         Returns a success message upon successful deletion.
 
         Args:
@@ -122,3 +143,150 @@ class PricingRuleDetailView(RetrieveUpdateDestroyAPIView):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         return Response(serializer.data)
+
+    def perform_update(self, serializer: PricingRuleSerializer) -> None:
+        """
+        Saves the rule, recording its changed fields in the price history.
+        """
+        before = get_rule_values(serializer.instance)
+        rule = serializer.save()
+        record_changes(
+            [
+                build_change(
+                    PricingRule,
+                    rule.pk,
+                    before,
+                    get_rule_values(rule),
+                    PriceChange.EDITED,
+                )
+            ]
+        )
+
+    def perform_destroy(self, instance: PricingRule) -> None:
+        """
+        Soft deletes the rule, recording the deletion in the price history.
+        """
+        instance.delete()
+        record_changes(
+            [
+                build_change(
+                    PricingRule,
+                    instance.pk,
+                    {"deleted_at": None},
+                    {"deleted_at": instance.deleted_at},
+                    PriceChange.DELETED,
+                )
+            ]
+        )
+
+
+def get_rule_values(rule: PricingRule) -> dict:
+    """
+    Get the fields of a rule tracked by the price history.
+    """
+    return {field: getattr(rule, field) for field in RULE_FIELDS}
+
+
+class PricingRuleSimulationView(GenericAPIView):
+    """
+    View for previewing how a candidate rule set would change the revenue of
+    the existing bookings of a property, without saving any rule.
+
+    Attributes:
+        serializer_class: Serializer used for validating the candidate rules.
+    """
+
+    serializer_class = SimulationSerializer
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Replays the live and archived bookings of the property with its
+        current rules and with the candidate rules.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The number of bookings and of changed prices, and the
+            current and proposed revenue with their delta, in total and per
+            month of the start date. Or the validation errors and the HTTP
+            status code 400 (BAD REQUEST).
+
+        Example:
+            Example of request JSON:
+            {
+                "property": 1,
+                "rules": [{"min_stay_length": 7, "price_modifier": -15}],
+                "start_date": "01-01-2022",
+                "end_date": "12-31-2022"
+            }
+        """
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        totals = simulate_rules(**serializer.validated_data)
+        months = [
+            summarize(values, month=month) for month, values in sorted(totals.items())
+        ]
+        overall = [
+            sum(values[index] for values in totals.values()) for index in range(4)
+        ]
+        return Response(
+            {
+                "property": serializer.validated_data["property"].pk,
+                **summarize(overall),
+                "months": months,
+            }
+        )
+
+
+class PricingRuleTemplateListView(ListAPIView):
+    """
+    Lists the pricing rule templates and supports creating a new template
+    via POST. A template applies to every property of its group.
+
+    Attributes:
+        queryset: Queryset returning all existing templates.
+        serializer_class: Serializer used for validating and deserializing
+            template data.
+    """
+
+    queryset = PricingRuleTemplate.objects.all()
+    serializer_class = PricingRuleTemplateSerializer
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Create a new rule template for a group.
+
+        Returns:
+            Response: The serialized template with the HTTP status code 201
+            (CREATED), or the validation errors.
+        """
+        serializer = PricingRuleTemplateSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PricingRuleTemplateDetailView(RetrieveUpdateDestroyAPIView):
+    """
+    Retrieves, updates, or deletes a single pricing rule template.
+
+    Attributes:
+        queryset: Queryset returning all existing templates.
+        serializer_class: Serializer used for validating and deserializing
+            template data.
+    """
+
+    queryset = PricingRuleTemplate.objects.all()
+    serializer_class = PricingRuleTemplateSerializer
+
+    def delete(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Deletes the template, returning a success message.
+        """
+        self.perform_destroy(self.get_object())
+        return Response(
+            {"detail": "Record successfully deleted."}, status=status.HTTP_200_OK
+        )
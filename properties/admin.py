@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import Property
+from .models import Property, PropertyGroup
 
 admin.site.register(Property)
+admin.site.register(PropertyGroup)
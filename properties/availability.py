@@ -0,0 +1,202 @@
+from datetime import date, timedelta
+from typing import Iterable, Optional, Set, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from properties.models import Property
+
+
+def get_horizon_days() -> int:
+    """
+    Get the number of days covered by each property availability bitmap.
+
+    Returns:
+        int: The rolling horizon in days, configured with AVAILABILITY_HORIZON_DAYS.
+    """
+    return getattr(settings, "AVAILABILITY_HORIZON_DAYS", 365)
+
+
+def encode_bitmap(mask: int) -> bytes:
+    """
+    Pack an availability mask into the bytes stored on the property.
+
+    Args:
+        mask (int): Bitmap where bit N set means the day origin + N is booked.
+
+    Returns:
+        bytes: The little endian representation of the mask, sized for the horizon.
+    """
+    return mask.to_bytes((get_horizon_days() + 7) // 8, "little")
+
+
+def decode_bitmap(bitmap: Optional[bytes]) -> int:
+    """
+    Unpack the bytes stored on a property into an integer mask.
+
+    Args:
+        bitmap (Optional[bytes]): The stored bitmap, it can be empty or None.
+
+    Returns:
+        int: The mask, 0 when nothing is booked.
+    """
+    return int.from_bytes(bytes(bitmap or b""), "little")
+
+
+def date_range_mask(origin: date, start_date: date, end_date: date) -> int:
+    """
+    Build the mask with the bits of the days between two dates, both included.
+    Days outside the horizon that starts at origin are ignored.
+
+    Args:
+        origin (date): Day represented by the bit 0.
+        start_date (date): First day of the range.
+        end_date (date): Last day of the range.
+
+    Returns:
+        int: A mask with one bit set per day of the range inside the horizon.
+    """
+    first = max((start_date - origin).days, 0)
+    last = min((end_date - origin).days, get_horizon_days() - 1)
+    if last < first:
+        return 0
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+def covers(origin: Optional[date], start_date: date, end_date: date) -> bool:
+    """
+    Check if a bitmap that starts at origin knows about every day of a range.
+
+    Args:
+        origin (Optional[date]): Day represented by the bit 0, None if never built.
+        start_date (date): First day of the range.
+        end_date (date): Last day of the range.
+
+    Returns:
+        bool: True if the whole range is inside the horizon of the bitmap.
+    """
+    if origin is None:
+        return False
+    return origin <= start_date and end_date < origin + timedelta(
+        days=get_horizon_days()
+    )
+
+
+def rebuild_availability(property_id: int, today: Optional[date] = None) -> None:
+    """
+    Rebuild the availability bitmap of a property from its bookings.
+    The horizon is rolled so that it starts today.
+
+    Args:
+        property_id (int): The ID of the property to rebuild.
+        today (Optional[date]): Origin of the new horizon, by default the current date.
+    """
+    from bookings.models import Booking
+
+    origin = today or timezone.localdate()
+    horizon_end = origin + timedelta(days=get_horizon_days() - 1)
+    bookings = Booking.objects.filter(
+        property_id=property_id, end_date__gte=origin, start_date__lte=horizon_end
+    ).values_list("start_date", "end_date")
+
+    mask = 0
+    for start_date, end_date in bookings:
+        mask |= date_range_mask(origin, start_date, end_date)
+
+    Property.objects.filter(pk=property_id).update(
+        availability=encode_bitmap(mask), availability_start=origin
+    )
+
+
+def mark_booked(property_id: int, start_date: date, end_date: date) -> None:
+    """
+    Set the bits of a new booking in the availability bitmap of a property.
+    If the stored bitmap does not cover the booking, it is rebuilt instead.
+
+    Args:
+        property_id (int): The ID of the booked property.
+        start_date (date): First day of the booking.
+        end_date (date): Last day of the booking.
+    """
+    with transaction.atomic():
+        row = (
+            Property.objects.select_for_update()
+            .filter(pk=property_id)
+            .values_list("availability", "availability_start")
+            .first()
+        )
+        if row is None:
+            return
+        bitmap, origin = row
+        today = timezone.localdate()
+        if (
+            origin is None
+            or origin < today
+            or end_date >= origin + timedelta(days=get_horizon_days())
+        ):
+            rebuild_availability(property_id, today)
+            return
+
+        mask = decode_bitmap(bitmap) | date_range_mask(origin, start_date, end_date)
+        Property.objects.filter(pk=property_id).update(availability=encode_bitmap(mask))
+
+
+def get_occupancy_bp(
+    property: Property,
+    start_date: date,
+    days: Optional[int] = None,
+    exclude: Optional[Tuple[date, date]] = None,
+) -> Optional[int]:
+    """
+    Get how booked a property is in a window, reading its availability bitmap.
+    Only the days of the window inside the horizon of the bitmap are counted.
+
+    Args:
+        property (Property): The property, with its availability fields loaded.
+        start_date (date): First day of the window.
+        days (Optional[int]): Length of the window, OCCUPANCY_WINDOW_DAYS by default.
+        exclude (Optional[Tuple[date, date]]): First and last day of a booking
+            counted as free, to price an existing booking as when it was made.
+
+    Returns:
+        Optional[int]: The booked share of the window in hundredths of a percent,
+        None if the bitmap does not cover any day of the window.
+    """
+    origin = property.availability_start
+    if origin is None:
+        return None
+    days = days or settings.OCCUPANCY_WINDOW_DAYS
+    window = date_range_mask(origin, start_date, start_date + timedelta(days=days - 1))
+    covered = window.bit_count()
+    if not covered:
+        return None
+    mask = decode_bitmap(property.availability)
+    if exclude is not None:
+        mask &= ~date_range_mask(origin, *exclude)
+    booked = (mask & window).bit_count()
+    return booked * 10000 // covered
+
+
+def booked_property_ids(
+    property_ids: Iterable[int], start_date: date, end_date: date
+) -> Set[int]:
+    """
+    Get which properties have a booking overlapping a range, asking the database.
+    It is used for the properties whose bitmap does not cover the range.
+
+    Args:
+        property_ids (Iterable[int]): The IDs of the properties to check.
+        start_date (date): First day of the range.
+        end_date (date): Last day of the range.
+
+    Returns:
+        Set[int]: The IDs of the properties that are booked at least one day of the range.
+    """
+    from bookings.models import Booking
+
+    return set(
+        Booking.objects.filter(
+            property_id__in=list(property_ids),
+            start_date__lte=end_date,
+            end_date__gte=start_date,
+        ).values_list("property_id", flat=True)
+    )
@@ -0,0 +1,136 @@
+"""
+iCalendar feed of the booked days of a property.
+
+The feed is built from the runs of set bits of the availability bitmap, so
+no booking is loaded. Its ETag is a digest of the bitmap, which changes with
+every booking of the property, and the rendered feed is kept in the shared
+cache under that ETag until the next change.
+"""
+
+import hashlib
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Iterator, Optional, Tuple
+from django.conf import settings
+from properties.availability import decode_bitmap
+from properties.models import Property
+from reservations.cache import get_or_compute
+
+CRLF = "\r\n"
+
+
+def booked_runs(mask: int, origin: date) -> Iterator[Tuple[date, date]]:
+    """
+    Iterate over the runs of consecutive booked days of a bitmap.
+
+    Args:
+        mask (int): Bitmap where bit N set means the day origin + N is booked.
+        origin (date): Day represented by the bit 0.
+
+    Yields:
+        Tuple[date, date]: The first and last day of each run, in order.
+    """
+    offset = 0
+    while mask:
+        # Skip the free days, then count the booked ones
+        free = (mask & -mask).bit_length() - 1
+        mask >>= free
+        offset += free
+        booked = (~mask & (mask + 1)).bit_length() - 1
+        yield origin + timedelta(days=offset), origin + timedelta(
+            days=offset + booked - 1
+        )
+        mask >>= booked
+        offset += booked
+
+
+def get_calendar_etag(property: Property) -> str:
+    """
+    Get the entity tag of the calendar of a property.
+
+    Args:
+        property (Property): The property, with its name and availability loaded.
+
+    Returns:
+        str: A digest of the name and availability bitmap of the property.
+    """
+    digest = hashlib.sha1((property.name or "").encode())
+    digest.update(str(property.availability_start).encode())
+    digest.update(bytes(property.availability or b""))
+    return digest.hexdigest()
+
+
+def escape_text(value: str) -> str:
+    """
+    Escape a TEXT value of iCalendar (RFC 5545, section 3.3.11).
+    """
+    for char in ("\\", ";", ","):
+        value = value.replace(char, f"\\{char}")
+    return value.replace("\n", "\\n")
+
+
+def render_calendar(property: Property, generated_at: Optional[datetime] = None) -> str:
+    """
+    Render the calendar of a property with an all-day event per run of
+    booked days of its availability horizon.
+
+    Args:
+        property (Property): The property, with its name and availability loaded.
+        generated_at (Optional[datetime]): DTSTAMP of the events, by default now.
+
+    Returns:
+        str: The iCalendar document.
+    """
+    stamp = (generated_at or datetime.now(dt_timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//reservations//calendar//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape_text(property.name or '')}",
+    ]
+    origin = property.availability_start
+    if origin is not None:
+        for first_day, last_day in booked_runs(
+            decode_bitmap(property.availability), origin
+        ):
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:{property.pk}-{first_day:%Y%m%d}@reservations",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{first_day:%Y%m%d}",
+                # The end of an all-day event is the day after its last day
+                f"DTEND;VALUE=DATE:{last_day + timedelta(days=1):%Y%m%d}",
+                "SUMMARY:Booked",
+                "TRANSP:OPAQUE",
+                "END:VEVENT",
+            ]
+    lines.append("END:VCALENDAR")
+    return CRLF.join(lines) + CRLF
+
+
+def get_calendar(property: Property, etag: str) -> str:
+    """
+    Get the calendar of a property from the shared cache, rendering it only
+    when its bitmap changed.
+
+    Args:
+        property (Property): The property, with its name and availability loaded.
+        etag (str): The ETag of the calendar, see get_calendar_etag.
+
+    Returns:
+        str: The iCalendar document.
+    """
+    return get_or_compute(
+        f"calendar:{property.pk}:{etag}",
+        lambda: render_calendar(property),
+        settings.CALENDAR_CACHE_TTL,
+    )
+
+
+def iter_calendar(calendar: str, chunk_size: int = 8192) -> Iterator[bytes]:
+    """
+    Split a calendar in chunks to stream it.
+    """
+    data = calendar.encode()
+    for start in range(0, len(data), chunk_size):
+        yield data[start : start + chunk_size]
@@ -1,5 +1,6 @@
 import django_filters
 from properties.models import Property
+from reservations.money import HundredthsFilter
 
 
 class PropertyFilter(django_filters.FilterSet):
@@ -7,9 +8,12 @@ class PropertyFilter(django_filters.FilterSet):
     Filter class for the PropertyFilter model.
     """
 
+    base_price = HundredthsFilter(field_name='base_price_cents')
+    base_price__lt = HundredthsFilter(field_name='base_price_cents', lookup_expr='lt')
+    base_price__gt = HundredthsFilter(field_name='base_price_cents', lookup_expr='gt')
+
     class Meta:
         model = Property
         fields = {
             'name': ['icontains'],
-            'base_price': ['exact', 'lt', 'gt']
         }
\ No newline at end of file
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from properties.availability import rebuild_availability
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the availability bitmaps so that their horizon starts today.
+    It is meant to run once a day, bookings keep the bitmaps updated in between.
+    """
+
+    help = "Rebuild the availability bitmap of the properties."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "property_ids",
+            nargs="*",
+            type=int,
+            help="IDs of the properties to rebuild, all of them by default.",
+        )
+
+    def handle(self, *args, **options):
+        property_ids = options["property_ids"] or list(
+            Property.objects.values_list("pk", flat=True)
+        )
+        count = 0
+        for property_id in property_ids:
+            rebuild_availability(property_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} availability bitmaps."))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="availability",
+            field=models.BinaryField(blank=True, default=b""),
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="availability_start",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+    ]
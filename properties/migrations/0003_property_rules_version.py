@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0002_property_availability"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="rules_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
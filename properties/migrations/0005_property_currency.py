@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0004_property_base_price_cents"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="currency",
+            field=models.CharField(default="USD", max_length=3),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("properties", "0005_property_currency"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PropertyGroup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "rules_version",
+                    models.PositiveIntegerField(default=0, editable=False),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="group",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="properties",
+                to="properties.propertygroup",
+            ),
+        ),
+    ]
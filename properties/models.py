@@ -1,7 +1,32 @@
 from django.db import models
+from outbox.models import OutboxModel
+from reservations.money import hundredths_property
 
 
-class Property(models.Model):
+class PropertyGroup(models.Model):
+    """
+    Model that represents a group of properties sharing pricing rule templates,
+    for example a portfolio or a region.
+    """
+
+    name = models.CharField(max_length=255)
+    """name: Name of the group"""
+    rules_version = models.PositiveIntegerField(default=0, editable=False)
+    """rules_version: Counter increased when the rule templates of the group change"""
+    created_at = models.DateTimeField(auto_now_add=True, null=True, blank=False)
+    """created_at: Date of creation"""
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=False)
+    """updated_at: Date of update"""
+
+    def __str__(self):
+        return f"{self.name}"
+
+
+# Fields of a property only changed with update(), never written by save()
+UPDATE_ONLY_FIELDS = ("rules_version", "availability", "availability_start")
+
+
+class Property(OutboxModel):
     """
     Model that represents a property.
     A property could be a house, a flat, a hotel room, etc.
@@ -9,12 +34,49 @@ class Property(models.Model):
 
     name = models.CharField(max_length=255, blank=True, null=True)
     """name: Name of the property"""
-    base_price = models.FloatField(null=True, blank=True)
-    """base_price: base price of the property per day"""
+    base_price_cents = models.IntegerField(null=True, blank=True)
+    """base_price_cents: base price of the property per day, in cents"""
+    currency = models.CharField(max_length=3, default="USD")
+    """currency: ISO 4217 code of the currency of the prices of the property"""
+    group = models.ForeignKey(
+        PropertyGroup,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="properties",
+    )
+    """group: Group whose pricing rule templates also apply to the property"""
+    availability = models.BinaryField(default=b"", blank=True, editable=False)
+    """availability: Packed bitmap of the booked days, one bit per day since availability_start"""
+    availability_start = models.DateField(null=True, blank=True, editable=False)
+    """availability_start: Day represented by the first bit of the availability bitmap"""
+    rules_version = models.PositiveIntegerField(default=0, editable=False)
+    """rules_version: Counter increased when the base price or the pricing rules change"""
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=False)
     """created_at: Date of creation"""
     updated_at = models.DateTimeField(auto_now=True, null=True, blank=False)
     """updated_at: Date of update"""
 
+    base_price = hundredths_property(
+        "base_price_cents", "base_price: base price of the property per day"
+    )
+
+    def save(
+        self, force_insert=False, force_update=False, using=None, update_fields=None
+    ):
+        """
+        Save the property without writing its rules_version and availability
+        bitmap, which are only changed in the database with update(): writing
+        back the values loaded with the instance would undo a concurrent
+        increase or booking.
+        """
+        if update_fields is None and not force_insert and not self._state.adding:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in UPDATE_ONLY_FIELDS
+            ]
+        super().save(force_insert, force_update, using, update_fields)
+
     def __str__(self):
         return f"{self.name} - ${self.base_price}"
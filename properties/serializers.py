@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from properties.models import Property
+from currencies.rates import get_fx_table
+from properties.models import Property, PropertyGroup
+from reservations.money import HundredthsField
 
 
 class PropertySerializer(serializers.ModelSerializer):
@@ -10,15 +12,82 @@ class PropertySerializer(serializers.ModelSerializer):
     incoming JSON data against the defined fields and model constraints.
 
     Attributes:
+        base_price: The base price per day, stored in cents.
+        currency: The ISO 4217 code of the currency of the prices.
+        group: The group whose rule templates also apply to the property.
         model (Property): The Property model to be serialized/deserialized.
         fields (list): List of fields to include in the serialized output.
         extra_kwargs (dict): Additional keyword arguments to customize field behavior.
     """
 
+    base_price = HundredthsField(source="base_price_cents")
+
     class Meta:
         model = Property
-        fields = ["id", "name", "base_price", "created_at", "updated_at"]
+        fields = [
+            "id",
+            "name",
+            "base_price",
+            "currency",
+            "group",
+            "created_at",
+            "updated_at",
+        ]
         extra_kwargs = {
             "name": {"required": True},
-            "base_price": {"required": True},
         }
+
+    def validate_currency(self, value: str) -> str:
+        """
+        Checks that the prices of the property can be converted, the
+        currency being BASE_CURRENCY or one with an exchange rate.
+
+        Args:
+            value: The ISO 4217 code of the currency, in any case.
+
+        Returns:
+            The code in upper case.
+        """
+        currency = value.upper()
+        if not get_fx_table().knows(currency):
+            raise serializers.ValidationError(
+                f"There is no exchange rate for {currency}."
+            )
+        return currency
+
+
+class PropertyGroupSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the PropertyGroup model, a group of properties sharing
+    pricing rule templates.
+    """
+
+    class Meta:
+        model = PropertyGroup
+        fields = ["id", "name", "rules_version", "created_at", "updated_at"]
+
+
+class PropertySearchSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the property search.
+    The start date and end date of the stay (format: MM-DD-YYYY).
+    """
+
+    start_date = serializers.DateField(input_formats=["%m-%d-%Y"])
+    end_date = serializers.DateField(input_formats=["%m-%d-%Y"])
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Checks that the end date is not before the start date.
+
+        Args:
+            attrs: The validated query parameters.
+
+        Returns:
+            The validated query parameters.
+        """
+        if attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError(
+                {"end_date": "The end date must be on or after the start date."}
+            )
+        return attrs
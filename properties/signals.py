@@ -0,0 +1,38 @@
+from django.db.models import F
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from properties.models import Property
+
+
+@receiver(pre_save, sender=Property)
+def remember_previous_pricing(sender, instance: Property, **kwargs) -> None:
+    """
+    Remember if the base price or the group of an existing property changes,
+    so its rules version can be increased once it is saved.
+    """
+    instance._pricing_changed = False
+    if not instance.pk or kwargs.get("raw"):
+        return
+    previous = (
+        Property.objects.filter(pk=instance.pk)
+        .values_list("base_price_cents", "group_id")
+        .first()
+    )
+    instance._pricing_changed = previous is not None and previous != (
+        instance.base_price_cents,
+        instance.group_id,
+    )
+
+
+@receiver(post_save, sender=Property)
+def bump_rules_version_on_pricing_change(sender, instance: Property, **kwargs) -> None:
+    """
+    Increase the rules version of a property when its base price or its
+    group changed, so the quotes memoized with the previous price or rule
+    templates are not used anymore. The counter is increased in the database
+    so a concurrent increase is never lost.
+    """
+    if not getattr(instance, "_pricing_changed", False):
+        return
+    Property.objects.filter(pk=instance.pk).update(rules_version=F("rules_version") + 1)
+    instance.refresh_from_db(fields=["rules_version"])
@@ -3,5 +3,17 @@ from properties import views
 
 urlpatterns = [
     path('', views.PropertyListView.as_view(), name='property-list'),
+    path('search/', views.PropertySearchView.as_view(), name='property-search'),
     path('<int:pk>/', views.PropertyDetailView.as_view(), name='property-detail'),
+    path(
+        '<int:pk>/calendar.ics',
+        views.PropertyCalendarView.as_view(),
+        name='property-calendar',
+    ),
+    path('groups/', views.PropertyGroupListView.as_view(), name='property-group-list'),
+    path(
+        'groups/<int:pk>/',
+        views.PropertyGroupDetailView.as_view(),
+        name='property-group-detail',
+    ),
 ]
@@ -2,10 +2,26 @@ from rest_framework.generics import ListAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.response import Response
 from rest_framework.request import Request
 from rest_framework import status
+from django.http import HttpRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from properties.models import Property
-from properties.serializers import PropertySerializer
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import condition
+from properties.calendar import get_calendar, get_calendar_etag, iter_calendar
+from properties.models import Property, PropertyGroup
+from properties.serializers import (
+    PropertyGroupSerializer,
+    PropertySerializer,
+    PropertySearchSerializer,
+)
 from properties.filters import PropertyFilter
+from properties.availability import (
+    booked_property_ids,
+    covers,
+    date_range_mask,
+    decode_bitmap,
+)
 
 
 class PropertyListView(ListAPIView):
@@ -18,11 +34,13 @@ class PropertyListView(ListAPIView):
         serializer_class: Serializer used for validating and deserializing
             property data.
         filterset_class: Filterset used for filtering property instances.
+        read_replica: Safe requests read from the replica database.
     """
 
     queryset = Property.objects.all()
     serializer_class = PropertySerializer
     filterset_class = PropertyFilter
+    read_replica = True
 
     def post(self, request: Request, *args, **kwargs) -> Response:
         """
@@ -57,11 +75,13 @@ class PropertyDetailView(RetrieveUpdateDestroyAPIView):
             property data.
         lookup_url_kwarg: Name of the URL keyword argument used to retrieve
             the unique identifier of the property.
+        read_replica: Safe requests read from the replica database.
     """
 
     queryset = Property.objects.all()
     serializer_class = PropertySerializer
     lookup_url_kwarg = "pk"
+    read_replica = True
 
     def get_object(self):
         """
@@ -118,3 +138,158 @@ class PropertyDetailView(RetrieveUpdateDestroyAPIView):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         return Response(serializer.data)
+
+
+class PropertySearchView(ListAPIView):
+    """
+    Lists the properties that are free for a whole range of dates.
+
+    The dates are checked against the availability bitmap of each property
+    with bitwise operations, so no booking is loaded for properties whose
+    bitmap covers the requested range. The price filters of the property
+    list (for example base_price__lt) can be combined with the dates.
+
+    Attributes:
+        queryset: Queryset returning all existing property instances.
+        serializer_class: Serializer used for the listed properties.
+        filterset_class: Filterset used for filtering property instances.
+        read_replica: Safe requests read from the replica database.
+    """
+
+    queryset = Property.objects.all()
+    serializer_class = PropertySerializer
+    filterset_class = PropertyFilter
+    read_replica = True
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Returns the properties available from start_date to end_date.
+
+        Args:
+            request: The HTTP request object, with the start_date and end_date
+                query parameters (format: MM-DD-YYYY).
+
+        Returns:
+            Response: The serialized available properties, or the validation
+            errors of the dates with the HTTP status code 400 (BAD REQUEST).
+        """
+        params = PropertySearchSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+        start_date = params.validated_data["start_date"]
+        end_date = params.validated_data["end_date"]
+
+        available = []
+        uncovered = []
+        masks = {}
+        for property in self.filter_queryset(self.get_queryset()).iterator():
+            origin = property.availability_start
+            if not covers(origin, start_date, end_date):
+                uncovered.append(property)
+                continue
+            if origin not in masks:
+                masks[origin] = date_range_mask(origin, start_date, end_date)
+            if not decode_bitmap(property.availability) & masks[origin]:
+                available.append(property)
+
+        if uncovered:
+            booked = booked_property_ids(
+                [property.pk for property in uncovered], start_date, end_date
+            )
+            available.extend(p for p in uncovered if p.pk not in booked)
+            available.sort(key=lambda property: property.pk)
+
+        serializer = self.get_serializer(available, many=True)
+        return Response(serializer.data)
+
+
+class PropertyGroupListView(ListAPIView):
+    """
+    Lists the groups of properties and supports creating a new group via POST.
+
+    Attributes:
+        queryset: Queryset returning all existing groups.
+        serializer_class: Serializer used for validating and deserializing
+            group data.
+    """
+
+    queryset = PropertyGroup.objects.all()
+    serializer_class = PropertyGroupSerializer
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Create a new group of properties.
+
+        Returns:
+            Response: The serialized group with the HTTP status code 201
+            (CREATED), or the validation errors.
+        """
+        serializer = PropertyGroupSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PropertyGroupDetailView(RetrieveUpdateDestroyAPIView):
+    """
+    Retrieves, updates, or deletes a single group of properties. Deleting a
+    group keeps its properties, without a group.
+
+    Attributes:
+        queryset: Queryset returning all existing groups.
+        serializer_class: Serializer used for validating and deserializing
+            group data.
+    """
+
+    queryset = PropertyGroup.objects.all()
+    serializer_class = PropertyGroupSerializer
+
+    def delete(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Deletes the group, returning a success message.
+        """
+        self.perform_destroy(self.get_object())
+        return Response(
+            {"detail": "Record successfully deleted."}, status=status.HTTP_200_OK
+        )
+
+
+def calendar_etag(request: HttpRequest, pk: int) -> str:
+    """
+    Loads the property of the calendar and returns the ETag of its calendar.
+    """
+    request.calendar_property = get_object_or_404(
+        Property.objects.only("pk", "name", "availability", "availability_start"),
+        pk=pk,
+    )
+    return get_calendar_etag(request.calendar_property)
+
+
+@method_decorator(condition(etag_func=calendar_etag), name="get")
+class PropertyCalendarView(View):
+    """
+    Streams the iCalendar feed of the booked days of a property.
+
+    The ETag of the feed changes with the bookings of the property, so
+    polling with If-None-Match gets a 304 (NOT MODIFIED) without rendering
+    the feed, and the rendered feed is cached until the next booking change.
+
+    Attributes:
+        read_replica: Safe requests read from the replica database.
+    """
+
+    read_replica = True
+
+    def get(self, request: HttpRequest, pk: int) -> StreamingHttpResponse:
+        """
+        Returns the calendar of the property (content type: text/calendar).
+        """
+        property = request.calendar_property
+        response = StreamingHttpResponse(
+            iter_calendar(get_calendar(property, get_calendar_etag(property))),
+            content_type="text/calendar; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'inline; filename="property-{pk}.ics"'
+        patch_cache_control(response, no_cache=True)
+        return response
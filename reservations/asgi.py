@@ -2,6 +2,7 @@
 ASGI config for reservations project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The server-sent event stream of the bookings is served next to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -13,4 +14,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'reservations.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from bookings.streams import EVENTS_PATH, booking_events_app  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+        return await booking_events_app(scope, receive, send)
+    return await django_application(scope, receive, send)
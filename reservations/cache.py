@@ -0,0 +1,196 @@
+"""
+Stampede protection on top of the Django cache framework.
+
+get_or_compute memoizes a value in a shared cache (the "default" alias of
+CACHES) and keeps a hot key from being recomputed by every worker at once:
+
+- Single flight: on a miss only the worker adding the lock key computes the
+  value, the others wait for it instead of computing it too.
+- Probabilistic early refresh (XFetch): before the entry expires, a request
+  may refresh it, more likely the closer the expiry and the slower the
+  computation, so that hot keys rarely expire at all.
+- Stale while revalidate: for SHARED_CACHE_STALE_TTL seconds after the
+  expiry, the worker holding the lock recomputes the value while the others
+  keep using the stale one.
+"""
+
+import math
+import random
+import time
+import uuid
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+from django.conf import settings
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class CacheStats:
+    """
+    Counters of get_or_compute, shared by the threads of a worker.
+
+    Attributes:
+        hits: Values read from a fresh entry.
+        misses: Values computed because there was no entry.
+        stale_hits: Values read from an expired entry being revalidated.
+        early_refreshes: Entries recomputed before expiring.
+        coalesced: Requests that waited for another worker's computation.
+        wait_timeouts: Waits that gave up and computed the value themselves.
+    """
+
+    FIELDS = (
+        "hits",
+        "misses",
+        "stale_hits",
+        "early_refreshes",
+        "coalesced",
+        "wait_timeouts",
+    )
+
+    def __init__(self):
+        self._lock = Lock()
+        self.clear()
+
+    def increment(self, field: str) -> None:
+        """
+        Add one to a counter.
+
+        Args:
+            field (str): One of the FIELDS.
+        """
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def clear(self) -> None:
+        """
+        Reset every counter.
+        """
+        with self._lock:
+            for field in self.FIELDS:
+                setattr(self, field, 0)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the counters.
+
+        Returns:
+            Dict[str, int]: The value of each of the FIELDS.
+        """
+        with self._lock:
+            return {field: getattr(self, field) for field in self.FIELDS}
+
+
+cache_stats = CacheStats()
+
+
+def should_refresh_early(delta: float, expires_at: float, beta: float) -> bool:
+    """
+    Decide if a fresh entry is refreshed now, with the XFetch algorithm.
+
+    Args:
+        delta (float): Seconds it took to compute the value.
+        expires_at (float): Timestamp of the expiry of the entry.
+        beta (float): Eagerness, above 1 favours earlier refreshes.
+
+    Returns:
+        bool: True if this request recomputes the value.
+    """
+    # 1 - random() is in (0, 1], so the logarithm is defined and not positive
+    return time.time() - delta * beta * math.log(1 - random.random()) >= expires_at
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], Any],
+    ttl: float,
+    stale_ttl: Optional[float] = None,
+    beta: Optional[float] = None,
+) -> Any:
+    """
+    Get a value from the shared cache, computing it at most once at a time.
+
+    Args:
+        key (str): The cache key, it should include a version of the inputs.
+        compute (Callable[[], Any]): Computes the value, it must be picklable.
+        ttl (float): Seconds the value is fresh.
+        stale_ttl (Optional[float]): Seconds an expired value is still served
+            while it is recomputed, SHARED_CACHE_STALE_TTL by default.
+        beta (Optional[float]): Eagerness of the early refresh,
+            SHARED_CACHE_BETA by default, 0 disables it.
+
+    Returns:
+        Any: The cached or computed value.
+    """
+    cache = caches["default"]
+    stale_ttl = settings.SHARED_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+    beta = settings.SHARED_CACHE_BETA if beta is None else beta
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires_at = entry
+        if time.time() < expires_at:
+            if beta and should_refresh_early(delta, expires_at, beta):
+                refreshed = _compute_locked(cache, key, compute, ttl, stale_ttl)
+                if refreshed is not _MISSING:
+                    cache_stats.increment("early_refreshes")
+                    return refreshed
+            cache_stats.increment("hits")
+            return value
+        refreshed = _compute_locked(cache, key, compute, ttl, stale_ttl)
+        if refreshed is not _MISSING:
+            cache_stats.increment("misses")
+            return refreshed
+        cache_stats.increment("stale_hits")
+        return value
+
+    value = _compute_locked(cache, key, compute, ttl, stale_ttl)
+    if value is not _MISSING:
+        cache_stats.increment("misses")
+        return value
+    return _wait_for(cache, key, compute, ttl, stale_ttl)
+
+
+def _compute_locked(cache, key, compute, ttl, stale_ttl) -> Any:
+    """
+    Compute and store the value if no other worker holds the lock of the key.
+
+    Returns:
+        Any: The value, or _MISSING if the lock is held by another worker.
+    """
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, settings.SHARED_CACHE_LOCK_TIMEOUT):
+        return _MISSING
+    try:
+        return _compute(cache, key, compute, ttl, stale_ttl)
+    finally:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def _compute(cache, key, compute, ttl, stale_ttl) -> Any:
+    """
+    Compute the value and store it with the time it took to compute.
+    """
+    started = time.time()
+    value = compute()
+    now = time.time()
+    cache.set(key, (value, now - started, now + ttl), ttl + stale_ttl)
+    return value
+
+
+def _wait_for(cache, key, compute, ttl, stale_ttl) -> Any:
+    """
+    Wait for the worker holding the lock to store the value. The value is
+    computed here if it does not show up before SHARED_CACHE_LOCK_TIMEOUT.
+    """
+    cache_stats.increment("coalesced")
+    deadline = time.monotonic() + settings.SHARED_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(settings.SHARED_CACHE_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    cache_stats.increment("wait_timeouts")
+    return _compute(cache, key, compute, ttl, stale_ttl)
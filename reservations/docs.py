@@ -0,0 +1,165 @@
+"""
+Lazily built and cached API documentation views.
+
+drf_yasg and the schema view are only imported the first time a documentation
+route is requested, so workers and management commands that never serve the
+docs do not pay for them at startup.
+
+The schema itself is generated once per process, or once per deploy when the
+build_schema command wrote it to API_SCHEMA_PATH, and served with a strong
+ETag so clients revalidate it with a 304.
+"""
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_safe
+
+SCHEMA_CONTENT_TYPES = {
+    ".json": "application/json",
+    ".yaml": "application/yaml",
+}
+
+
+def get_api_info():
+    """
+    Get the information of the API shown in the documentation.
+
+    Returns:
+        openapi.Info: The title, version and contact of the API.
+    """
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Southern Code API",
+        default_version="v1",
+        description="Challenge",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="danielb.alzate1@gmail.com"),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_schema_view():
+    """
+    Build the drf_yasg schema view of the API.
+
+    Returns:
+        The schema view class, built once per process.
+    """
+    from drf_yasg.views import get_schema_view as build_schema_view
+    from rest_framework import permissions
+
+    return build_schema_view(
+        get_api_info(),
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+
+
+def render_schema(format: str) -> bytes:
+    """
+    Generate the OpenAPI schema of the API by introspecting every view.
+
+    Args:
+        format (str): ".json" or ".yaml".
+
+    Returns:
+        bytes: The encoded schema.
+    """
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(get_api_info()).get_schema(public=True)
+    codec = OpenAPICodecYaml if format == ".yaml" else OpenAPICodecJson
+    return codec(validators=[]).encode(schema)
+
+
+@lru_cache(maxsize=None)
+def get_schema_document(format: str) -> Tuple[bytes, str]:
+    """
+    Get the encoded schema and its ETag, generating it only once per process.
+    The JSON schema is read from API_SCHEMA_PATH when the file exists.
+
+    Args:
+        format (str): ".json" or ".yaml".
+
+    Returns:
+        Tuple[bytes, str]: The encoded schema and the hash used as its ETag.
+    """
+    path = Path(settings.API_SCHEMA_PATH)
+    if format == ".json" and path.is_file():
+        content = path.read_bytes()
+    else:
+        content = render_schema(format)
+    return content, hashlib.sha256(content).hexdigest()
+
+
+def schema_etag(request: HttpRequest, format: str) -> Optional[str]:
+    """
+    Get the ETag of the schema requested, None for unknown formats.
+    """
+    if format not in SCHEMA_CONTENT_TYPES:
+        return None
+    return get_schema_document(format)[1]
+
+
+@require_safe
+@condition(etag_func=schema_etag)
+def schema_document_view(request: HttpRequest, format: str) -> HttpResponse:
+    """
+    Serve the cached schema with a strong ETag and cache headers.
+    A request with a matching If-None-Match gets a 304 without a body.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        format (str): ".json" or ".yaml".
+
+    Returns:
+        HttpResponse: The encoded schema, or a 404 for unknown formats.
+    """
+    if format not in SCHEMA_CONTENT_TYPES:
+        return HttpResponse(status=404)
+    content, _ = get_schema_document(format)
+    response = HttpResponse(content, content_type=SCHEMA_CONTENT_TYPES[format])
+    patch_cache_control(response, public=True, max_age=settings.API_SCHEMA_MAX_AGE)
+    return response
+
+
+@lru_cache(maxsize=None)
+def build_view(renderer: Optional[str]) -> Callable:
+    """
+    Build the documentation view for a renderer.
+
+    Args:
+        renderer (Optional[str]): "swagger" or "redoc" for the UIs, None for the raw schema.
+
+    Returns:
+        Callable: The Django view, built once per process.
+    """
+    schema_view = get_schema_view()
+    if renderer is None:
+        return schema_view.without_ui(cache_timeout=settings.API_SCHEMA_MAX_AGE)
+    return schema_view.with_ui(renderer, cache_timeout=settings.API_SCHEMA_MAX_AGE)
+
+
+def lazy_schema_view(renderer: Optional[str] = None) -> Callable:
+    """
+    Get a view that builds the documentation view on its first request.
+
+    Args:
+        renderer (Optional[str]): "swagger" or "redoc" for the UIs, None for the raw schema.
+
+    Returns:
+        Callable: A Django view that delegates to the real documentation view.
+    """
+
+    def view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        return build_view(renderer)(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
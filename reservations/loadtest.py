@@ -0,0 +1,336 @@
+"""
+Load testing of a running deployment with a realistic mix of traffic.
+
+Each virtual user is an asyncio task keeping its own HTTP/1.1 connection
+alive, so a single process can drive a few hundred concurrent users without
+third party packages. A user repeats the actions of its scenario until the
+end of the run:
+
+- search: a property search for some dates, followed by quotes of a few of
+  the available properties.
+- burst: bookings of random short stays in the few hot properties, so most
+  writes contend for the same rows and availability bitmaps.
+- polling: the bookings list fetched incrementally with updated_since, and
+  now and then the revenue report.
+- mixed: the other scenarios, weighted like a typical day.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+DATE_FORMAT = "%m-%d-%Y"
+
+
+class HttpClient:
+    """
+    Minimal HTTP/1.1 client over a persistent asyncio connection.
+
+    Attributes:
+        host: Host of the server.
+        port: Port of the server.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def request(
+        self, method: str, path: str, data: Optional[Dict] = None
+    ) -> Tuple[int, bytes]:
+        """
+        Send a request, opening the connection again if the server closed it.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path with the query string.
+            data (Optional[Dict]): Body sent as JSON.
+
+        Returns:
+            Tuple[int, bytes]: The status code and the body of the response.
+        """
+        body = json.dumps(data).encode() if data is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Accept: application/json\r\nContent-Length: {len(body)}\r\n"
+        )
+        if data is not None:
+            head += "Content-Type: application/json\r\n"
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        self._writer.write(head.encode() + b"\r\n" + body)
+        await self._writer.drain()
+        return await self._read_response()
+
+    async def _read_response(self) -> Tuple[int, bytes]:
+        status_line = await self._reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("The server closed the connection.")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if "content-length" in headers:
+            body = await self._reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                # The CRLF ending the data of the chunk
+                await self._reader.readline()
+            # The trailer fields, up to the empty line ending the message
+            while (await self._reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            body = b"".join(chunks)
+        else:
+            body = await self._reader.read()
+            headers["connection"] = "close"
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, body
+
+    async def close(self) -> None:
+        """
+        Close the connection, the next request opens a new one.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+
+class Sample(NamedTuple):
+    """
+    One request of the run.
+
+    Attributes:
+        name: Kind of request, for example "quote".
+        status: HTTP status code, 0 if the request failed.
+        latency_ms: Time until the whole response was read, in milliseconds.
+    """
+
+    name: str
+    status: int
+    latency_ms: float
+
+
+class User:
+    """
+    A virtual user sending the requests of a scenario.
+
+    Attributes:
+        client: The connection of the user.
+        rng: Random generator of the user, seeded for repeatable runs.
+        property_ids: The properties of the deployment.
+        hot_ids: The few properties receiving the booking bursts.
+        samples: The requests sent, shared by every user of the run.
+    """
+
+    def __init__(self, client, rng, property_ids, hot_ids, samples):
+        self.client = client
+        self.rng = rng
+        self.property_ids = property_ids
+        self.hot_ids = hot_ids
+        self.samples = samples
+        self.updated_since = None
+
+    async def send(
+        self, name: str, method: str, path: str, data: Optional[Dict] = None
+    ) -> Tuple[int, bytes]:
+        """
+        Send a request and record its status and latency.
+        """
+        started = time.perf_counter()
+        try:
+            status, body = await self.client.request(method, path, data)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError):
+            await self.client.close()
+            status, body = 0, b""
+        self.samples.append(
+            Sample(name, status, (time.perf_counter() - started) * 1000)
+        )
+        return status, body
+
+    def random_stay(self, max_length: int = 7) -> Tuple[str, str]:
+        start_date = date.today() + timedelta(days=self.rng.randrange(1, 300))
+        end_date = start_date + timedelta(days=self.rng.randrange(max_length))
+        return start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT)
+
+    async def search(self) -> None:
+        start_date, end_date = self.random_stay()
+        dates = {"start_date": start_date, "end_date": end_date}
+        status, body = await self.send(
+            "search", "GET", f"/properties/search/?{urlencode(dates)}"
+        )
+        available = [row["id"] for row in json.loads(body)] if status == 200 else []
+        if not available:
+            available = self.property_ids
+        for property_id in self.rng.sample(available, min(3, len(available))):
+            query = urlencode({"property": property_id, **dates})
+            await self.send("quote", "GET", f"/bookings/quote/?{query}")
+
+    async def burst(self) -> None:
+        start_date, end_date = self.random_stay(max_length=3)
+        await self.send(
+            "book",
+            "POST",
+            "/bookings/",
+            {
+                "property": self.rng.choice(self.hot_ids),
+                "start_date": start_date,
+                "end_date": end_date,
+            },
+        )
+
+    async def polling(self) -> None:
+        query = {"updated_since": self.updated_since} if self.updated_since else {}
+        self.updated_since = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        await self.send("list", "GET", f"/bookings/?{urlencode(query)}")
+        if self.rng.random() < 0.1:
+            await self.send("report", "GET", "/reports/?period=month")
+
+    async def mixed(self) -> None:
+        action = self.rng.choices(
+            [self.search, self.burst, self.polling], weights=[70, 10, 20]
+        )[0]
+        await action()
+
+
+SCENARIOS = ("search", "burst", "polling", "mixed")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Get a percentile with the nearest rank method.
+
+    Args:
+        values (List[float]): The sorted values.
+        pct (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The value at that rank, 0 without values.
+    """
+    if not values:
+        return 0.0
+    rank = max(int(-(-pct * len(values) // 100)), 1)
+    return values[rank - 1]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> List[Dict]:
+    """
+    Summarize the requests of a run by kind, and in total.
+
+    Args:
+        samples (List[Sample]): The requests of the run.
+        elapsed (float): The duration of the run in seconds.
+
+    Returns:
+        List[Dict]: A row per kind of request, then the total, with the
+        requests per second, latency percentiles in milliseconds and the
+        error rates of 4xx and 5xx (or failed) responses.
+    """
+    groups = defaultdict(list)
+    for sample in samples:
+        groups[sample.name].append(sample)
+    groups["total"] = samples
+
+    rows = []
+    for name, group in groups.items():
+        latencies = sorted(sample.latency_ms for sample in group)
+        count = len(group) or 1
+        rows.append(
+            {
+                "name": name,
+                "requests": len(group),
+                "rps": len(group) / elapsed if elapsed else 0.0,
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else 0.0,
+                "client_errors": sum(400 <= s.status < 500 for s in group) / count,
+                "server_errors": sum(s.status >= 500 or not s.status for s in group)
+                / count,
+            }
+        )
+    return rows
+
+
+async def run_load(
+    base_url: str,
+    scenario: str,
+    users: int,
+    duration: float,
+    hot_properties: int = 3,
+    seed: Optional[int] = None,
+) -> Tuple[List[Sample], float]:
+    """
+    Run a scenario against a server with a number of concurrent users.
+
+    Args:
+        base_url (str): URL of the server, for example http://127.0.0.1:8000.
+        scenario (str): One of the SCENARIOS.
+        users (int): Number of concurrent virtual users.
+        duration (float): Seconds the users keep sending requests.
+        hot_properties (int): Number of properties receiving the bookings.
+        seed (Optional[int]): Seed of the random generators.
+
+    Returns:
+        Tuple[List[Sample], float]: The requests sent and the elapsed seconds.
+
+    Raises:
+        ValueError: If the properties of the server cannot be listed, or
+            there are none to send traffic to.
+    """
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+
+    setup = HttpClient(host, port)
+    status, body = await setup.request("GET", "/properties/")
+    await setup.close()
+    if status != 200:
+        raise ValueError(f"GET /properties/ answered {status}.")
+    property_ids = [row["id"] for row in json.loads(body)]
+    if not property_ids:
+        raise ValueError("The server has no properties, seed them first.")
+    hot_ids = property_ids[:hot_properties]
+
+    samples: List[Sample] = []
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def run_user() -> None:
+        user = User(
+            HttpClient(host, port),
+            random.Random(rng.random()),
+            property_ids,
+            hot_ids,
+            samples,
+        )
+        action = getattr(user, scenario)
+        try:
+            while time.perf_counter() < deadline:
+                await action()
+        finally:
+            await user.client.close()
+
+    await asyncio.gather(*(run_user() for _ in range(users)))
+    return samples, time.perf_counter() - started
@@ -0,0 +1,112 @@
+import gzip
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+from reservations.renderers import MessagePackRenderer, msgpack
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def build_bookings(count: int) -> List[Booking]:
+    """
+    Build unsaved bookings that look like a real list page.
+
+    Args:
+        count (int): Number of bookings.
+
+    Returns:
+        List[Booking]: The bookings, with IDs but not stored in the database.
+    """
+    now = timezone.now()
+    first_day = date(2022, 1, 1)
+    return [
+        Booking(
+            id=index + 1,
+            property_id=index % 50 + 1,
+            start_date=first_day + timedelta(days=index % 300),
+            end_date=first_day + timedelta(days=index % 300 + index % 14),
+            stay_length=index % 14 + 1,
+            final_price_cents=10000 + index * 37,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def measure(render: Callable[[], bytes], repeat: int) -> Tuple[int, float]:
+    """
+    Time a rendering function.
+
+    Args:
+        render (Callable[[], bytes]): Function returning the response body.
+        repeat (int): Number of runs, the fastest one is kept.
+
+    Returns:
+        Tuple[int, float]: The size of the body in bytes and the best time in ms.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        content = render()
+        best = min(best, time.perf_counter() - started)
+    return len(content), best * 1000
+
+
+class Command(BaseCommand):
+    """
+    Compares the size and render time of a bookings list as JSON, compressed
+    JSON and MessagePack. Serializing is included, as the compact format
+    changes the representation of dates.
+    """
+
+    help = "Benchmark the bytes and render time of the list response formats."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=10000, help="Number of bookings rendered."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Runs per format, the best is kept."
+        )
+
+    def handle(self, *args, **options):
+        bookings = build_bookings(options["rows"])
+        json_renderer = JSONRenderer()
+        msgpack_renderer = MessagePackRenderer()
+        compact_context = {
+            "request": SimpleNamespace(accepted_renderer=msgpack_renderer)
+        }
+
+        def render_json() -> bytes:
+            return json_renderer.render(BookingSerializer(bookings, many=True).data)
+
+        def render_msgpack() -> bytes:
+            data = BookingSerializer(bookings, many=True, context=compact_context).data
+            return msgpack_renderer.render(data)
+
+        formats = [
+            ("json", render_json),
+            ("json+gzip", lambda: gzip.compress(render_json(), mtime=0)),
+        ]
+        if brotli is not None:
+            formats.append(("json+br", lambda: brotli.compress(render_json())))
+        if msgpack is not None:
+            formats.append(("msgpack", render_msgpack))
+            formats.append(
+                ("msgpack+gzip", lambda: gzip.compress(render_msgpack(), mtime=0))
+            )
+
+        self.stdout.write(f"{'format':<14}{'bytes':>12}{'ms':>10}")
+        for name, render in formats:
+            size, elapsed = measure(render, options["repeat"])
+            self.stdout.write(f"{name:<14}{size:>12}{elapsed:>10.1f}")
@@ -0,0 +1,30 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reservations.docs import render_schema
+
+
+class Command(BaseCommand):
+    """
+    Generates the OpenAPI schema once and writes it to API_SCHEMA_PATH,
+    so the workers serve the file instead of introspecting the views.
+    """
+
+    help = "Write the OpenAPI schema of the API to a static file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=settings.API_SCHEMA_PATH,
+            help="File to write, API_SCHEMA_PATH by default.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.API_DOCS_ENABLED:
+            raise CommandError("The API docs are disabled (API_DOCS_ENABLED).")
+        output = Path(options["output"])
+        content = render_schema(".json")
+        output.write_bytes(content)
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {len(content)} bytes of schema to {output}.")
+        )
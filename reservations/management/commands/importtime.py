@@ -0,0 +1,134 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+from django.core.management.base import BaseCommand, CommandError
+
+STARTUP_SCRIPT = (
+    "import {module}; "
+    "from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+
+class ImportTime(NamedTuple):
+    """
+    A line of the python -X importtime report.
+    """
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(report: str) -> List[ImportTime]:
+    """
+    Parse the report that python -X importtime writes to stderr.
+
+    Args:
+        report (str): The stderr of the profiled interpreter.
+
+    Returns:
+        List[ImportTime]: One entry per imported module, in import order.
+    """
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        columns = line[len("import time:") :].split("|")
+        if len(columns) != 3 or not columns[0].strip().isdigit():
+            continue
+        name = columns[2].rstrip()
+        module = name.lstrip()
+        imports.append(
+            ImportTime(
+                module=module,
+                self_us=int(columns[0]),
+                cumulative_us=int(columns[1]),
+                depth=(len(name) - len(module) - 1) // 2,
+            )
+        )
+    return imports
+
+
+def summarize_by_package(imports: List[ImportTime]) -> Dict[str, int]:
+    """
+    Add up the self time of the imports of each top level package.
+
+    Args:
+        imports (List[ImportTime]): The parsed report.
+
+    Returns:
+        Dict[str, int]: Microseconds spent per top level package.
+    """
+    totals = defaultdict(int)
+    for entry in imports:
+        totals[entry.module.split(".")[0]] += entry.self_us
+    return dict(totals)
+
+
+class Command(BaseCommand):
+    """
+    Profiles the imports done by a cold start of the project in a new
+    interpreter and prints the slowest modules and packages.
+    """
+
+    help = "Report the import time of a cold start (python -X importtime)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--module",
+            default="reservations.wsgi",
+            help="Entry point to import, reservations.wsgi by default.",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Number of rows of each table."
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "reservations.settings")
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                STARTUP_SCRIPT.format(module=options["module"]),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            errors = [
+                line
+                for line in result.stderr.strip().splitlines()
+                if not line.startswith("import time:")
+            ]
+            raise CommandError(
+                errors[-1]
+                if errors
+                else f"Import exited with code {result.returncode}."
+            )
+
+        imports = parse_importtime(result.stderr)
+        limit = options["limit"]
+        total_us = sum(entry.cumulative_us for entry in imports if entry.depth == 0)
+        self.stdout.write(f"Total import time: {total_us / 1000:.1f} ms")
+
+        self.stdout.write("\nSlowest modules (cumulative ms):")
+        slowest = sorted(imports, key=lambda entry: entry.cumulative_us, reverse=True)
+        for entry in slowest[:limit]:
+            self.stdout.write(f"{entry.cumulative_us / 1000:>10.1f}  {entry.module}")
+
+        self.stdout.write("\nSlowest packages (self ms):")
+        packages = sorted(
+            summarize_by_package(imports).items(),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        for package, self_us in packages[:limit]:
+            self.stdout.write(f"{self_us / 1000:>10.1f}  {package}")
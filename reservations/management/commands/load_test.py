@@ -0,0 +1,101 @@
+import asyncio
+import random
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from pricing_rules.models import PricingRule
+from properties.models import Property
+from reservations.loadtest import SCENARIOS, run_load, summarize
+
+
+def seed_properties(count: int, seed: int = 0) -> None:
+    """
+    Create properties with a weekly discount to send the traffic to.
+
+    Args:
+        count (int): Number of properties.
+        seed (int): Seed of the base prices.
+    """
+    rng = random.Random(seed)
+    with transaction.atomic():
+        properties = Property.objects.bulk_create(
+            Property(
+                name=f"Load test property {index}", base_price=rng.randint(50, 300)
+            )
+            for index in range(count)
+        )
+        PricingRule.objects.bulk_create(
+            PricingRule(property=property, min_stay_length=7, price_modifier=-10)
+            for property in properties
+        )
+
+
+class Command(BaseCommand):
+    """
+    Sends the traffic of a scenario to a running server and reports the
+    throughput, latency percentiles and error rates of each kind of request.
+    Start the server (for example with gunicorn reservations.wsgi) against
+    the same database, seeded with --seed-properties.
+    """
+
+    help = "Load test a running server with a realistic mix of traffic."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="URL of the server under test.",
+        )
+        parser.add_argument(
+            "--scenario", choices=SCENARIOS, default="mixed", help="Traffic to send."
+        )
+        parser.add_argument(
+            "--users", type=int, default=50, help="Concurrent virtual users."
+        )
+        parser.add_argument(
+            "--duration", type=float, default=30, help="Seconds of traffic."
+        )
+        parser.add_argument(
+            "--hot-properties",
+            type=int,
+            default=3,
+            help="Properties receiving the booking bursts.",
+        )
+        parser.add_argument(
+            "--seed-properties",
+            type=int,
+            default=0,
+            help="Properties created in the database before the run.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=None, help="Seed for a repeatable run."
+        )
+
+    def handle(self, *args, **options):
+        if options["seed_properties"]:
+            seed_properties(options["seed_properties"], options["seed"] or 0)
+            self.stdout.write(f"Created {options['seed_properties']} properties.")
+        try:
+            samples, elapsed = asyncio.run(
+                run_load(
+                    options["url"],
+                    options["scenario"],
+                    options["users"],
+                    options["duration"],
+                    options["hot_properties"],
+                    options["seed"],
+                )
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot load test {options['url']}: {error}")
+
+        self.stdout.write(
+            f"{'request':<10}{'count':>8}{'rps':>9}{'p50 ms':>9}{'p90 ms':>9}"
+            f"{'p99 ms':>9}{'max ms':>9}{'4xx':>8}{'5xx':>8}"
+        )
+        for row in summarize(samples, elapsed):
+            self.stdout.write(
+                f"{row['name']:<10}{row['requests']:>8}{row['rps']:>9.1f}"
+                f"{row['p50']:>9.1f}{row['p90']:>9.1f}{row['p99']:>9.1f}"
+                f"{row['max']:>9.1f}{row['client_errors']:>8.1%}"
+                f"{row['server_errors']:>8.1%}"
+            )
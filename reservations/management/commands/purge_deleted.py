@@ -0,0 +1,43 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from bookings.models import Booking
+from pricing_rules.models import PricingRule
+from reservations.softdelete import purge_deleted
+
+SOFT_DELETED_MODELS = (Booking, PricingRule)
+
+
+class Command(BaseCommand):
+    """
+    Removes the bookings and pricing rules soft deleted before a cutoff from
+    their tables, in batches so that the table is never locked for long.
+    """
+
+    help = "Purge the rows soft deleted more than a number of days ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.SOFT_DELETE_RETENTION_DAYS,
+            help="Rows deleted more than these days ago are purged, by default "
+            "SOFT_DELETE_RETENTION_DAYS.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows removed per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        for model in SOFT_DELETED_MODELS:
+            purged = purge_deleted(model, cutoff, options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Purged {purged} {model._meta.verbose_name_plural}."
+                )
+            )
@@ -0,0 +1,55 @@
+import gzip
+import re
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+ACCEPTS_BROTLI = re.compile(r"\bbr\b")
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+class CompressionMiddleware:
+    """
+    Compresses the JSON responses with Brotli, if the brotli package is
+    installed and the client accepts it, or with gzip otherwise.
+    Streaming responses and bodies shorter than RESPONSE_COMPRESSION_MIN_LENGTH
+    are sent as they are.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("application/json")
+            or len(response.content) < settings.RESPONSE_COMPRESSION_MIN_LENGTH
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        accept_encoding = request.headers.get("Accept-Encoding", "")
+        if brotli is not None and ACCEPTS_BROTLI.search(accept_encoding):
+            content, encoding = brotli.compress(response.content), "br"
+        elif ACCEPTS_GZIP.search(accept_encoding):
+            content, encoding = gzip.compress(response.content, mtime=0), "gzip"
+        else:
+            return response
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # The compressed body is not byte-for-byte the same representation
+            response["ETag"] = "W/" + etag
+        return response
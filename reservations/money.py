@@ -0,0 +1,145 @@
+"""
+Fixed point helpers for prices and percentages.
+
+Prices are stored as integer minor units (cents) and percentages as integer
+hundredths of a percent (basis points), so the pricing math and the revenue
+aggregations run on plain integers. The API keeps exposing them as numbers
+with up to two decimals.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Optional, Union
+import django_filters
+from django_filters.constants import EMPTY_VALUES
+from rest_framework import serializers
+
+Number = Union[int, float, str, Decimal]
+
+BASIS_POINTS = 10000
+"""BASIS_POINTS: Basis points in 100%"""
+
+
+def to_hundredths(value: Optional[Number]) -> Optional[int]:
+    """
+    Convert a number with up to two decimals to an integer of hundredths,
+    rounding half up. Used for cents and for basis points.
+
+    Args:
+        value (Optional[Number]): The number to convert, for example 10.1.
+
+    Returns:
+        Optional[int]: The number of hundredths, for example 1010.
+
+    Raises:
+        ValueError: If the value is not a valid number.
+    """
+    if value is None:
+        return None
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Invalid number: {value!r}")
+    if not number.is_finite():
+        raise ValueError(f"Invalid number: {value!r}")
+    return int((number * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_hundredths(value: Optional[int]) -> Optional[float]:
+    """
+    Convert an integer of hundredths back to the number shown in the API.
+
+    Args:
+        value (Optional[int]): The number of hundredths, for example 1010.
+
+    Returns:
+        Optional[float]: The number, for example 10.1.
+    """
+    if value is None:
+        return None
+    return value / 100
+
+
+def divide_rounding(numerator: int, denominator: int) -> int:
+    """
+    Divide two integers rounding half away from zero.
+
+    Args:
+        numerator (int): The dividend.
+        denominator (int): The divisor, greater than zero.
+
+    Returns:
+        int: The rounded quotient.
+    """
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def apply_basis_points(cents: int, basis_points: int) -> int:
+    """
+    Apply a percentage modifier to a price using integer math.
+
+    Args:
+        cents (int): The price in cents.
+        basis_points (int): The modifier in hundredths of a percent, -1000 is a 10% discount.
+
+    Returns:
+        int: The modified price in cents.
+    """
+    return divide_rounding(cents * (BASIS_POINTS + basis_points), BASIS_POINTS)
+
+
+def hundredths_property(field_name: str, doc: str) -> property:
+    """
+    Build a model property that reads and writes an integer field of
+    hundredths as a number with up to two decimals. Like any property it can
+    be passed to the model constructor, for example Property(base_price=10.1).
+
+    Args:
+        field_name (str): The integer field storing the hundredths.
+        doc (str): Docstring of the property.
+
+    Returns:
+        property: The property to declare in the model.
+    """
+
+    def getter(instance) -> Optional[float]:
+        return from_hundredths(getattr(instance, field_name))
+
+    def setter(instance, value: Optional[Number]) -> None:
+        setattr(instance, field_name, to_hundredths(value))
+
+    return property(getter, setter, doc=doc)
+
+
+class HundredthsField(serializers.Field):
+    """
+    Serializer field for a number stored as an integer of hundredths.
+    It is read and written as a number with up to two decimals.
+    """
+
+    default_error_messages = {"invalid": "A valid number is required."}
+
+    def to_internal_value(self, data: Number) -> int:
+        if isinstance(data, bool):
+            self.fail("invalid")
+        try:
+            return to_hundredths(data)
+        except ValueError:
+            self.fail("invalid")
+
+    def to_representation(self, value: int) -> float:
+        return from_hundredths(value)
+
+
+class HundredthsFilter(django_filters.NumberFilter):
+    """
+    Filter for a number stored as an integer of hundredths.
+    The query parameter is a number with up to two decimals.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return super().filter(qs, to_hundredths(value))
@@ -0,0 +1,156 @@
+"""
+Opt-in profiling of slow requests.
+
+A request is profiled with cProfile when it sends the X-Profile header with
+the PROFILING_SECRET value, or when it is picked by PROFILING_SAMPLE_RATE.
+Profiled requests slower than PROFILING_SLOW_MS, or explicitly asked for
+with the header, keep their top frames in a bounded ring buffer exposed by
+the admin-only profiles endpoint. Requests that are not profiled only pay
+for a random number and a header lookup.
+"""
+
+import cProfile
+import pstats
+import random
+import time
+from collections import deque
+from itertools import count
+from threading import Lock
+from typing import Dict, List, NamedTuple
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+
+class ProfileRecord(NamedTuple):
+    """
+    The top frames of a profiled request.
+
+    Attributes:
+        id: Sequential ID, also sent in the X-Profile-Id response header.
+        method: HTTP method of the request.
+        path: Path of the request.
+        status: HTTP status code of the response.
+        duration_ms: Wall time of the request, in milliseconds.
+        recorded_at: ISO 8601 date of the request.
+        frames: The slowest functions by cumulative time.
+    """
+
+    id: int
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    recorded_at: str
+    frames: List[Dict]
+
+
+class ProfileBuffer:
+    """
+    Ring buffer keeping the latest profile records.
+
+    Attributes:
+        maxlen: Number of records kept, the oldest are dropped.
+    """
+
+    def __init__(self, maxlen: int):
+        self._records = deque(maxlen=maxlen)
+        self._ids = count(1)
+        self._lock = Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def add(self, record: ProfileRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> List[ProfileRecord]:
+        """
+        Get the kept records, the newest first.
+        """
+        with self._lock:
+            return list(reversed(self._records))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+
+profile_buffer = ProfileBuffer(settings.PROFILING_BUFFER_SIZE)
+
+# cProfile can only run one profiler at a time, so concurrent requests of a
+# threaded worker are not profiled while another one is
+_profiler_lock = Lock()
+
+
+def get_top_frames(profiler: cProfile.Profile, limit: int) -> List[Dict]:
+    """
+    Get the functions with the biggest cumulative time of a profile.
+
+    Args:
+        profiler (cProfile.Profile): The profiler of the request.
+        limit (int): Maximum number of functions.
+
+    Returns:
+        List[Dict]: Per function, its location, number of calls and the time
+        spent in it alone and including its callees, in milliseconds.
+    """
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": function,
+            "file": file,
+            "line": line,
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (file, line, function), (_, calls, total, cumulative, _) in rows[:limit]
+    ]
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests asked for with the X-Profile header or sampled,
+    keeping the slow ones in the profile buffer.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        secret = settings.PROFILING_SECRET
+        forced = bool(secret) and request.headers.get("X-Profile") == secret
+        if not forced and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        if not _profiler_lock.acquire(blocking=False):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        finally:
+            _profiler_lock.release()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if forced or duration_ms >= settings.PROFILING_SLOW_MS:
+            record = ProfileRecord(
+                id=profile_buffer.next_id(),
+                method=request.method,
+                path=request.path,
+                status=response.status_code,
+                duration_ms=round(duration_ms, 3),
+                recorded_at=timezone.now().isoformat(),
+                frames=get_top_frames(profiler, settings.PROFILING_TOP_FRAMES),
+            )
+            profile_buffer.add(record)
+            response["X-Profile-Id"] = str(record.id)
+        return response
@@ -0,0 +1,103 @@
+"""
+Compact binary rendering for the list endpoints.
+
+Clients sending "Accept: application/msgpack" get the same data as the JSON
+response encoded with MessagePack, with dates as ordinals (days since
+0001-01-01) and datetimes as POSIX timestamps. The renderer is only offered
+when the optional msgpack package is installed.
+"""
+
+from datetime import date, datetime
+from typing import Any, Optional
+from rest_framework import serializers
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+def encode_default(value: Any) -> Any:
+    """
+    Encode the values MessagePack does not support natively.
+
+    Args:
+        value (Any): A value found in the rendered data.
+
+    Returns:
+        Any: The ordinal of dates, the timestamp of datetimes or the string of
+        anything else, for example a Decimal.
+    """
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return value.toordinal()
+    return str(value)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders the response data as MessagePack.
+    The CompactDateField and CompactDateTimeField serializer fields send
+    numbers instead of strings when this renderer is negotiated.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    numeric_dates = True
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[dict] = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+LIST_RENDERER_CLASSES = list(api_settings.DEFAULT_RENDERER_CLASSES)
+if msgpack is not None:
+    LIST_RENDERER_CLASSES.append(MessagePackRenderer)
+
+
+def is_compact(context: dict) -> bool:
+    """
+    Check if a serializer renders for a compact binary format.
+
+    Args:
+        context (dict): The serializer context.
+
+    Returns:
+        bool: True if the negotiated renderer wants dates as numbers.
+    """
+    request = context.get("request")
+    renderer = getattr(request, "accepted_renderer", None)
+    return getattr(renderer, "numeric_dates", False)
+
+
+class CompactDateField(serializers.DateField):
+    """
+    Date field sent as an ordinal when the response is compact.
+    """
+
+    def to_representation(self, value: date):
+        if value is not None and is_compact(self.context):
+            return value.toordinal()
+        return super().to_representation(value)
+
+
+class CompactDateTimeField(serializers.DateTimeField):
+    """
+    Datetime field sent as a POSIX timestamp when the response is compact.
+    """
+
+    def to_representation(self, value: datetime):
+        if value is not None and is_compact(self.context):
+            return value.timestamp()
+        return super().to_representation(value)
@@ -0,0 +1,99 @@
+"""
+Routing of the read-only traffic to a replica database.
+
+The views with ``read_replica = True`` read from the DATABASE_REPLICA alias
+when they answer a GET or HEAD request, everything else uses the primary
+("default") database. The first write of a request pins the rest of that
+request to the primary, so it never reads back stale data from a replica
+lagging behind its own write.
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+PRIMARY = "default"
+
+# Alias read by the current request, None when it must use the primary
+_read_alias: ContextVar[Optional[str]] = ContextVar("read_alias", default=None)
+
+
+def get_replica_alias() -> Optional[str]:
+    """
+    Get the alias of the replica database.
+
+    Returns:
+        Optional[str]: The DATABASE_REPLICA alias, None if it is not set or
+        it is not a configured database.
+    """
+    alias = getattr(settings, "DATABASE_REPLICA", None)
+    if alias and alias in connections.settings:
+        return alias
+    return None
+
+
+def use_replica() -> None:
+    """
+    Send the reads of the current context to the replica, if there is one.
+    """
+    _read_alias.set(get_replica_alias())
+
+
+def use_primary() -> None:
+    """
+    Send the reads of the current context to the primary database.
+    """
+    _read_alias.set(None)
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of the read-only views to the replica,
+    and every write to the primary.
+    """
+
+    def db_for_read(self, model, **hints) -> str:
+        return _read_alias.get() or PRIMARY
+
+    def db_for_write(self, model, **hints) -> str:
+        # Read-after-write: the rest of the request reads from the primary
+        use_primary()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        aliases = {PRIMARY, get_replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Marks the safe requests to the views with ``read_replica = True`` so
+    that their queries are routed to the replica.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        token = _read_alias.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        if request.method in SAFE_METHODS and getattr(
+            view_class, "read_replica", False
+        ):
+            use_replica()
+        return None
@@ -46,17 +46,93 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django_filters',
     'rest_framework',
-    'drf_yasg',
+    'reservations',
     'properties',
     'pricing_rules',
     'bookings',
+    'outbox',
+    'currencies',
+    'history',
 ]
 
+# The Swagger/ReDoc documentation can be turned off in production, then
+# drf_yasg is neither installed nor imported by the workers
+API_DOCS_ENABLED = os.getenv('API_DOCS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+if API_DOCS_ENABLED:
+    INSTALLED_APPS.append('drf_yasg')
+
+# The schema written by "manage.py build_schema" is served as is, otherwise it
+# is generated on the first request of each worker
+API_SCHEMA_PATH = os.getenv('API_SCHEMA_PATH', BASE_DIR / 'openapi.json')
+API_SCHEMA_MAX_AGE = int(os.getenv('API_SCHEMA_MAX_AGE', 3600))
+
+# The documentation UIs load the cached schema instead of generating their own
+SWAGGER_SETTINGS = {'SPEC_URL': ('schema-json', {'format': '.json'})}
+REDOC_SETTINGS = {'SPEC_URL': ('schema-json', {'format': '.json'})}
+
 REST_FRAMEWORK = {
     'DATE_INPUT_FORMATS': ["%m-%d-%Y"],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 }
 
+# Days covered by the availability bitmap of each property, starting today
+AVAILABILITY_HORIZON_DAYS = int(os.getenv('AVAILABILITY_HORIZON_DAYS', 365))
+
+# Days from the start of a stay whose occupancy the occupancy rules look at
+OCCUPANCY_WINDOW_DAYS = int(os.getenv('OCCUPANCY_WINDOW_DAYS', 30))
+
+# Maximum number of group rule template sets memoized by each worker
+GROUP_RULES_CACHE_SIZE = int(os.getenv('GROUP_RULES_CACHE_SIZE', 1024))
+
+# Maximum number of quotes memoized by each worker
+QUOTE_CACHE_SIZE = int(os.getenv('QUOTE_CACHE_SIZE', 10000))
+
+# Bookings that ended more than these days ago are moved to the archive table
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.getenv('BOOKING_ARCHIVE_AFTER_DAYS', 730))
+
+# Soft deleted bookings and pricing rules are removed from their tables by
+# "manage.py purge_deleted" once deleted for more than these days
+SOFT_DELETE_RETENTION_DAYS = int(os.getenv('SOFT_DELETE_RETENTION_DAYS', 90))
+
+# Booking events kept for the stream consumers reconnecting with Last-Event-ID
+BOOKING_EVENTS_BUFFER_SIZE = int(os.getenv('BOOKING_EVENTS_BUFFER_SIZE', 1000))
+
+# Token buckets per client: "rate" tokens per second, up to "burst" tokens.
+# The buckets are per worker with the in-memory store, use
+# reservations.throttling.CacheBucketStore to share them through the cache
+TOKEN_BUCKET_STORE = os.getenv(
+    'TOKEN_BUCKET_STORE', 'reservations.throttling.InMemoryBucketStore'
+)
+TOKEN_BUCKETS = {
+    'booking_create': {
+        'rate': float(os.getenv('BOOKING_CREATE_RATE', 20)),
+        'burst': int(os.getenv('BOOKING_CREATE_BURST', 60)),
+    },
+    'quote': {
+        'rate': float(os.getenv('QUOTE_RATE', 50)),
+        'burst': int(os.getenv('QUOTE_BURST', 200)),
+    },
+}
+
+# Booking writes running at the same time across the deployment, the next
+# ones get a 503 telling the client to retry after BOOKING_WRITE_RETRY_AFTER
+# seconds. The slots are held in the default cache, so the limit is only
+# shared by the workers when CACHES is shared too (for example Redis).
+# reservations.throttling.ConcurrencyLimiter limits each worker instead.
+# A slot of a worker that died is freed after CONCURRENCY_SLOT_TIMEOUT seconds
+BOOKING_WRITE_LIMITER = os.getenv(
+    'BOOKING_WRITE_LIMITER', 'reservations.throttling.CacheConcurrencyLimiter'
+)
+BOOKING_WRITE_CONCURRENCY = int(os.getenv('BOOKING_WRITE_CONCURRENCY', 16))
+BOOKING_WRITE_RETRY_AFTER = int(os.getenv('BOOKING_WRITE_RETRY_AFTER', 1))
+CONCURRENCY_SLOT_TIMEOUT = int(os.getenv('CONCURRENCY_SLOT_TIMEOUT', 30))
+
+# Exchange rates are loaded against BASE_CURRENCY, and each worker reads them
+# again after FX_TABLE_TTL seconds
+BASE_CURRENCY = os.getenv('BASE_CURRENCY', 'USD')
+FX_TABLE_TTL = int(os.getenv('FX_TABLE_TTL', 300))
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -65,8 +141,34 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'reservations.routers.ReplicaRoutingMiddleware',
 ]
 
+# Compress the JSON responses with Brotli or gzip, the Brotli encoding needs
+# the optional brotli package
+RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', 'false').lower() in (
+    '1',
+    'true',
+    'yes',
+)
+RESPONSE_COMPRESSION_MIN_LENGTH = int(
+    os.getenv('RESPONSE_COMPRESSION_MIN_LENGTH', 1024)
+)
+if RESPONSE_COMPRESSION:
+    MIDDLEWARE.insert(1, 'reservations.middleware.CompressionMiddleware')
+
+# Requests sending "X-Profile: <PROFILING_SECRET>", and a PROFILING_SAMPLE_RATE
+# fraction of all requests, are profiled. The PROFILING_TOP_FRAMES slowest
+# functions of those slower than PROFILING_SLOW_MS are kept in a buffer of
+# PROFILING_BUFFER_SIZE records, listed to staff users at /profiles/
+PROFILING_SECRET = os.getenv('PROFILING_SECRET', '')
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_SLOW_MS = float(os.getenv('PROFILING_SLOW_MS', 500))
+PROFILING_TOP_FRAMES = int(os.getenv('PROFILING_TOP_FRAMES', 25))
+PROFILING_BUFFER_SIZE = int(os.getenv('PROFILING_BUFFER_SIZE', 50))
+if PROFILING_SECRET or PROFILING_SAMPLE_RATE:
+    MIDDLEWARE.insert(0, 'reservations.profiling.ProfilingMiddleware')
+
 ROOT_URLCONF = 'reservations.urls'
 
 TEMPLATES = [
@@ -95,9 +197,67 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # The test database is a file rather than in memory, so the threads
+        # of the live test server each have their own connection to it. It
+        # is removed at the end of the run, and ignored by git
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    }
+}
+
+# With REPLICA_DB_NAME set, the read-only views (lists, details, quotes and
+# reports) read from the replica database. SQLite does not replicate itself:
+# the replica is a copy of the primary file kept up to date outside of Django,
+# for example by LiteFS. Without it, every query uses the primary
+REPLICA_DB_NAME = os.getenv('REPLICA_DB_NAME')
+DATABASE_REPLICA = 'replica' if REPLICA_DB_NAME else None
+if REPLICA_DB_NAME:
+    DATABASES['replica'] = {
+        'ENGINE': DATABASES['default']['ENGINE'],
+        'NAME': REPLICA_DB_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['reservations.routers.ReplicaRouter']
+
+# Cache shared by the workers, local to each worker by default. Set
+# CACHE_BACKEND and CACHE_LOCATION to use for example Redis or Memcached
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
+# Values memoized with reservations.cache.get_or_compute are served for
+# SHARED_CACHE_STALE_TTL seconds after they expire while one worker computes
+# them again. The others wait up to SHARED_CACHE_LOCK_TIMEOUT seconds for a
+# missing value, checking every SHARED_CACHE_POLL_INTERVAL seconds.
+# SHARED_CACHE_BETA tunes how early hot values are refreshed, 0 disables it
+SHARED_CACHE_STALE_TTL = int(os.getenv('SHARED_CACHE_STALE_TTL', 30))
+SHARED_CACHE_LOCK_TIMEOUT = float(os.getenv('SHARED_CACHE_LOCK_TIMEOUT', 5))
+SHARED_CACHE_POLL_INTERVAL = float(os.getenv('SHARED_CACHE_POLL_INTERVAL', 0.02))
+SHARED_CACHE_BETA = float(os.getenv('SHARED_CACHE_BETA', 1))
+
+# Seconds the pricing rules of a property are cached for each rules version
+PRICING_RULES_CACHE_TTL = int(os.getenv('PRICING_RULES_CACHE_TTL', 300))
+
+# Seconds a rendered property calendar is cached, it is rendered again
+# anyway as soon as a booking of the property changes
+CALENDAR_CACHE_TTL = int(os.getenv('CALENDAR_CACHE_TTL', 3600))
+
+# Destination of the outbox events delivered by "manage.py drain_outbox":
+# a file (OUTBOX_SINK_PATH), or a URL (OUTBOX_SINK_URL) with the HttpSink
+OUTBOX_SINK_CLASS = os.getenv('OUTBOX_SINK_CLASS', 'outbox.sinks.FileSink')
+OUTBOX_SINK = {
+    'CLASS': OUTBOX_SINK_CLASS,
+    'OPTIONS': (
+        {'url': os.getenv('OUTBOX_SINK_URL')}
+        if OUTBOX_SINK_CLASS == 'outbox.sinks.HttpSink'
+        else {'path': os.getenv('OUTBOX_SINK_PATH', BASE_DIR / 'outbox.ndjson')}
+    ),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -0,0 +1,163 @@
+"""
+Soft deletion of rows.
+
+Deleting a SoftDeleteModel, or a queryset of them, only sets its deleted_at
+column with a single UPDATE, and the default manager hides the deleted rows.
+The delete signals are still sent, so availability, events and the outbox
+handle a soft deleted row like a deleted one. The deleted rows are removed
+for good in batches by "manage.py purge_deleted".
+"""
+
+from datetime import datetime
+from typing import List, Tuple, Type
+from django.db import connections, models, router, transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+
+ALIVE = models.Q(deleted_at__isnull=True)
+DELETED = models.Q(deleted_at__isnull=False)
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    QuerySet whose delete sets the deleted_at column of the rows.
+    """
+
+    def delete(self) -> Tuple[int, dict]:
+        """
+        Soft delete the rows, sending the delete signals for each of them if
+        any receiver listens to them.
+
+        Returns:
+            Tuple[int, dict]: The number of deleted rows, and per model label.
+        """
+        model = self.model
+        deleted_at = timezone.now()
+        instances = []
+        with transaction.atomic(using=self.db, savepoint=False):
+            if pre_delete.has_listeners(model) or post_delete.has_listeners(model):
+                instances = list(self.filter(ALIVE))
+                for instance in instances:
+                    pre_delete.send(
+                        sender=model, instance=instance, using=self.db, origin=self
+                    )
+            count = self.filter(ALIVE).update(deleted_at=deleted_at)
+            for instance in instances:
+                instance.deleted_at = deleted_at
+                post_delete.send(
+                    sender=model, instance=instance, using=self.db, origin=self
+                )
+        return count, {model._meta.label: count}
+
+    def hard_delete(self) -> Tuple[int, dict]:
+        """
+        Delete the rows from the table, with the cascades and signals.
+        """
+        return super().delete()
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """
+    Manager hiding the soft deleted rows.
+    """
+
+    def get_queryset(self) -> SoftDeleteQuerySet:
+        return super().get_queryset().filter(ALIVE)
+
+
+class SoftDeleteModel(models.Model):
+    """
+    Abstract model deleted by setting its deleted_at column. The concrete
+    models index their active rows with partial indexes on ALIVE, and the
+    deleted ones with an index on DELETED for the purge.
+    """
+
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    """deleted_at: Date of deletion, null while the row is active"""
+
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def delete(self, using=None, keep_parents=False) -> Tuple[int, dict]:
+        """
+        Soft delete the row with a single UPDATE, sending the delete signals.
+
+        Returns:
+            Tuple[int, dict]: The number of deleted rows, and per model label.
+        """
+        model = type(self)
+        using = using or router.db_for_write(model, instance=self)
+        pre_delete.send(sender=model, instance=self, using=using, origin=self)
+        self.deleted_at = timezone.now()
+        model._base_manager.using(using).filter(pk=self.pk).update(
+            deleted_at=self.deleted_at
+        )
+        post_delete.send(sender=model, instance=self, using=using, origin=self)
+        return 1, {self._meta.label: 1}
+
+    def hard_delete(self) -> Tuple[int, dict]:
+        """
+        Delete the row from the table, with the cascades and signals.
+        """
+        return super().delete()
+
+
+def delete_rows(model: Type[models.Model], pks: List[int], using: str) -> int:
+    """
+    Delete rows by primary key with a single DELETE statement, without the
+    cascades and delete signals of QuerySet.delete: the caller notifies
+    whatever has to know about the deletion.
+
+    Args:
+        model (Type[models.Model]): The model of the rows.
+        pks (List[int]): The primary keys of the rows.
+        using (str): The database alias.
+
+    Returns:
+        int: The number of deleted rows.
+    """
+    if not pks:
+        return 0
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} "
+            f"WHERE {quote(model._meta.pk.column)} IN ({placeholders})",
+            pks,
+        )
+        return cursor.rowcount
+
+
+def purge_deleted(
+    model: Type[SoftDeleteModel], cutoff: datetime, batch_size: int = 1000
+) -> int:
+    """
+    Remove from the table the rows soft deleted before a cutoff.
+    Each batch is deleted in its own transaction.
+
+    Args:
+        model (Type[SoftDeleteModel]): The soft deleted model.
+        cutoff (datetime): Rows deleted before this moment are removed.
+        batch_size (int): Number of rows removed per transaction.
+
+    Returns:
+        int: The number of removed rows.
+    """
+    using = router.db_for_write(model)
+    purged = 0
+    while True:
+        with transaction.atomic(using=using):
+            ids = list(
+                model.all_objects.filter(DELETED, deleted_at__lt=cutoff)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return purged
+            # The delete signals were sent by the soft delete already
+            purged += delete_rows(model, ids, using)
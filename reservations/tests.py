@@ -0,0 +1,576 @@
+import asyncio
+import gzip
+import io
+import json
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from unittest import skipUnless
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework import status
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import LiveServerTestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookings.models import Booking
+from bookings.utils import get_pricing_rules
+from pricing_rules.models import PricingRule
+from properties.models import Property
+from reservations.cache import cache_stats, get_or_compute
+from reservations.docs import get_schema_document
+from reservations.loadtest import HttpClient, Sample, percentile, summarize
+from reservations.middleware import CompressionMiddleware
+from reservations.money import apply_basis_points, from_hundredths, to_hundredths
+from reservations.profiling import ProfilingMiddleware, profile_buffer
+from reservations.routers import ReplicaRouter, use_primary, use_replica
+from reservations.management.commands.importtime import (
+    parse_importtime,
+    summarize_by_package,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ApiDocsTestCase(APITestCase):
+    """
+    Test case for the lazily built and cached API documentation.
+    """
+
+    def setUp(self):
+        self.schema_url = reverse("schema-json", kwargs={"format": ".json"})
+        get_schema_document.cache_clear()
+
+    def tearDown(self):
+        get_schema_document.cache_clear()
+
+    def test_get_schema(self):
+        """
+        Test that the schema is built on the first request.
+        """
+        response = self.client.get(self.schema_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("/bookings/", response.json()["paths"])
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_get_schema_not_modified(self):
+        """
+        Test that a request with the current ETag gets a 304 without a body.
+        """
+        etag = self.client.get(self.schema_url)["ETag"]
+        response = self.client.get(self.schema_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_get_schema_from_file(self):
+        """
+        Test that the schema written by build_schema is served as is.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "openapi.json"
+            with override_settings(API_SCHEMA_PATH=path):
+                call_command("build_schema", stdout=io.StringIO())
+                path.write_text('{"paths": {}}')
+                response = self.client.get(self.schema_url)
+        self.assertEqual(response.json(), {"paths": {}})
+
+
+class ImportTimeTestCase(APITestCase):
+    """
+    Test case for the parsing of the python -X importtime report.
+    """
+
+    REPORT = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |   django.utils",
+            "import time:        50 |        150 | django",
+            "import time:        30 |         30 | rest_framework",
+        ]
+    )
+
+    def test_parse_importtime(self):
+        imports = parse_importtime(self.REPORT)
+        self.assertEqual(
+            [entry.module for entry in imports],
+            ["django.utils", "django", "rest_framework"],
+        )
+        self.assertEqual([entry.depth for entry in imports], [1, 0, 0])
+        self.assertEqual(imports[1].cumulative_us, 150)
+
+    def test_summarize_by_package(self):
+        totals = summarize_by_package(parse_importtime(self.REPORT))
+        self.assertEqual(totals, {"django": 150, "rest_framework": 30})
+
+    def test_importtime_exit_without_error(self):
+        """
+        Test that a child exiting without a traceback reports its return code.
+        """
+        with self.assertRaisesMessage(CommandError, "exited with code 3"):
+            call_command("importtime", module="os; os._exit(3)", stdout=io.StringIO())
+
+
+class MoneyTestCase(APITestCase):
+    """
+    Test case for the fixed point prices and percentages.
+    """
+
+    def test_to_hundredths(self):
+        self.assertEqual(to_hundredths(10.1), 1010)
+        self.assertEqual(to_hundredths("355.52"), 35552)
+        self.assertEqual(to_hundredths(0.125), 13)
+        self.assertEqual(to_hundredths(-9), -900)
+        self.assertIsNone(to_hundredths(None))
+        with self.assertRaises(ValueError):
+            to_hundredths("ten")
+
+    def test_from_hundredths(self):
+        self.assertEqual(from_hundredths(35552), 355.52)
+        self.assertIsNone(from_hundredths(None))
+
+    def test_apply_basis_points(self):
+        """
+        Test that the percentage modifiers are exact and round half up.
+        """
+        self.assertEqual(apply_basis_points(44440, -2000), 35552)
+        self.assertEqual(apply_basis_points(3600, 1000), 3960)
+        self.assertEqual(apply_basis_points(5, -1000), 5)
+        self.assertEqual(apply_basis_points(-15, 0), -15)
+
+
+class CompactResponseTestCase(APITestCase):
+    """
+    Test case for the MessagePack renderer and the compression middleware.
+    """
+
+    def setUp(self):
+        self.property = Property.objects.create(name="Property", base_price=10)
+        Booking.objects.create(
+            property=self.property,
+            start_date=date(2022, 1, 1),
+            end_date=date(2022, 1, 10),
+            stay_length=10,
+            final_price=90,
+        )
+
+    @skipUnless(msgpack, "The msgpack package is not installed.")
+    def test_list_bookings_as_msgpack(self):
+        """
+        Test that dates are ordinals and prices numbers in the binary format.
+        """
+        response = self.client.get(
+            reverse("booking-list"), HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        booking = msgpack.unpackb(response.content)[0]
+        self.assertEqual(booking["start_date"], date(2022, 1, 1).toordinal())
+        self.assertEqual(booking["final_price"], 90)
+        self.assertIsInstance(booking["created_at"], float)
+
+    def test_list_bookings_as_json(self):
+        """
+        Test that JSON stays the default format.
+        """
+        response = self.client.get(reverse("booking-list"))
+        self.assertEqual(response.json()[0]["start_date"], "01-01-2022")
+
+    def test_compress_json(self):
+        """
+        Test that large JSON responses are gzipped when the client accepts it.
+        """
+        middleware = CompressionMiddleware(
+            lambda request: JsonResponse({"bookings": ["01-01-2022"] * 500})
+        )
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        response = middleware(request)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn(b"01-01-2022", gzip.decompress(response.content))
+
+    @skipUnless(brotli, "The brotli package is not installed.")
+    def test_compress_json_with_brotli(self):
+        """
+        Test that Brotli is preferred when the client accepts it.
+        """
+        middleware = CompressionMiddleware(
+            lambda request: JsonResponse({"bookings": ["01-01-2022"] * 500})
+        )
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip, br")
+        response = middleware(request)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn(b"01-01-2022", brotli.decompress(response.content))
+
+    def test_skip_compression(self):
+        """
+        Test that small, streaming or non JSON responses are sent as they are.
+        """
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        for response in (
+            JsonResponse({"detail": "ok"}),
+            HttpResponse(b"x" * 5000, content_type="text/plain"),
+            StreamingHttpResponse(iter([b"x"]), content_type="application/json"),
+        ):
+            compressed = CompressionMiddleware(lambda request: response)(request)
+            self.assertFalse(compressed.has_header("Content-Encoding"))
+
+
+def slow_view(request):
+    time.sleep(0.01)
+    return HttpResponse("done")
+
+
+@override_settings(PROFILING_SECRET="secret", PROFILING_SAMPLE_RATE=0)
+class ProfilingTestCase(APITestCase):
+    """
+    Test case for the profiling of slow requests.
+    """
+
+    def setUp(self):
+        profile_buffer.clear()
+        self.middleware = ProfilingMiddleware(slow_view)
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        profile_buffer.clear()
+
+    @override_settings(PROFILING_SLOW_MS=10**6)
+    def test_profile_with_header(self):
+        """
+        Test that a request asking for a profile is kept even if it is fast.
+        """
+        response = self.middleware(
+            self.factory.get("/bookings/", HTTP_X_PROFILE="secret")
+        )
+        record = profile_buffer.records()[0]
+        self.assertEqual(response["X-Profile-Id"], str(record.id))
+        self.assertEqual(record.path, "/bookings/")
+        self.assertIn("slow_view", [frame["function"] for frame in record.frames])
+
+    def test_skip_unprofiled_requests(self):
+        """
+        Test that requests without the right header are not profiled.
+        """
+        for request in (
+            self.factory.get("/"),
+            self.factory.get("/", HTTP_X_PROFILE="wrong"),
+        ):
+            self.assertFalse(self.middleware(request).has_header("X-Profile-Id"))
+        self.assertEqual(profile_buffer.records(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1)
+    def test_keep_slow_sampled_requests(self):
+        """
+        Test that sampled requests are only kept when slower than the threshold.
+        """
+        with override_settings(PROFILING_SLOW_MS=10**6):
+            self.middleware(self.factory.get("/"))
+        self.assertEqual(profile_buffer.records(), [])
+        with override_settings(PROFILING_SLOW_MS=1):
+            self.middleware(self.factory.get("/"))
+        self.assertEqual(len(profile_buffer.records()), 1)
+
+    def test_list_profiles(self):
+        """
+        Test that only staff users can list and clear the profiles.
+        """
+        self.middleware(self.factory.get("/", HTTP_X_PROFILE="secret"))
+        url = reverse("profile-list")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(User.objects.create_user("admin", is_staff=True))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(
+            self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT
+        )
+        self.assertEqual(profile_buffer.records(), [])
+
+
+@override_settings(DATABASE_REPLICA="replica")
+class ReplicaRoutingTestCase(APITransactionTestCase):
+    """
+    Test case for the routing of the read-only views to the replica. In the
+    tests the replica mirrors the primary, the queries are told apart by the
+    connection that ran them. The test data is committed, so that the replica
+    connection sees it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # The replica alias only exists with REPLICA_DB_NAME, without it the
+        # tests read the test database through a connection of their own
+        cls.added_replica = "replica" not in connections.settings
+        if cls.added_replica:
+            connections.settings["replica"] = dict(connections["default"].settings_dict)
+        cls.databases = {"default", "replica"}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.added_replica:
+            connections["replica"].close()
+            del connections["replica"]
+            del connections.settings["replica"]
+
+    def setUp(self):
+        self.property = Property.objects.create(name="Property", base_price=10)
+        Booking.objects.create(
+            property=self.property,
+            start_date=date(2022, 1, 1),
+            end_date=date(2022, 1, 3),
+        )
+
+    def capture(self, method, url, data=None):
+        with CaptureQueriesContext(
+            connections["default"]
+        ) as primary, CaptureQueriesContext(connections["replica"]) as replica:
+            response = getattr(self.client, method)(url, data, format="json")
+        return response, len(primary), len(replica)
+
+    def test_reads_go_to_replica(self):
+        for url, data in [
+            (reverse("booking-list"), None),
+            (reverse("booking-detail", kwargs={"pk": Booking.objects.get().pk}), None),
+            (reverse("property-list"), None),
+            (reverse("booking-report"), None),
+            (
+                reverse("booking-quote"),
+                {
+                    "property": self.property.pk,
+                    "start_date": "02-01-2022",
+                    "end_date": "02-03-2022",
+                },
+            ),
+        ]:
+            response, primary, replica = self.capture("get", url, data)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertGreater(replica, 0, url)
+
+    def test_writes_go_to_primary(self):
+        """
+        Test that a booking is created on the primary, including the reads
+        of the request that follow its first write.
+        """
+        data = {
+            "property": self.property.pk,
+            "start_date": "02-01-2022",
+            "end_date": "02-03-2022",
+        }
+        response, primary, replica = self.capture("post", reverse("booking-list"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_read_after_write(self):
+        router = ReplicaRouter()
+        use_replica()
+        try:
+            self.assertEqual(router.db_for_read(Booking), "replica")
+            self.assertEqual(router.db_for_write(Booking), "default")
+            self.assertEqual(router.db_for_read(Booking), "default")
+        finally:
+            use_primary()
+
+    @override_settings(DATABASE_REPLICA=None)
+    def test_without_replica(self):
+        response, primary, replica = self.capture("get", reverse("booking-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(replica, 0)
+
+
+class SharedCacheTestCase(APITestCase):
+    """
+    Test case for the stampede protection of the shared cache.
+    """
+
+    def setUp(self):
+        self.cache = caches["default"]
+        self.cache.clear()
+        cache_stats.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_miss_then_hit(self):
+        self.assertEqual(get_or_compute("key", self.compute, 60, beta=0), 1)
+        self.assertEqual(get_or_compute("key", self.compute, 60, beta=0), 1)
+        stats = self.client.get(reverse("cache-stats")).data
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_early_refresh(self):
+        """
+        Test that a slow computation is refreshed before it expires.
+        """
+        self.cache.set("key", ("old", 3600, time.time() + 60), 120)
+        self.assertEqual(get_or_compute("key", self.compute, 60), 1)
+        self.assertEqual(cache_stats.early_refreshes, 1)
+
+        self.cache.set("key", ("old", 3600, time.time() + 60), 120)
+        self.assertEqual(get_or_compute("key", self.compute, 60, beta=0), "old")
+
+    def test_stale_while_revalidate(self):
+        """
+        Test that an expired value is served while another worker holds the
+        lock, and computed again otherwise.
+        """
+        self.cache.set("key", ("old", 0, time.time() - 1), 60)
+        self.cache.add("key:lock", "other", 60)
+        self.assertEqual(get_or_compute("key", self.compute, 60), "old")
+        self.assertEqual(cache_stats.stale_hits, 1)
+        self.assertEqual(self.calls, 0)
+
+        self.cache.delete("key:lock")
+        self.assertEqual(get_or_compute("key", self.compute, 60), 1)
+
+    def test_single_flight(self):
+        """
+        Test that concurrent misses of the same key compute it only once.
+        """
+
+        def slow_compute():
+            time.sleep(0.1)
+            return self.compute()
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    get_or_compute("key", slow_compute, 60, beta=0)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [1] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache_stats.coalesced, 4)
+
+    @override_settings(SHARED_CACHE_LOCK_TIMEOUT=0.05)
+    def test_wait_timeout(self):
+        self.cache.add("key:lock", "other", 60)
+        self.assertEqual(get_or_compute("key", self.compute, 60), 1)
+        self.assertEqual(cache_stats.wait_timeouts, 1)
+
+    def test_pricing_rules_cached_by_rules_version(self):
+        property = Property.objects.create(name="Property", base_price=10)
+        PricingRule.objects.create(
+            property=property, min_stay_length=7, price_modifier=-10
+        )
+        property.refresh_from_db()
+        self.assertEqual(len(get_pricing_rules(property)), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_pricing_rules(property)), 1)
+
+        PricingRule.objects.create(
+            property=property, min_stay_length=14, price_modifier=-20
+        )
+        property.refresh_from_db()
+        self.assertEqual(len(get_pricing_rules(property)), 2)
+
+        Property.objects.filter(pk=property.pk).update(created_at=None)
+        property.refresh_from_db()
+        self.assertEqual(len(get_pricing_rules(property)), 2)
+
+
+class LoadTestTestCase(LiveServerTestCase):
+    """
+    Test case for the load testing command, run against a live test server.
+    """
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 90), 7)
+        self.assertEqual(percentile([], 90), 0)
+
+    def test_summarize(self):
+        samples = [
+            Sample("quote", 200, 10),
+            Sample("quote", 429, 30),
+            Sample("book", 0, 50),
+            Sample("book", 201, 20),
+        ]
+        rows = {row["name"]: row for row in summarize(samples, 2)}
+        self.assertEqual(rows["total"]["requests"], 4)
+        self.assertEqual(rows["total"]["rps"], 2)
+        self.assertEqual(rows["quote"]["client_errors"], 0.5)
+        self.assertEqual(rows["book"]["server_errors"], 0.5)
+        self.assertEqual(rows["book"]["max"], 50)
+
+    def test_read_chunked_response(self):
+        """
+        Test that the chunk sizes, their CRLF and the trailer are not part of
+        the body, and that the connection is reused for the next response.
+        """
+        response = (
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"5\r\n[1, 2\r\n3;name=value\r\n, 3\r\n1\r\n]\r\n0\r\n"
+            b"Expires: never\r\n\r\n"
+        )
+
+        async def serve(reader, writer):
+            for _ in range(2):
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(response)
+                await writer.drain()
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(serve, "127.0.0.1", 0)
+            client = HttpClient("127.0.0.1", server.sockets[0].getsockname()[1])
+            try:
+                return [await client.request("GET", "/") for _ in range(2)]
+            finally:
+                await client.close()
+                server.close()
+                await server.wait_closed()
+
+        for status_code, body in asyncio.run(run()):
+            self.assertEqual(status_code, 200)
+            self.assertEqual(json.loads(body), [1, 2, 3])
+
+    def test_load_test(self):
+        """
+        Test a short run with concurrent users, each served by a thread of
+        the live server with its own connection to the test database.
+        """
+        out = io.StringIO()
+        call_command(
+            "load_test",
+            url=self.live_server_url,
+            scenario="search",
+            users=2,
+            duration=1,
+            seed_properties=3,
+            seed=1,
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "Created 3 properties.")
+        total = lines[-1].split()
+        self.assertEqual(total[0], "total")
+        self.assertGreater(int(total[1]), 0)
+        self.assertEqual(total[-1], "0.0%")
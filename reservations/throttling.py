@@ -0,0 +1,253 @@
+"""
+Token bucket throttling and load shedding for the expensive endpoints.
+
+Each client gets a bucket per scope, holding up to "burst" tokens and
+refilled at "rate" tokens per second. A request takes one token, and is
+throttled with a 429 and Retry-After while the bucket is empty. The buckets
+live in the store configured with TOKEN_BUCKET_STORE: the in-memory store
+is per worker process, the cache store shares them through the Django cache.
+
+The booking writes in progress are limited the same way, by the limiter
+configured with BOOKING_WRITE_LIMITER: per worker process, or across the
+deployment with slots held in the Django cache.
+"""
+
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
+from threading import BoundedSemaphore, Lock
+from typing import Any, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+Bucket = Tuple[float, float]
+
+
+def refill(
+    bucket: Optional[Bucket], rate: float, burst: int, now: float
+) -> Tuple[Bucket, float]:
+    """
+    Take one token from a bucket, after refilling it for the elapsed time.
+
+    Args:
+        bucket (Optional[Bucket]): The tokens and the time they were counted,
+            None for a new full bucket.
+        rate (float): Tokens added per second.
+        burst (int): Maximum number of tokens.
+        now (float): Current time in seconds.
+
+    Returns:
+        Tuple[Bucket, float]: The new bucket, and 0 if a token was taken or the
+        seconds to wait for the next token otherwise.
+    """
+    tokens, updated = bucket if bucket is not None else (burst, now)
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class InMemoryBucketStore:
+    """
+    Buckets kept in the worker process, evicting the least recently used.
+
+    Attributes:
+        maxsize: Maximum number of buckets kept.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take a token from the bucket of a key.
+
+        Args:
+            key (str): The scope and the client of the bucket.
+            rate (float): Tokens added per second.
+            burst (int): Maximum number of tokens.
+
+        Returns:
+            float: 0 if the request is allowed, the seconds to wait otherwise.
+        """
+        with self._lock:
+            bucket, wait = refill(self._buckets.get(key), rate, burst, time.monotonic())
+            self._buckets[key] = bucket
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Buckets shared by every worker through a Django cache, for example Redis.
+    The read and the write are not atomic, so concurrent requests of the
+    same client can occasionally take the same token.
+
+    Attributes:
+        alias: The name of the cache in CACHES.
+    """
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        cache = caches[self.alias]
+        cache_key = f"token-bucket:{key}"
+        bucket, wait = refill(cache.get(cache_key), rate, burst, time.time())
+        cache.set(cache_key, bucket, timeout=math.ceil(burst / rate) + 1)
+        return wait
+
+    def clear(self) -> None:
+        caches[self.alias].clear()
+
+
+_bucket_store = None
+
+
+def get_bucket_store():
+    """
+    Get the store configured with TOKEN_BUCKET_STORE, built on first use.
+
+    Returns:
+        The bucket store shared by the throttles of the process.
+    """
+    global _bucket_store
+    if _bucket_store is None:
+        _bucket_store = import_string(settings.TOKEN_BUCKET_STORE)()
+    return _bucket_store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle allowing bursts of requests per client, configured by scope in
+    the TOKEN_BUCKETS setting with a "rate" per second and a "burst" size.
+
+    Attributes:
+        scope: The key of the TOKEN_BUCKETS setting.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = 0.0
+
+    def allow_request(self, request, view) -> bool:
+        config = settings.TOKEN_BUCKETS.get(self.scope)
+        if not config:
+            return True
+        key = f"{self.scope}:{self.get_ident(request)}"
+        self.wait_seconds = get_bucket_store().take(
+            key, config["rate"], config["burst"]
+        )
+        return self.wait_seconds == 0
+
+    def wait(self) -> float:
+        return self.wait_seconds
+
+
+class BookingCreateThrottle(TokenBucketThrottle):
+    scope = "booking_create"
+
+
+class QuoteThrottle(TokenBucketThrottle):
+    scope = "quote"
+
+
+class ConcurrencyLimiter:
+    """
+    Limits the number of requests running a section at the same time in a
+    worker process. Requests over the limit are rejected instead of queued.
+    With sync workers each process runs one request at a time, so the limit
+    is only reached by threaded or async workers.
+
+    Attributes:
+        name: Name of the section.
+        limit: Maximum number of requests inside the section.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self._semaphore = BoundedSemaphore(limit)
+
+    def try_acquire(self) -> Optional[Any]:
+        """
+        Enter the section if it is not full.
+
+        Returns:
+            Optional[Any]: The slot to release, None if the section is full.
+        """
+        return True if self._semaphore.acquire(blocking=False) else None
+
+    def release(self, slot: Any) -> None:
+        """
+        Leave the section.
+
+        Args:
+            slot (Any): The slot returned by try_acquire.
+        """
+        self._semaphore.release()
+
+
+class CacheConcurrencyLimiter:
+    """
+    Limits the number of requests running a section at the same time across
+    every worker sharing a Django cache, for example Redis. Each request
+    holds one of "limit" slot keys, added atomically with cache.add. A slot
+    left by a worker that died expires after CONCURRENCY_SLOT_TIMEOUT seconds.
+
+    Attributes:
+        name: Name of the section, part of the slot keys.
+        limit: Maximum number of requests inside the section.
+        alias: The name of the cache in CACHES.
+    """
+
+    def __init__(self, name: str, limit: int, alias: str = "default"):
+        self.name = name
+        self.limit = limit
+        self.alias = alias
+
+    def try_acquire(self) -> Optional[Tuple[str, str]]:
+        """
+        Take a free slot, trying them in a random order to spread the requests.
+
+        Returns:
+            Optional[Tuple[str, str]]: The key and token of the slot, None if
+            every slot is taken.
+        """
+        cache = caches[self.alias]
+        token = uuid.uuid4().hex
+        for slot in random.sample(range(self.limit), self.limit):
+            key = f"concurrency:{self.name}:{slot}"
+            if cache.add(key, token, settings.CONCURRENCY_SLOT_TIMEOUT):
+                return key, token
+        return None
+
+    def release(self, slot: Tuple[str, str]) -> None:
+        """
+        Free a slot, unless it expired and was taken by another request.
+
+        Args:
+            slot (Tuple[str, str]): The key and token returned by try_acquire.
+        """
+        cache = caches[self.alias]
+        key, token = slot
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+booking_writes = import_string(settings.BOOKING_WRITE_LIMITER)(
+    "booking-writes", settings.BOOKING_WRITE_CONCURRENCY
+)
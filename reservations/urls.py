@@ -13,31 +13,27 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-from drf_yasg import openapi
+from bookings.views import BookingReportView
+from reservations.docs import lazy_schema_view, schema_document_view
+from reservations.views import CacheStatsView, ProfileListView
 
 
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Southern Code API",
-      default_version='v1',
-      description="Challenge",
-      terms_of_service="https://www.google.com/policies/terms/",
-      contact=openapi.Contact(email="danielb.alzate1@gmail.com"),
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
-
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('properties/', include('properties.urls')),
     path('pricing_rules/', include('pricing_rules.urls')),
     path('bookings/', include('bookings.urls')),
-    path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('reports/', BookingReportView.as_view(), name='booking-report'),
+    path('profiles/', ProfileListView.as_view(), name='profile-list'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
 ]
+
+if settings.API_DOCS_ENABLED:
+    urlpatterns += [
+        path('swagger<format>/', schema_document_view, name='schema-json'),
+        path('swagger/', lazy_schema_view('swagger'), name='schema-swagger-ui'),
+        path('redoc/', lazy_schema_view('redoc'), name='schema-redoc'),
+    ]
@@ -0,0 +1,47 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from reservations.cache import cache_stats
+from reservations.profiling import profile_buffer
+
+
+class ProfileListView(APIView):
+    """
+    View exposing the profiles of the slow requests kept by the
+    ProfilingMiddleware, only to staff users.
+
+    Supported methods:
+        - GET: Lists the kept profiles, the newest first.
+        - DELETE: Empties the profile buffer.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Returns the kept profiles with their top frames.
+        """
+        return Response([record._asdict() for record in profile_buffer.records()])
+
+    def delete(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Removes every kept profile.
+        """
+        profile_buffer.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CacheStatsView(APIView):
+    """
+    View exposing the counters of the shared cache of this worker, see
+    reservations.cache.get_or_compute.
+    """
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Returns the hits, misses, stale hits, early refreshes and coalesced
+        waits of the shared cache.
+        """
+        return Response(cache_stats.stats())